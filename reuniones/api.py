@@ -0,0 +1,267 @@
+# ========================================
+# reuniones/api.py
+# API JSON de reuniones con ETag / Last-Modified (GET condicional)
+# ========================================
+
+import hashlib  # Hash de la URL en el ETag
+import json  # Cuerpo de las peticiones
+from datetime import datetime  # Fechas de entrada
+from functools import wraps  # Decoradores
+from zoneinfo import ZoneInfo  # Zona horaria de la reunión
+
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.decorators.http import condition, require_http_methods
+
+from .models import Reunion
+from . import conflictos, lotes, outbox, paginacion, versiones
+
+CAMPOS_REUNION = [
+    'id', 'titulo', 'descripcion', 'zoom_meeting_id', 'join_url', 'start_url',
+    'fecha_inicio', 'duracion', 'fecha_fin', 'zona_horaria', 'estado_zoom', 'error_zoom',
+    'creado', 'actualizado',
+]
+CAMPOS_PARTICIPANTE = ['id', 'nombre', 'email', 'asistio', 'invitacion_enviada']
+CAMPOS_LISTA_DEFECTO = ['id', 'titulo', 'zoom_meeting_id', 'join_url', 'fecha_inicio', 'duracion']
+CAMPOS_CONFLICTO = ['id', 'titulo', 'fecha_inicio', 'fecha_fin']
+
+JSON_COMPACTO = {'separators': (',', ':'), 'ensure_ascii': False}
+
+
+def _respuesta(datos, status=200):
+    """ JsonResponse sin espacios extra. """
+    return JsonResponse(datos, status=status, safe=False, json_dumps_params=JSON_COMPACTO)
+
+
+def _error(mensaje, status):
+    return _respuesta({'error': mensaje}, status=status)
+
+
+def api_login_required(vista):
+    """ Como login_required, pero responde 401 en JSON en vez de redirigir. """
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return _error('Autenticación requerida', 401)
+        return vista(request, *args, **kwargs)
+    return envoltura
+
+
+def _campos_pedidos(request, permitidos, defecto):
+    """
+    Campos solicitados con ?campos=a,b,c (solo los permitidos).
+
+    Returns:
+        list: Campos a serializar
+    """
+    pedidos = request.GET.get('campos')
+    if not pedidos:
+        return defecto
+    campos = [c for c in pedidos.split(',') if c in permitidos]
+    return campos or defecto
+
+
+def _valor(objeto, campo):
+    valor = getattr(objeto, campo)
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+
+def serializar_reunion(reunion, campos):
+    """ Reunión -> dict con solo los campos pedidos. """
+    return {campo: _valor(reunion, campo) for campo in campos}
+
+
+# =====================================
+# GET CONDICIONAL (sin consultas si la versión está en caché)
+# =====================================
+
+def _etag(request, *args, **kwargs):
+    if not request.user.is_authenticated or request.method != 'GET':
+        return None
+    version = versiones.version_usuario(request.user.pk)
+    # La URL completa forma parte del ETag (campos, cursor, detalle...).
+    # Se usa su hash porque If-None-Match separa ETags por comas.
+    ruta = hashlib.sha1(request.get_full_path().encode()).hexdigest()[:16]
+    return f"{version['etag']}-{ruta}"
+
+
+def _ultima_modificacion(request, *args, **kwargs):
+    if not request.user.is_authenticated or request.method != 'GET':
+        return None
+    return versiones.version_usuario(request.user.pk)['ultima_modificacion']
+
+
+# =====================================
+# ENDPOINTS
+# =====================================
+
+@api_login_required
+@require_http_methods(['GET', 'POST'])
+@condition(etag_func=_etag, last_modified_func=_ultima_modificacion)
+def reuniones(request):
+    """
+    GET: lista paginada por cursor (?despues=, ?antes=, ?campos=).
+    POST: registra la reunión y encola su creación en Zoom (outbox).
+    """
+    if request.method == 'POST':
+        return _crear(request)
+
+    campos = _campos_pedidos(request, CAMPOS_REUNION, CAMPOS_LISTA_DEFECTO)
+    pagina = paginacion.paginar(
+        Reunion.objects.filter(creador=request.user).only(*set(campos) | {'id', 'fecha_inicio'}),
+        despues=request.GET.get('despues'),
+        antes=request.GET.get('antes'),
+    )
+    return _respuesta({
+        'reuniones': [serializar_reunion(r, campos) for r in pagina['reuniones']],
+        'siguiente': pagina['siguiente'],
+        'anterior': pagina['anterior'],
+    })
+
+
+@api_login_required
+@require_http_methods(['GET', 'DELETE'])
+@condition(etag_func=_etag, last_modified_func=_ultima_modificacion)
+def reunion(request, reunion_id):
+    """
+    GET: detalle con participantes (?campos= admite 'participantes').
+    DELETE: encola la eliminación en Zoom (outbox).
+    """
+    reunion_obj = get_object_or_404(Reunion, id=reunion_id, creador=request.user)
+
+    if request.method == 'DELETE':
+        return _eliminar(request.user, reunion_obj)
+
+    campos = _campos_pedidos(request, CAMPOS_REUNION + ['participantes'], CAMPOS_REUNION + ['participantes'])
+    datos = serializar_reunion(reunion_obj, [c for c in campos if c != 'participantes'])
+    if 'participantes' in campos:
+        datos['participantes'] = list(reunion_obj.participantes.values(*CAMPOS_PARTICIPANTE))
+    return _respuesta(datos)
+
+
+def _fecha_parametro(request, nombre):
+    """
+    ?nombre=ISO -> datetime aware (None si falta). Sin offset, la hora es
+    local a ?timezone= (por defecto, la de las reuniones).
+
+    Raises:
+        ValueError: Fecha o zona horaria inválidas
+    """
+    valor = request.GET.get(nombre)
+    if not valor:
+        return None
+    fecha = datetime.fromisoformat(valor)
+    if timezone.is_naive(fecha):
+        try:
+            fecha = fecha.replace(tzinfo=ZoneInfo(request.GET.get('timezone') or lotes.ZONA_DEFECTO))
+        except (KeyError, TypeError) as e:  # ZoneInfoNotFoundError es KeyError
+            raise ValueError(str(e))
+    return fecha
+
+
+def _serializar_hueco(hueco):
+    if hueco is None:
+        return None
+    return {'inicio': hueco[0].isoformat(), 'fin': hueco[1].isoformat()}
+
+
+@api_login_required
+@require_http_methods(['GET'])
+def agenda_conflictos(request):
+    """ GET /api/agenda/conflictos/?start_time=ISO&duration=60[&excluir=id][&timezone=] """
+    try:
+        inicio = _fecha_parametro(request, 'start_time')
+        duracion = int(request.GET['duration'])
+        excluir = int(request.GET['excluir']) if request.GET.get('excluir') else None
+    except (ValueError, KeyError):
+        return _error('Se requieren start_time (ISO) y duration', 400)
+    if inicio is None or duracion <= 0:
+        return _error('Se requieren start_time (ISO) y duration', 400)
+
+    solapadas = conflictos.buscar_conflictos(request.user, inicio, duracion, excluir=excluir)
+    return _respuesta({'conflictos': [serializar_reunion(r, CAMPOS_CONFLICTO) for r in solapadas]})
+
+
+@api_login_required
+@require_http_methods(['GET'])
+def agenda_hueco(request):
+    """ GET /api/agenda/hueco/?duration=60[&desde=ISO][&hasta=ISO][&timezone=] """
+    try:
+        duracion = int(request.GET['duration'])
+        desde = _fecha_parametro(request, 'desde')
+        hasta = _fecha_parametro(request, 'hasta')
+    except (ValueError, KeyError):
+        return _error('Se requiere duration (minutos); desde y hasta en ISO', 400)
+    if duracion <= 0:
+        return _error('Se requiere duration (minutos); desde y hasta en ISO', 400)
+
+    return _respuesta({'hueco': _serializar_hueco(conflictos.siguiente_hueco(request.user, duracion, desde, hasta))})
+
+
+def _crear(request):
+    """
+    POST /api/reuniones/ con {topic, start_time, duration, timezone?, ignorar_conflictos?}.
+    Responde 202 con estado_zoom 'creando'; zoom_meeting_id y los enlaces
+    aparecen cuando el outbox la crea en Zoom.
+    """
+    try:
+        cuerpo = json.loads(request.body)
+        topic = cuerpo['topic']
+        duration = int(cuerpo['duration'])
+        zona = cuerpo.get('timezone', lotes.ZONA_DEFECTO)
+        start_datetime = datetime.fromisoformat(cuerpo['start_time'])
+    except (ValueError, KeyError, TypeError):
+        return _error('Se requieren topic, start_time (ISO) y duration', 400)
+    if duration <= 0:
+        return _error('Se requieren topic, start_time (ISO) y duration', 400)
+
+    # Se valida aunque start_time traiga offset: Zoom recibe la hora en esta zona
+    try:
+        zona_info = ZoneInfo(zona)
+    except (ValueError, KeyError, TypeError):
+        return _error('Zona horaria inválida', 400)
+    if timezone.is_naive(start_datetime):
+        start_datetime = start_datetime.replace(tzinfo=zona_info)
+
+    modo = conflictos.modo()
+    solapadas = []
+    if modo != 'ignorar' and not cuerpo.get('ignorar_conflictos'):
+        solapadas = conflictos.buscar_conflictos(request.user, start_datetime, duration)
+    if solapadas and modo == 'rechazar':
+        return _respuesta({
+            'error': 'El horario se solapa con otras reuniones',
+            'conflictos': [serializar_reunion(r, CAMPOS_CONFLICTO) for r in solapadas],
+            'siguiente_hueco': _serializar_hueco(
+                conflictos.siguiente_hueco(request.user, duration, desde=start_datetime)
+            ),
+        }, status=409)
+
+    # Se responde sin esperar a Zoom: el outbox la crea y rellena zoom_meeting_id y enlaces
+    reunion_obj = outbox.encolar_creacion(
+        request.user, topic, start_datetime, duration,
+        {
+            'topic': topic,
+            'start_time': start_datetime.astimezone(zona_info).strftime('%Y-%m-%dT%H:%M:%S'),
+            'duration': duration,
+            'timezone': zona,
+        },
+        zona_horaria=zona,
+    )
+    datos = serializar_reunion(reunion_obj, CAMPOS_REUNION)
+    if solapadas:
+        datos['conflictos'] = [serializar_reunion(r, CAMPOS_CONFLICTO) for r in solapadas]
+    return _respuesta(datos, status=202)
+
+
+def _eliminar(usuario, reunion_obj):
+    """
+    DELETE /api/reuniones/<id>/: 202 si queda en cola para Zoom (outbox),
+    204 si no había llegado a Zoom y se borró localmente.
+    """
+    resultado = outbox.encolar_eliminacion(usuario, [reunion_obj.pk])
+    if resultado['encoladas']:
+        return _respuesta({'id': reunion_obj.pk, 'estado_zoom': Reunion.ELIMINANDO}, status=202)
+    return HttpResponse(status=204)
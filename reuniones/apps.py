@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ReunionesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reuniones'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import checks, metricas, signals  # noqa: F401  (registra los receivers y checks)
+        # Contador de consultas por petición en cada conexión nueva
+        connection_created.connect(metricas.instrumentar_conexion)
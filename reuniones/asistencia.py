@@ -0,0 +1,131 @@
+# ========================================
+# reuniones/asistencia.py
+# Resolución de asistencia por lotes (eventos participant_joined)
+# ========================================
+
+import threading  # Caché compartida entre hilos del consumidor
+from collections import OrderedDict  # LRU de reuniones
+
+from django.db.models import Q  # Nombre O email
+from django.utils import timezone  # Marca de actualización
+
+from .models import Reunion, Participante, normalizar_nombre, normalizar_email
+from . import versiones
+
+MAX_REUNIONES_CACHE = 10000  # Entradas zoom_meeting_id -> (pk, creador) en memoria
+
+_cache_reuniones = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def olvidar_reunion(zoom_meeting_id):
+    """ Quita una reunión de la caché (p. ej. al borrarla). """
+    with _cache_lock:
+        _cache_reuniones.pop(str(zoom_meeting_id), None)
+
+
+def limpiar_cache():
+    """ Vacía la caché de reuniones. """
+    with _cache_lock:
+        _cache_reuniones.clear()
+
+
+def resolver_reuniones(zoom_ids):
+    """
+    Traduce IDs de Zoom a reuniones locales usando la caché en memoria.
+    Los IDs que faltan se buscan con una sola consulta.
+
+    Args:
+        zoom_ids: Iterable de IDs de reunión de Zoom
+
+    Returns:
+        dict: {zoom_meeting_id (str): (reunion_pk, creador_id)}
+    """
+    resultado = {}
+    faltantes = []
+    with _cache_lock:
+        for zoom_id in {str(z) for z in zoom_ids}:
+            datos = _cache_reuniones.get(zoom_id)
+            if datos is None:
+                faltantes.append(zoom_id)
+            else:
+                _cache_reuniones.move_to_end(zoom_id)
+                resultado[zoom_id] = datos
+
+    if faltantes:
+        encontrados = {
+            zoom_id: (pk, creador_id)
+            for zoom_id, pk, creador_id in Reunion.objects.filter(zoom_meeting_id__in=faltantes)
+            .values_list('zoom_meeting_id', 'pk', 'creador_id').order_by()
+        }
+        with _cache_lock:
+            for zoom_id, datos in encontrados.items():
+                _cache_reuniones[zoom_id] = datos
+                _cache_reuniones.move_to_end(zoom_id)
+            while len(_cache_reuniones) > MAX_REUNIONES_CACHE:
+                _cache_reuniones.popitem(last=False)
+        resultado.update(encontrados)
+
+    return resultado
+
+
+def registrar_asistencias(eventos):
+    """
+    Marca `asistio` para los participantes de un lote de eventos
+    meeting.participant_joined. Se hace un UPDATE por reunión, buscando
+    por nombre o email normalizados (columnas indexadas).
+
+    Args:
+        eventos: Lista de payloads de Zoom
+
+    Returns:
+        int: Participantes marcados como asistentes
+    """
+    por_reunion = {}  # zoom_id -> (nombres, emails)
+    for payload in eventos:
+        objeto = payload.get('payload', {}).get('object', {})
+        meeting_id = objeto.get('id')
+        participante = objeto.get('participant', {})
+        nombre = normalizar_nombre(participante.get('user_name'))
+        email = normalizar_email(participante.get('email'))
+        if not meeting_id or not (nombre or email):
+            continue
+
+        nombres, emails = por_reunion.setdefault(str(meeting_id), (set(), set()))
+        if nombre:
+            nombres.add(nombre)
+        if email:
+            emails.add(email)
+
+    if not por_reunion:
+        return 0
+
+    reuniones = resolver_reuniones(por_reunion)
+
+    marcados = 0
+    tocadas = {}  # reunion_pk -> creador_id
+    for zoom_id, (nombres, emails) in por_reunion.items():
+        if zoom_id not in reuniones:
+            continue
+        reunion_pk, creador_id = reuniones[zoom_id]
+
+        coincide = Q()
+        if nombres:
+            coincide |= Q(nombre_normalizado__in=nombres)
+        if emails:
+            coincide |= Q(email_normalizado__in=emails)
+
+        actualizados = Participante.objects.filter(
+            coincide, reunion_id=reunion_pk, asistio=False
+        ).update(asistio=True)
+        if actualizados:
+            marcados += actualizados
+            tocadas[reunion_pk] = creador_id
+
+    if tocadas:
+        # La asistencia forma parte del detalle: mover actualizado (ETag de la API)
+        Reunion.objects.filter(pk__in=list(tocadas)).update(actualizado=timezone.now())
+        for creador_id in set(tocadas.values()):
+            versiones.invalidar(creador_id)
+
+    return marcados
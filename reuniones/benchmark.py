@@ -0,0 +1,379 @@
+# ========================================
+# reuniones/benchmark.py
+# Escenarios de benchmark de extremo a extremo contra el Zoom local
+# ========================================
+
+import json  # Webhooks y resultados
+import os  # Archivo de la BD temporal
+import platform  # Entorno de la medición
+import shutil  # Borrar el directorio temporal
+import statistics  # Percentiles
+import tempfile  # BD desechable
+import threading  # Un cliente de pruebas por hilo
+import time  # Cronómetro
+from concurrent.futures import ThreadPoolExecutor  # Concurrencia
+from contextlib import contextmanager  # bd_temporal()
+from datetime import date, timedelta  # Fechas de las reuniones creadas
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, connections  # BD de pruebas
+from django.test import Client
+from django.test.utils import override_settings, setup_databases, teardown_databases
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import EventoWebhook, Reunion, TrabajoSincronizacion
+from . import jobs, outbox, tokens, webhooks, zoom_fake
+
+USUARIO_BENCHMARK = 'benchmark-e2e'
+SECRETO_WEBHOOK = 'secreto-benchmark'
+METRICAS_MAYOR_ES_MEJOR = ['por_segundo']
+METRICAS_MENOR_ES_MEJOR = ['p50_ms', 'p99_ms']
+
+_bds_temporales = set()  # NAME de las BD creadas por bd_temporal()
+
+
+# =====================================
+# BD TEMPORAL
+# =====================================
+
+@contextmanager
+def bd_temporal():
+    """
+    BD desechable, como la de los tests: se crea y migra al entrar y se
+    destruye al salir. Los escenarios ejecutan los workers (outbox,
+    sincronización, webhooks) contra el Zoom local; sobre la BD real
+    sincronizarían y borrarían reuniones de otros usuarios.
+    Con SQLite va a un archivo temporal (los hilos del benchmark no
+    comparten bien una BD en memoria). Las claves de caché llevan un
+    prefijo propio por si la caché es externa (Redis).
+    """
+    conexion = connections[DEFAULT_DB_ALIAS]
+    prueba = conexion.settings_dict.setdefault('TEST', {})
+    nombre_prueba = prueba.get('NAME')
+    directorio = tempfile.mkdtemp(prefix='benchmark-')
+    if conexion.vendor == 'sqlite':
+        prueba['NAME'] = os.path.join(directorio, 'benchmark.sqlite3')
+    caches = {
+        alias: {**opciones, 'KEY_PREFIX': f"{opciones.get('KEY_PREFIX', '')}benchmark-{os.getpid()}"}
+        for alias, opciones in settings.CACHES.items()
+    }
+
+    try:
+        with override_settings(CACHES=caches):
+            anterior = setup_databases(verbosity=0, interactive=False, aliases={DEFAULT_DB_ALIAS})
+            nombre = conexion.settings_dict['NAME']
+            _bds_temporales.add(nombre)
+            try:
+                yield
+            finally:
+                _bds_temporales.discard(nombre)
+                tokens.olvidar()  # IDs de usuario de la BD temporal
+                teardown_databases(anterior, verbosity=0)
+    finally:
+        prueba['NAME'] = nombre_prueba
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def exigir_bd_temporal():
+    """
+    Se niega a seguir si la BD actual no es desechable.
+
+    Raises:
+        RuntimeError: Si la BD actual no la creó bd_temporal()
+    """
+    if connections[DEFAULT_DB_ALIAS].settings_dict['NAME'] not in _bds_temporales:
+        raise RuntimeError('Los benchmarks solo se ejecutan sobre una BD temporal (benchmark.bd_temporal())')
+
+
+def resumen(latencias, errores, duracion, unidades=None):
+    """
+    Rendimiento y percentiles de una serie de mediciones.
+
+    Args:
+        latencias: Segundos de cada operación
+        errores: Operaciones fallidas
+        duracion: Segundos totales de la fase
+        unidades: Elementos procesados (por defecto, una por operación)
+
+    Returns:
+        dict
+    """
+    ordenadas = sorted(latencias)
+    if len(ordenadas) > 1:
+        cuantiles = statistics.quantiles(ordenadas, n=100, method='inclusive')
+        p50, p99 = cuantiles[49], cuantiles[98]
+    else:
+        p50 = p99 = ordenadas[0] if ordenadas else 0.0
+    unidades = len(latencias) if unidades is None else unidades
+    return {
+        'operaciones': len(latencias),
+        'errores': errores,
+        'segundos': round(duracion, 3),
+        'por_segundo': round(unidades / duracion, 1) if duracion else 0.0,
+        'p50_ms': round(p50 * 1000, 2),
+        'p99_ms': round(p99 * 1000, 2),
+    }
+
+
+def medir(operacion, cantidad, concurrencia, usuario):
+    """
+    Ejecuta `operacion(cliente, i)` `cantidad` veces con `concurrencia`
+    hilos; cada hilo usa su propio Client autenticado.
+
+    Args:
+        operacion: Función que devuelve True si la operación fue correcta
+
+    Returns:
+        dict: resumen()
+    """
+    local = threading.local()
+
+    def uno(i):
+        cliente = getattr(local, 'cliente', None)
+        if cliente is None:
+            cliente = local.cliente = Client()
+            cliente.force_login(usuario)
+        inicio = time.perf_counter()
+        try:
+            correcto = operacion(cliente, i)
+        except Exception:
+            correcto = False
+        return time.perf_counter() - inicio, correcto
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrencia, thread_name_prefix='benchmark') as executor:
+        resultados = list(executor.map(uno, range(cantidad)))
+    duracion = time.perf_counter() - inicio
+    return resumen([r[0] for r in resultados], sum(1 for r in resultados if not r[1]), duracion)
+
+
+# =====================================
+# ESCENARIOS
+# =====================================
+
+def escenario_crear(contexto):
+    """
+    POST /crear/ (vista + INSERT en el outbox) y después el worker del
+    outbox enviándolas a Zoom (operaciones/s).
+    """
+    url = reverse('crear_reunion')
+
+    def operacion(cliente, i):
+        # Un día distinto por reunión: sin solapamientos que la vista rechace
+        return cliente.post(url, {
+            'topic': f'Benchmark {i}',
+            'start_date': (date(2030, 1, 1) + timedelta(days=i)).isoformat(),
+            'start_time': '10:00',
+            'duration': '40',
+        }).status_code == 302
+
+    datos = medir(operacion, contexto['peticiones'], contexto['concurrencia'], contexto['usuario'])
+
+    inicio = time.perf_counter()
+    procesadas = outbox.procesar_pendientes(usuario=contexto['usuario'])
+    duracion = time.perf_counter() - inicio
+    datos['enviadas_zoom'] = procesadas
+    datos['errores_zoom'] = Reunion.objects.filter(
+        creador=contexto['usuario'], estado_zoom=Reunion.ERROR
+    ).count()
+    datos['envio_por_segundo'] = round(procesadas / duracion, 1) if duracion else 0.0
+    return datos
+
+
+def escenario_listar(contexto):
+    """ GET /lista/ paginado (render completo de la plantilla). """
+    url = reverse('lista_reuniones')
+    return medir(
+        lambda cliente, i: cliente.get(url).status_code == 200,
+        contexto['peticiones'], contexto['concurrencia'], contexto['usuario'],
+    )
+
+
+def escenario_api(contexto):
+    """ GET /api/reuniones/ sin caché de cliente y con If-None-Match (304). """
+    url = reverse('api_reuniones')
+    primero = Client()
+    primero.force_login(contexto['usuario'])
+    valor = primero.get(url).headers.get('ETag', '')
+
+    def operacion(cliente, i):
+        if i % 2:
+            return cliente.get(url, HTTP_IF_NONE_MATCH=valor).status_code in (200, 304)
+        return cliente.get(url).status_code == 200
+
+    return medir(operacion, contexto['peticiones'], contexto['concurrencia'], contexto['usuario'])
+
+
+def escenario_sincronizar(contexto):
+    """
+    POST /sincronizar/ y el worker hasta terminar, dos veces: la primera
+    inserta todo, la segunda no encuentra cambios. Se mide reuniones/s.
+    """
+    usuario = contexto['usuario']
+    contexto['estado_zoom'].sembrar(contexto['reuniones'])
+    total = len(contexto['estado_zoom'].reuniones)
+    cliente = Client()
+    cliente.force_login(usuario)
+
+    latencias = []
+    errores = 0
+    for _ in range(2):
+        inicio = time.perf_counter()
+        cliente.post(reverse('sincronizar_reuniones'))
+        jobs.procesar_pendientes(usuario=usuario)
+        latencias.append(time.perf_counter() - inicio)
+        trabajo = TrabajoSincronizacion.objects.filter(usuario=usuario).order_by('-creado').first()
+        if trabajo is None or trabajo.estado != TrabajoSincronizacion.COMPLETADO:
+            errores += 1
+
+    datos = resumen(latencias, errores, sum(latencias), unidades=total * len(latencias))
+    datos['reuniones'] = total
+    datos['primera_ms'] = round(latencias[0] * 1000, 2)
+    datos['sin_cambios_ms'] = round(latencias[1] * 1000, 2)
+    return datos
+
+
+def escenario_webhook(contexto):
+    """
+    POST /zoom/webhook/ con eventos firmados (recepción) y después el
+    consumidor de la cola (procesamiento, eventos/s).
+    """
+    reuniones = list(
+        Reunion.objects.filter(creador=contexto['usuario']).values_list('zoom_meeting_id', flat=True)[:50]
+    ) or ['0']
+    url = reverse('zoom_webhook')
+    base = time.time_ns() // 1000
+
+    def operacion(cliente, i):
+        cuerpo = json.dumps(zoom_fake.evento_participante(
+            reuniones[i % len(reuniones)], f'Participante {i}', f'p{i}@example.com', event_ts=base + i
+        )).encode()
+        cabeceras = {
+            f'HTTP_{k.upper().replace("-", "_")}': v
+            for k, v in zoom_fake.cabeceras_webhook(cuerpo, SECRETO_WEBHOOK).items()
+            if k != 'Content-Type'
+        }
+        claves.append(webhooks.clave_evento(json.loads(cuerpo), cuerpo))
+        return cliente.post(url, cuerpo, content_type='application/json', **cabeceras).status_code == 200
+
+    claves = contexto['claves_webhook']
+    recepcion = medir(operacion, contexto['peticiones'], contexto['concurrencia'], contexto['usuario'])
+
+    inicio = time.perf_counter()
+    procesados = webhooks.procesar_pendientes(claves=claves)
+    duracion = time.perf_counter() - inicio
+    recepcion['procesados'] = procesados
+    recepcion['procesamiento_por_segundo'] = round(procesados / duracion, 1) if duracion else 0.0
+    return recepcion
+
+
+ESCENARIOS = {
+    'crear': escenario_crear,
+    'listar': escenario_listar,
+    'api': escenario_api,
+    'sincronizar': escenario_sincronizar,
+    'webhook': escenario_webhook,
+}
+
+
+# =====================================
+# EJECUCIÓN Y COMPARACIÓN
+# =====================================
+
+def ejecutar(escenarios, peticiones=200, concurrencia=8, latencia=0.05, tasa_429=0.0, reuniones=1000):
+    """
+    Levanta el Zoom local, ejecuta los escenarios indicados y limpia los
+    datos creados (reuniones, trabajos y eventos del usuario de benchmark).
+    Solo dentro de bd_temporal().
+
+    Args:
+        escenarios: Nombres de ESCENARIOS, en orden
+        peticiones: Operaciones por escenario
+        concurrencia: Hilos cliente simultáneos
+        latencia: Segundos por llamada al Zoom local
+        tasa_429: Probabilidad de 429 del Zoom local
+        reuniones: Reuniones sembradas en Zoom para 'sincronizar'
+
+    Returns:
+        dict: Resultados con metadatos del entorno
+    """
+    exigir_bd_temporal()
+    usuario, _ = User.objects.get_or_create(username=USUARIO_BENCHMARK)
+    servidor, url_base = zoom_fake.iniciar(latencia=latencia, tasa_429=tasa_429)
+    zoom_fake.conectar(settings, url_base, usuario)
+    settings.ZOOM_WEBHOOK_SECRET_TOKEN = SECRETO_WEBHOOK
+    if 'testserver' not in settings.ALLOWED_HOSTS and '*' not in settings.ALLOWED_HOSTS:
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+
+    contexto = {
+        'usuario': usuario,
+        'claves_webhook': [],  # Eventos enviados por el escenario 'webhook'
+        'estado_zoom': servidor.RequestHandlerClass.estado,
+        'peticiones': peticiones,
+        'concurrencia': concurrencia,
+        'reuniones': reuniones,
+    }
+
+    resultados = {}
+    try:
+        for nombre in escenarios:
+            resultados[nombre] = ESCENARIOS[nombre](contexto)
+    finally:
+        Reunion.objects.filter(creador=usuario).delete()
+        TrabajoSincronizacion.objects.filter(usuario=usuario).delete()
+        EventoWebhook.objects.filter(clave__in=contexto['claves_webhook']).delete()
+        tokens.revocar(usuario.pk)
+        servidor.shutdown()
+
+    return {
+        'fecha': timezone.now().isoformat(),
+        'entorno': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'base_de_datos': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+            'plataforma': platform.platform(),
+        },
+        'parametros': {
+            'peticiones': peticiones,
+            'concurrencia': concurrencia,
+            'latencia_ms': round(latencia * 1000, 1),
+            'tasa_429': tasa_429,
+            'reuniones': reuniones,
+        },
+        'llamadas_zoom': dict(contexto['estado_zoom'].llamadas),
+        'escenarios': resultados,
+    }
+
+
+def comparar(actual, base, tolerancia=0.2):
+    """
+    Busca regresiones respecto a un resultado anterior.
+    Una métrica empeora si baja (rendimiento) o sube (latencia) más que
+    la tolerancia relativa.
+
+    Args:
+        actual: Resultado de ejecutar()
+        base: Resultado guardado previamente
+        tolerancia: Variación relativa permitida (0.2 = 20 %)
+
+    Returns:
+        list: Textos describiendo cada regresión
+    """
+    regresiones = []
+    for nombre, datos in actual['escenarios'].items():
+        anteriores = base.get('escenarios', {}).get(nombre)
+        if not anteriores:
+            continue
+        for metrica in METRICAS_MAYOR_ES_MEJOR + METRICAS_MENOR_ES_MEJOR:
+            antes, ahora = anteriores.get(metrica), datos.get(metrica)
+            if not antes or ahora is None:
+                continue
+            cambio = (ahora - antes) / antes
+            if metrica in METRICAS_MAYOR_ES_MEJOR:
+                cambio = -cambio
+            if cambio > tolerancia:
+                regresiones.append(f'{nombre}.{metrica}: {antes} -> {ahora} ({cambio:+.0%} peor)')
+    return regresiones
@@ -0,0 +1,165 @@
+# ========================================
+# reuniones/calendario.py
+# Feed iCalendar (ICS) por usuario, cacheado y regenerado por reunión
+# ========================================
+
+from datetime import timedelta, timezone as dt_timezone  # Fechas en UTC
+
+from django.core import signing  # Enlace de suscripción sin sesión
+from django.core.cache import cache  # Feed y VEVENTs cacheados
+from django.utils import timezone  # Ventana del feed
+
+from .models import Reunion
+from . import versiones
+
+SAL_ENLACE = 'reuniones.calendario'  # Sal del enlace firmado
+DIAS_PASADOS = 90  # Reuniones anteriores que se siguen publicando
+LOTE_REGENERACION = 500  # Reuniones leídas por consulta al regenerar VEVENTs
+CACHE_TTL = 7 * 86400  # El feed se reconstruye al cambiar la versión; esto es solo un tope
+PRODID = '-//Zoom Reuniones//Calendario//ES'
+
+
+# =====================================
+# ENLACE DE SUSCRIPCIÓN
+# =====================================
+
+def token_usuario(usuario_id):
+    """ Token firmado para la URL del feed (los clientes de calendario no tienen sesión). """
+    return signing.Signer(salt=SAL_ENLACE).sign(str(usuario_id))
+
+
+def usuario_de_token(token):
+    """
+    ID de usuario de un token de token_usuario(), sin consultar la BD.
+
+    Returns:
+        int | None: None si la firma no es válida
+    """
+    try:
+        return int(signing.Signer(salt=SAL_ENLACE).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def etag_usuario(usuario_id):
+    """ ETag del feed: la versión de las reuniones del usuario (caché, sin consultas). """
+    return f"ics-{versiones.version_usuario(usuario_id)['etag']}"
+
+
+# =====================================
+# FORMATO ICS (RFC 5545)
+# =====================================
+
+def _texto(valor):
+    """ Escapa un valor TEXT: barra invertida, ';', ',' y saltos de línea. """
+    return (
+        (valor or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fecha(valor):
+    return valor.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _plegar(linea):
+    """ Parte una línea en trozos de 75 octetos como máximo (continuación con espacio). """
+    datos = linea.encode('utf-8')
+    if len(datos) <= 75:
+        return datos + b'\r\n'
+    trozos = []
+    limite = 75
+    while datos:
+        corte = min(limite, len(datos))
+        while corte < len(datos) and (datos[corte] & 0xC0) == 0x80:
+            corte -= 1  # No partir un carácter UTF-8
+        trozos.append(datos[:corte])
+        datos = datos[corte:]
+        limite = 74  # El espacio inicial cuenta
+    return b'\r\n '.join(trozos) + b'\r\n'
+
+
+def vevent(reunion):
+    """
+    VEVENT de una reunión (bytes). Las fechas van en UTC; la zona
+    horaria original se indica en la descripción.
+    """
+    descripcion = f'Unirse: {reunion.join_url}\nZona horaria: {reunion.zona_horaria}'
+    if reunion.descripcion:
+        descripcion = f'{reunion.descripcion}\n\n{descripcion}'
+    lineas = [
+        'BEGIN:VEVENT',
+        f'UID:reunion-{reunion.zoom_meeting_id}@zoom-reuniones',
+        f'DTSTAMP:{_fecha(reunion.actualizado)}',
+        f'LAST-MODIFIED:{_fecha(reunion.actualizado)}',
+        f'DTSTART:{_fecha(reunion.fecha_inicio)}',
+        f'DTEND:{_fecha(reunion.fecha_inicio + timedelta(minutes=reunion.duracion))}',
+        f'SUMMARY:{_texto(reunion.titulo)}',
+        f'DESCRIPTION:{_texto(descripcion)}',
+        f'LOCATION:{_texto(reunion.join_url)}',
+        f'URL:{reunion.join_url}',
+        'END:VEVENT',
+    ]
+    return b''.join(_plegar(linea) for linea in lineas)
+
+
+def _ensamblar(eventos):
+    cabecera = b''.join(_plegar(linea) for linea in [
+        'BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN', 'METHOD:PUBLISH', 'X-WR-CALNAME:Reuniones Zoom',
+    ])
+    return cabecera + b''.join(eventos) + _plegar('END:VCALENDAR')
+
+
+# =====================================
+# FEED CACHEADO
+# =====================================
+
+def _clave_feed(usuario_id):
+    return f'calendario_ics:{usuario_id}'
+
+
+def _clave_eventos(usuario_id):
+    return f'calendario_eventos:{usuario_id}'
+
+
+def feed_usuario(usuario_id):
+    """
+    Feed ICS del usuario como bytes.
+    Si la versión no cambió se sirve el feed cacheado tal cual. Si
+    cambió, se leen solo (id, actualizado) de las reuniones y se
+    regeneran los VEVENTs de las nuevas o modificadas; el resto sale de
+    la caché de eventos.
+
+    Returns:
+        tuple: (etag, bytes)
+    """
+    etag = etag_usuario(usuario_id)
+    cacheado = cache.get(_clave_feed(usuario_id))
+    if cacheado is not None and cacheado[0] == etag:
+        return cacheado
+
+    anteriores = cache.get(_clave_eventos(usuario_id)) or {}
+    desde = timezone.now() - timedelta(days=DIAS_PASADOS)
+    # Las que el outbox aún no creó en Zoom no tienen enlace: se publican al crearse
+    actuales = dict(
+        Reunion.objects.filter(creador_id=usuario_id, fecha_inicio__gte=desde, zoom_meeting_id__isnull=False)
+        .order_by('fecha_inicio', 'id').values_list('id', 'actualizado')
+    )
+
+    cambiadas = [pk for pk, actualizado in actuales.items()
+                 if pk not in anteriores or anteriores[pk][0] != actualizado]
+    regeneradas = {}
+    for i in range(0, len(cambiadas), LOTE_REGENERACION):
+        for reunion in Reunion.objects.filter(pk__in=cambiadas[i:i + LOTE_REGENERACION]).order_by():
+            regeneradas[reunion.pk] = (reunion.actualizado, vevent(reunion))
+
+    # Mismo orden que 'actuales' (por fecha de inicio); las borradas desaparecen
+    eventos = {}
+    for pk in actuales:
+        evento = regeneradas.get(pk) or anteriores.get(pk)
+        if evento is not None:
+            eventos[pk] = evento
+    resultado = (etag, _ensamblar(evento for _, evento in eventos.values()))
+    cache.set_many({_clave_eventos(usuario_id): eventos, _clave_feed(usuario_id): resultado}, CACHE_TTL)
+    return resultado
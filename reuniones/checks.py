@@ -0,0 +1,33 @@
+# ========================================
+# reuniones/checks.py
+# Comprobaciones de configuración (manage.py check y al arrancar cada comando)
+# ========================================
+
+from django.conf import settings  # Backend de la caché
+from django.core import checks  # Framework de system checks
+
+CACHES_POR_PROCESO = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@checks.register()
+def cache_compartida(app_configs, **kwargs):
+    """
+    El servidor web y los workers (procesar_sincronizaciones,
+    procesar_outbox, procesar_webhooks) se coordinan por la caché: lock de
+    renovación del token, versiones (ETag), dashboard y feed ICS. Con una
+    caché por proceso cada uno ve solo sus propias invalidaciones.
+    """
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend not in CACHES_POR_PROCESO:
+        return []
+    return [checks.Warning(
+        f'La caché por defecto ({backend}) no se comparte entre procesos.',
+        hint=(
+            'Los workers en segundo plano necesitan la misma caché que el servidor web: '
+            'usa DatabaseCache (manage.py createcachetable) o Redis en CACHES.'
+        ),
+        id='reuniones.W001',
+    )]
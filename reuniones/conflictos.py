@@ -0,0 +1,146 @@
+# ========================================
+# reuniones/conflictos.py
+# Detección de solapamientos y búsqueda del siguiente hueco libre
+# ========================================
+
+from datetime import timedelta  # Fin de la reunión
+
+from django.conf import settings
+from django.db.models import Max  # Duración máxima del usuario
+from django.utils import timezone  # Fechas con zona horaria
+
+from .models import Reunion
+
+MAX_CONFLICTOS = 5  # Reuniones solapadas que se devuelven como máximo
+HORIZONTE_HUECO = timedelta(days=30)  # Hasta dónde se busca un hueco por defecto
+LOTE_HUECO = 200  # Reuniones leídas por consulta al buscar hueco
+
+# Qué hacer al crear una reunión que se solapa: 'rechazar', 'avisar' o 'ignorar'
+MODOS = ('rechazar', 'avisar', 'ignorar')
+
+
+def modo():
+    """ Modo configurado (REUNIONES_CONFLICTOS), 'rechazar' si no es válido. """
+    valor = getattr(settings, 'REUNIONES_CONFLICTOS', 'rechazar')
+    return valor if valor in MODOS else 'rechazar'
+
+
+def _aware(fecha):
+    """
+    Exige una fecha con zona: una naive no se sabe en qué zona está (la
+    del formulario es la de la reunión, no UTC). Las vistas la localizan.
+
+    Raises:
+        ValueError: Si la fecha es naive
+    """
+    if timezone.is_naive(fecha):
+        raise ValueError(f'Fecha sin zona horaria: {fecha.isoformat()}')
+    return fecha
+
+
+def calcular_fin(inicio, duracion):
+    """ Fin de una reunión que empieza en `inicio` y dura `duracion` minutos. """
+    return inicio + timedelta(minutes=int(duracion))
+
+
+def _max_duracion(usuario):
+    """ Duración máxima (minutos) de las reuniones del usuario; índice (creador, duracion). """
+    maximo = Reunion.objects.filter(creador=usuario).order_by().aggregate(maximo=Max('duracion'))['maximo']
+    return timedelta(minutes=maximo or 0)
+
+
+def _solapadas(usuario, inicio, fin, maximo):
+    """
+    Reuniones del usuario que se solapan con [inicio, fin).
+    Dos intervalos se solapan si cada uno empieza antes de que acabe el
+    otro. Una reunión solapada termina después de `inicio` y, como dura
+    como mucho `maximo`, antes de `fin + maximo`: así el rango sobre el
+    índice (creador, fecha_fin) queda acotado por los dos lados y no
+    recorre ni el historial ni todas las reuniones futuras.
+    """
+    return Reunion.objects.filter(
+        creador=usuario,
+        fecha_fin__gt=inicio,
+        fecha_fin__lte=fin + maximo,
+        fecha_inicio__lt=fin,
+    ).order_by()
+
+
+def buscar_conflictos(usuario, inicio, duracion, excluir=None, limite=MAX_CONFLICTOS):
+    """
+    Reuniones del usuario que se solapan con [inicio, inicio + duracion).
+
+    Args:
+        usuario: Dueño de las reuniones
+        inicio: Inicio de la reunión nueva
+        duracion: Minutos
+        excluir: ID de reunión a ignorar (al reprogramar una existente)
+        limite: Máximo de conflictos devueltos
+
+    Returns:
+        list: Reuniones solapadas, por fecha de inicio
+    """
+    inicio = _aware(inicio)
+    fin = calcular_fin(inicio, duracion)
+    qs = _solapadas(usuario, inicio, fin, _max_duracion(usuario)).only(
+        'id', 'titulo', 'fecha_inicio', 'fecha_fin', 'duracion'
+    )
+    if excluir is not None:
+        qs = qs.exclude(pk=excluir)
+    # Sin ORDER BY en SQL para que el planificador use el índice por fecha_fin
+    return sorted(qs[:limite], key=lambda r: (r.fecha_inicio, r.pk))
+
+
+def siguiente_hueco(usuario, duracion, desde=None, hasta=None):
+    """
+    Primer intervalo libre de `duracion` minutos a partir de `desde`.
+    Se parte del mayor fin entre las reuniones en curso en `desde` y se
+    avanza por las siguientes en orden de inicio (índice por
+    creador/fecha_inicio, de LOTE_HUECO en LOTE_HUECO) hasta encontrar
+    un hueco suficiente.
+
+    Args:
+        usuario: Dueño de las reuniones
+        duracion: Minutos necesarios
+        desde: Inicio de la búsqueda (por defecto, ahora)
+        hasta: Límite de la búsqueda (por defecto, desde + 30 días)
+
+    Returns:
+        tuple | None: (inicio, fin) del hueco, o None si no hay ninguno
+    """
+    desde = _aware(desde) if desde else timezone.now()
+    hasta = _aware(hasta) if hasta else desde + HORIZONTE_HUECO
+    necesario = timedelta(minutes=int(duracion))
+
+    candidato = desde
+    en_curso = list(_solapadas(usuario, desde, desde, _max_duracion(usuario)).values_list('fecha_fin', flat=True))
+    if en_curso:
+        candidato = max(en_curso)
+
+    ultimo = None  # (fecha_inicio, id) del último leído, para paginar por cursor
+    while candidato + necesario <= hasta:
+        qs = Reunion.objects.filter(creador=usuario, fecha_inicio__gte=desde, fecha_inicio__lt=hasta)
+        if ultimo:
+            qs = qs.filter(fecha_inicio__gte=ultimo[0]).exclude(fecha_inicio=ultimo[0], id__lte=ultimo[1])
+        lote = list(qs.order_by('fecha_inicio', 'id').values_list('fecha_inicio', 'fecha_fin', 'id')[:LOTE_HUECO])
+        for inicio, fin, pk in lote:
+            if inicio >= candidato + necesario:
+                break
+            candidato = max(candidato, fin)
+        else:
+            if len(lote) == LOTE_HUECO:
+                ultimo = (lote[-1][0], lote[-1][2])
+                continue
+        break
+
+    if candidato + necesario > hasta:
+        return None
+    return candidato, candidato + necesario
+
+
+def describir(conflictos):
+    """ Texto corto para mensajes: 'Título (15/03 10:00-11:00), ...'. """
+    return ', '.join(
+        f"{r.titulo} ({timezone.localtime(r.fecha_inicio):%d/%m %H:%M}-{timezone.localtime(r.fecha_fin):%H:%M})"
+        for r in conflictos
+    )
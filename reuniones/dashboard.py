@@ -0,0 +1,63 @@
+# ========================================
+# reuniones/dashboard.py
+# Resumen del dashboard por usuario (una consulta + caché)
+# ========================================
+
+from django.core.cache import cache  # Sistema de caché
+from django.db.models import Count, Min, Q  # Agregados condicionales
+from django.utils import timezone  # Fechas con zona horaria
+
+from .models import Reunion
+
+RESUMEN_TTL_MAX = 3600  # Segundos máximos que vive un resumen en caché
+
+
+def _clave(usuario_id):
+    """ Clave de caché del resumen de un usuario. """
+    return f'dashboard_resumen:{usuario_id}'
+
+
+def invalidar(usuario_id):
+    """ Borra el resumen cacheado de un usuario. """
+    cache.delete(_clave(usuario_id))
+
+
+def resumen_usuario(usuario):
+    """
+    Contadores del dashboard (totales, próximas, pasadas).
+    Se calculan con una sola consulta de agregados condicionales y se
+    cachean hasta que empieza la siguiente reunión, momento en que una
+    'próxima' pasa a ser 'pasada'.
+
+    Args:
+        usuario: Usuario autenticado
+
+    Returns:
+        dict con 'totales', 'proximas' y 'pasadas'
+    """
+    clave = _clave(usuario.pk)
+    resumen = cache.get(clave)
+    if resumen is not None:
+        return resumen
+
+    ahora = timezone.now()
+    futuras = Q(fecha_inicio__gt=ahora)
+    datos = Reunion.objects.filter(creador=usuario).aggregate(
+        totales=Count('id'),
+        proximas=Count('id', filter=futuras),
+        siguiente=Min('fecha_inicio', filter=futuras),
+    )
+
+    resumen = {
+        'totales': datos['totales'],
+        'proximas': datos['proximas'],
+        'pasadas': datos['totales'] - datos['proximas'],
+    }
+
+    ttl = RESUMEN_TTL_MAX
+    if datos['siguiente'] is not None:
+        hasta_siguiente = (datos['siguiente'] - ahora).total_seconds()
+        ttl = max(1, min(ttl, int(hasta_siguiente) + 1))
+
+    cache.set(clave, resumen, ttl)
+    return resumen
@@ -0,0 +1,171 @@
+# ========================================
+# reuniones/exportacion.py
+# Exportación en streaming (CSV / NDJSON) de reuniones y asistencia
+# ========================================
+
+import csv  # Formato CSV
+import json  # Formato NDJSON
+
+from asgiref.sync import sync_to_async  # Lotes desde el loop (ASGI)
+from django.db.models import Prefetch  # Participantes por lote
+
+from .models import Reunion, Participante
+
+CHUNK_SIZE = 2000  # Reuniones leídas (y participantes precargados) por lote
+
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+COLUMNAS_CSV = [
+    'reunion_id', 'zoom_meeting_id', 'titulo', 'fecha_inicio', 'duracion', 'zona_horaria',
+    'participante_id', 'nombre', 'email', 'asistio', 'invitacion_enviada',
+]
+
+
+class _Eco:
+    """ Pseudo-archivo: csv.writer escribe y recibimos la línea de vuelta. """
+
+    def write(self, valor):
+        return valor
+
+
+def reuniones_para_exportar(usuario=None):
+    """
+    QuerySet de reuniones, ordenado por id, con participantes precargados
+    (un prefetch por cada lote que lee generar()).
+
+    Args:
+        usuario: Limitar a las reuniones de este usuario (None = todas)
+
+    Returns:
+        QuerySet
+    """
+    qs = Reunion.objects.all()
+    if usuario is not None:
+        qs = qs.filter(creador=usuario)
+    return qs.order_by('id').only(
+        'id', 'zoom_meeting_id', 'titulo', 'fecha_inicio', 'duracion', 'zona_horaria'
+    ).prefetch_related(
+        Prefetch(
+            'participantes',
+            queryset=Participante.objects.order_by('id').only(
+                'id', 'reunion_id', 'nombre', 'email', 'asistio', 'invitacion_enviada'
+            ),
+        )
+    )
+
+
+def _lineas_csv(reunion, escritor):
+    """ Líneas CSV de una reunión: una por participante (o una sin participante). """
+    base = [
+        reunion.id, reunion.zoom_meeting_id, reunion.titulo,
+        reunion.fecha_inicio.isoformat(), reunion.duracion, reunion.zona_horaria,
+    ]
+    participantes = reunion.participantes.all()
+    if not participantes:
+        return [escritor.writerow(base + ['', '', '', '', ''])]
+    return [
+        escritor.writerow(base + [p.id, p.nombre, p.email, int(p.asistio), int(p.invitacion_enviada)])
+        for p in participantes
+    ]
+
+
+def _lineas_ndjson(reunion, escritor=None):
+    """ Un objeto JSON por reunión con su lista de participantes. """
+    return [json.dumps({
+        'id': reunion.id,
+        'zoom_meeting_id': reunion.zoom_meeting_id,
+        'titulo': reunion.titulo,
+        'fecha_inicio': reunion.fecha_inicio.isoformat(),
+        'duracion': reunion.duracion,
+        'zona_horaria': reunion.zona_horaria,
+        'participantes': [
+            {
+                'id': p.id,
+                'nombre': p.nombre,
+                'email': p.email,
+                'asistio': p.asistio,
+                'invitacion_enviada': p.invitacion_enviada,
+            }
+            for p in reunion.participantes.all()
+        ],
+    }, ensure_ascii=False, separators=(',', ':')) + '\n']
+
+
+def _leer_lote(queryset, lineas, escritor, despues, chunk_size):
+    """
+    Lee y formatea las reuniones siguientes a `despues` (keyset por id:
+    dos consultas por lote y ningún cursor abierto entre lotes).
+
+    Returns:
+        tuple: (texto del lote, id de la última reunión o None si no quedan)
+    """
+    reuniones = list(queryset.filter(id__gt=despues)[:chunk_size])
+    if not reuniones:
+        return '', None
+    return ''.join(linea for reunion in reuniones for linea in lineas(reunion, escritor)), reuniones[-1].id
+
+
+def _preparar(formato):
+    """
+    Cabecera, función de líneas y escritor del formato.
+
+    Raises:
+        ValueError: Si el formato no existe
+    """
+    if formato == 'csv':
+        escritor = csv.writer(_Eco())
+        return escritor.writerow(COLUMNAS_CSV), _lineas_csv, escritor
+    if formato == 'ndjson':
+        return '', _lineas_ndjson, None
+    raise ValueError(f'Formato no soportado: {formato}')
+
+
+def generar(formato, queryset, chunk_size=CHUNK_SIZE):
+    """
+    Generador del formato pedido ('csv' o 'ndjson'): un trozo de texto
+    por lote de `chunk_size` reuniones.
+
+    Raises:
+        ValueError: Si el formato no existe
+    """
+    cabecera, lineas, escritor = _preparar(formato)
+
+    def trozos():
+        if cabecera:
+            yield cabecera
+        ultimo = 0
+        while True:
+            texto, ultimo = _leer_lote(queryset, lineas, escritor, ultimo, chunk_size)
+            if ultimo is None:
+                return
+            yield texto
+
+    return trozos()
+
+
+def agenerar(formato, queryset, chunk_size=CHUNK_SIZE):
+    """
+    Como generar(), pero asíncrono (ASGI): cada lote se lee en el hilo de
+    la BD con sync_to_async. Con un generador síncrono, Django bajo ASGI
+    lo consumiría entero en memoria antes de enviar nada.
+
+    Raises:
+        ValueError: Si el formato no existe
+    """
+    cabecera, lineas, escritor = _preparar(formato)
+    leer = sync_to_async(_leer_lote)
+
+    async def trozos():
+        if cabecera:
+            yield cabecera
+        ultimo = 0
+        while True:
+            texto, ultimo = await leer(queryset, lineas, escritor, ultimo, chunk_size)
+            if ultimo is None:
+                return
+            yield texto
+
+    return trozos()
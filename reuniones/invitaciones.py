@@ -0,0 +1,231 @@
+# ========================================
+# reuniones/invitaciones.py
+# Importación masiva de participantes y envío de invitaciones
+# ========================================
+
+import csv  # Lectura del archivo de participantes
+import io  # Decodificar el archivo subido
+from concurrent.futures import ThreadPoolExecutor  # Pool de envío
+from zoneinfo import ZoneInfo  # Hora local de la reunión en el correo
+
+from django.conf import settings  # Remitente y límites
+from django.core.exceptions import ValidationError
+from django.core.mail import EmailMessage, get_connection
+from django.core.validators import validate_email
+from django.db.models import F  # Contador de intentos
+from django.utils import timezone  # Marca de modificación de la reunión
+
+from .limites import TokenBucket
+from .models import Participante, Reunion, normalizar_email
+from . import versiones
+
+LOTE_IMPORTACION = 1000  # Filas por bulk_create
+LOTE_ENVIO = 500  # Participantes leídos de la BD por iteración del envío
+HILOS_ENVIO = 4  # Conexiones SMTP simultáneas
+CORREOS_POR_SEGUNDO = 10  # Límite global de envío
+MAX_INTENTOS_ENVIO = 5  # Después de esto la invitación deja de reintentarse
+
+
+def leer_csv(archivo):
+    """
+    Lee un CSV con columnas 'email' y opcionalmente 'nombre'.
+
+    Args:
+        archivo: Archivo binario o de texto (p. ej. request.FILES['archivo'])
+
+    Yields:
+        dict con 'nombre' y 'email'
+    """
+    if not isinstance(archivo, io.TextIOBase):
+        archivo = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+
+    for fila in csv.DictReader(archivo):
+        fila = {(k or '').strip().lower(): (v or '').strip() for k, v in fila.items()}
+        yield {
+            'nombre': fila.get('nombre') or fila.get('name') or '',
+            'email': fila.get('email') or fila.get('correo') or '',
+        }
+
+
+def _guardar(lote):
+    Participante.objects.bulk_create(lote, batch_size=LOTE_IMPORTACION)
+
+
+def _marcar_modificada(reunion):
+    """
+    Los participantes forman parte del detalle: mover actualizado (ETag de
+    la API). bulk_create y update() no disparan las señales que lo hacen.
+    """
+    Reunion.objects.filter(pk=reunion.pk).update(actualizado=timezone.now())
+    versiones.invalidar(reunion.creador_id)
+
+
+def importar_participantes(reunion, filas):
+    """
+    Valida, deduplica e inserta participantes por lotes.
+    Los emails ya registrados en la reunión se cuentan como duplicados.
+
+    Args:
+        reunion: Reunion destino
+        filas: Iterable de dicts con 'nombre' y 'email'
+
+    Returns:
+        dict con 'creados', 'duplicados' e 'invalidos' (lista de emails)
+    """
+    vistos = set(
+        reunion.participantes.values_list('email_normalizado', flat=True).order_by()
+    )
+    resultado = {'creados': 0, 'duplicados': 0, 'invalidos': []}
+
+    lote = []
+    for fila in filas:
+        email = normalizar_email(fila.get('email'))
+        try:
+            validate_email(email)
+        except ValidationError:
+            resultado['invalidos'].append(fila.get('email') or '')
+            continue
+
+        if email in vistos:
+            resultado['duplicados'] += 1
+            continue
+        vistos.add(email)
+
+        participante = Participante(
+            reunion=reunion, nombre=(fila.get('nombre') or '')[:100], email=email
+        )
+        participante.normalizar()  # bulk_create no llama a save()
+        lote.append(participante)
+
+        if len(lote) >= LOTE_IMPORTACION:
+            _guardar(lote)
+            resultado['creados'] += len(lote)
+            lote = []
+
+    if lote:
+        _guardar(lote)
+        resultado['creados'] += len(lote)
+
+    if resultado['creados']:
+        _marcar_modificada(reunion)
+    return resultado
+
+
+def _mensaje(participante, reunion, conexion):
+    """ Correo de invitación para un participante. """
+    saludo = f"Hola {participante.nombre}," if participante.nombre else "Hola,"
+    inicio = reunion.fecha_inicio.astimezone(ZoneInfo(reunion.zona_horaria))  # La BD la guarda en UTC
+    cuerpo = (
+        f"{saludo}\n\n"
+        f"Estás invitado a la reunión \"{reunion.titulo}\".\n"
+        f"Fecha: {inicio:%d/%m/%Y %H:%M} ({reunion.zona_horaria})\n"
+        f"Duración: {reunion.duracion} minutos\n\n"
+        f"Únete aquí: {reunion.join_url}\n"
+    )
+    return EmailMessage(
+        subject=f"Invitación: {reunion.titulo}",
+        body=cuerpo,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[participante.email],
+        connection=conexion,
+    )
+
+
+def _enviar_grupo(participantes, reunion, limitador):
+    """
+    Envía un grupo de invitaciones reutilizando una sola conexión.
+    No lanza excepciones: si la conexión no se puede (re)abrir, el resto
+    del grupo queda como fallido y los ya enviados se devuelven igual
+    (si no, se marcarían como pendientes y se reenviarían).
+
+    Returns:
+        list: pks enviados correctamente
+    """
+    enviados = []
+    conexion = get_connection()
+    try:
+        conexion.open()
+        for participante in participantes:
+            limitador.adquirir()
+            try:
+                _mensaje(participante, reunion, conexion).send()
+            except Exception:
+                # Reabrir la conexión por si el error la dejó inutilizable
+                conexion.close()
+                conexion.open()
+                continue
+            enviados.append(participante.pk)
+    except Exception:
+        pass  # Servidor de correo caído: se reintenta en la siguiente pasada
+    finally:
+        try:
+            conexion.close()
+        except Exception:
+            pass
+    return enviados
+
+
+def reuniones_con_pendientes():
+    """
+    Reuniones con invitaciones por enviar que ya tienen enlace de Zoom.
+    Las que el outbox aún no creó esperan: el correo saldría sin join_url.
+
+    Returns:
+        QuerySet de Reunion
+    """
+    return Reunion.objects.filter(
+        participantes__invitacion_enviada=False,
+        participantes__intentos_invitacion__lt=MAX_INTENTOS_ENVIO,
+        zoom_meeting_id__isnull=False,
+    ).exclude(estado_zoom=Reunion.ELIMINANDO).distinct()
+
+
+def enviar_invitaciones(reunion, hilos=HILOS_ENVIO, por_segundo=CORREOS_POR_SEGUNDO):
+    """
+    Envía las invitaciones pendientes de una reunión. Si todavía no tiene
+    enlace de Zoom no envía nada (quedan pendientes).
+    Cada hilo reutiliza su conexión de correo; un token bucket compartido
+    limita la tasa global. `invitacion_enviada` se marca con un UPDATE
+    por lote; las fallidas suman un intento y tras MAX_INTENTOS_ENVIO se
+    dejan de enviar.
+
+    Args:
+        reunion: Reunion cuyas invitaciones se envían
+        hilos: Conexiones de correo simultáneas
+        por_segundo: Correos por segundo (todas las conexiones juntas)
+
+    Returns:
+        dict con 'enviadas' y 'fallidas'
+    """
+    resultado = {'enviadas': 0, 'fallidas': 0}
+    if reunion.zoom_meeting_id is None or not reunion.join_url:
+        return resultado
+    limitador = TokenBucket(por_segundo)
+    ultimo_pk = 0
+
+    with ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='invitaciones') as executor:
+        while True:
+            lote = list(
+                reunion.participantes.filter(
+                    invitacion_enviada=False, intentos_invitacion__lt=MAX_INTENTOS_ENVIO, pk__gt=ultimo_pk
+                ).only('id', 'nombre', 'email').order_by('pk')[:LOTE_ENVIO]
+            )
+            if not lote:
+                break
+            ultimo_pk = lote[-1].pk
+
+            grupos = [lote[i::hilos] for i in range(hilos) if lote[i::hilos]]
+            enviados = []
+            for pks in executor.map(lambda g: _enviar_grupo(g, reunion, limitador), grupos):
+                enviados.extend(pks)
+
+            if enviados:
+                Participante.objects.filter(pk__in=enviados).update(invitacion_enviada=True)
+                _marcar_modificada(reunion)
+            fallidos = {p.pk for p in lote} - set(enviados)
+            if fallidos:
+                Participante.objects.filter(pk__in=fallidos).update(intentos_invitacion=F('intentos_invitacion') + 1)
+            resultado['enviadas'] += len(enviados)
+            resultado['fallidas'] += len(lote) - len(enviados)
+
+    return resultado
@@ -0,0 +1,222 @@
+# ========================================
+# reuniones/jobs.py
+# Trabajos de sincronización en segundo plano (cola en base de datos)
+# ========================================
+
+import asyncio  # Worker concurrente
+from datetime import timedelta  # Detección de trabajos colgados
+
+from asgiref.sync import sync_to_async  # Reclamar trabajos desde el loop
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction  # Coalescencia segura
+from django.utils import timezone  # Fechas con zona horaria
+
+from .models import TrabajoSincronizacion
+from .zoom_service import ZoomService
+from .zoom_async import ZoomServiceAsync, cerrar_cliente
+from . import sync
+
+def encolar_sincronizacion(usuario):
+    """
+    Encola una sincronización para el usuario.
+    Si ya hay una pendiente, se devuelve esa (coalescencia). Una en
+    proceso no cuenta: pudo listar Zoom antes del cambio que motiva esta.
+
+    Args:
+        usuario: Usuario dueño de las reuniones
+
+    Returns:
+        tuple: (TrabajoSincronizacion, creado)
+    """
+    pendientes = TrabajoSincronizacion.objects.filter(usuario=usuario, estado=TrabajoSincronizacion.PENDIENTE)
+    while True:
+        pendiente = pendientes.first()
+        if pendiente:
+            return pendiente, False
+        try:
+            with transaction.atomic():
+                return TrabajoSincronizacion.objects.create(usuario=usuario), True
+        except IntegrityError:
+            # Otra petición encoló al mismo tiempo (restricción de pendiente única);
+            # si un worker ya la tomó, no habrá pendiente y se vuelve a insertar
+            continue
+
+
+def tomar_siguiente(usuario=None):
+    """
+    Reclama el trabajo pendiente más antiguo.
+    El UPDATE condicionado al estado garantiza que dos workers no tomen
+    el mismo trabajo.
+
+    Args:
+        usuario: Solo trabajos de este usuario (None = todos)
+
+    Returns:
+        TrabajoSincronizacion | None
+    """
+    pendientes = TrabajoSincronizacion.objects.filter(estado=TrabajoSincronizacion.PENDIENTE)
+    if usuario is not None:
+        pendientes = pendientes.filter(usuario=usuario)
+    while True:
+        trabajo = pendientes.order_by('creado').first()
+        if trabajo is None:
+            return None
+
+        tomado = TrabajoSincronizacion.objects.filter(
+            pk=trabajo.pk, estado=TrabajoSincronizacion.PENDIENTE
+        ).update(estado=TrabajoSincronizacion.EN_PROCESO, iniciado=timezone.now())
+        if tomado:
+            trabajo.refresh_from_db()
+            return trabajo
+
+
+def ejecutar(trabajo):
+    """
+    Ejecuta un trabajo ya reclamado, guardando el progreso tras cada lote.
+    El worker es otro proceso: lee los tokens de la BD y se coordina con el
+    servidor web por la caché compartida (CACHES; ver checks.py).
+
+    Args:
+        trabajo: TrabajoSincronizacion en estado 'en_proceso'
+    """
+    def progreso(parcial):
+        TrabajoSincronizacion.objects.filter(pk=trabajo.pk).update(
+            procesadas=parcial['insertadas'] + parcial['actualizadas'] + parcial['sin_cambios'],
+            insertadas=parcial['insertadas'],
+            actualizadas=parcial['actualizadas'],
+            sin_cambios=parcial['sin_cambios'],
+        )
+
+    try:
+        zoom_service = ZoomService(trabajo.usuario_id)
+        meetings = zoom_service.iterar_reuniones(prefetch=True)
+        resultado = sync.sincronizar_reuniones(meetings, trabajo.usuario, progreso=progreso)
+        progreso(resultado)
+        TrabajoSincronizacion.objects.filter(pk=trabajo.pk).update(
+            estado=TrabajoSincronizacion.COMPLETADO,
+            eliminadas=resultado['eliminadas'],
+            terminado=timezone.now(),
+        )
+    except Exception as e:
+        TrabajoSincronizacion.objects.filter(pk=trabajo.pk).update(
+            estado=TrabajoSincronizacion.ERROR,
+            error=str(e),
+            terminado=timezone.now(),
+        )
+
+
+async def aejecutar(trabajo):
+    """
+    Variante asíncrona de ejecutar(): descarga las páginas con el cliente
+    asíncrono, así un solo proceso puede atender muchas sincronizaciones
+    a la vez mientras espera a Zoom.
+
+    Args:
+        trabajo: TrabajoSincronizacion en estado 'en_proceso'
+    """
+    trabajos = TrabajoSincronizacion.objects.filter(pk=trabajo.pk)
+
+    async def progreso(parcial):
+        await trabajos.aupdate(
+            procesadas=parcial['insertadas'] + parcial['actualizadas'] + parcial['sin_cambios'],
+            insertadas=parcial['insertadas'],
+            actualizadas=parcial['actualizadas'],
+            sin_cambios=parcial['sin_cambios'],
+        )
+
+    try:
+        usuario = await User.objects.aget(pk=trabajo.usuario_id)
+        meetings = ZoomServiceAsync(usuario).aiterar_reuniones()
+        resultado = await sync.asincronizar_reuniones(meetings, usuario, progreso=progreso)
+        await progreso(resultado)
+        await trabajos.aupdate(
+            estado=TrabajoSincronizacion.COMPLETADO,
+            eliminadas=resultado['eliminadas'],
+            terminado=timezone.now(),
+        )
+    except Exception as e:
+        await trabajos.aupdate(
+            estado=TrabajoSincronizacion.ERROR,
+            error=str(e),
+            terminado=timezone.now(),
+        )
+
+
+def liberar_colgados(minutos=30):
+    """
+    Marca como error los trabajos 'en_proceso' abandonados (worker caído).
+
+    Returns:
+        int: Trabajos liberados
+    """
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return TrabajoSincronizacion.objects.filter(
+        estado=TrabajoSincronizacion.EN_PROCESO, iniciado__lt=limite
+    ).update(
+        estado=TrabajoSincronizacion.ERROR,
+        error='Trabajo abandonado por el worker',
+        terminado=timezone.now(),
+    )
+
+
+def procesar_pendientes(limite=None, usuario=None):
+    """
+    Procesa trabajos pendientes hasta vaciar la cola (o llegar al límite).
+
+    Args:
+        limite: Trabajos como máximo (None = sin límite)
+        usuario: Solo trabajos de este usuario (None = todos)
+
+    Returns:
+        int: Trabajos procesados
+    """
+    procesados = 0
+    while limite is None or procesados < limite:
+        trabajo = tomar_siguiente(usuario)
+        if trabajo is None:
+            break
+        ejecutar(trabajo)
+        procesados += 1
+    return procesados
+
+
+async def aprocesar_pendientes(concurrencia, limite=None):
+    """
+    Como procesar_pendientes(), pero con hasta `concurrencia` trabajos
+    en curso a la vez dentro de un solo event loop.
+
+    Returns:
+        int: Trabajos procesados
+    """
+    procesados = 0
+    en_curso = set()
+    try:
+        while True:
+            while len(en_curso) < concurrencia and (limite is None or procesados < limite):
+                trabajo = await sync_to_async(tomar_siguiente)()
+                if trabajo is None:
+                    break
+                en_curso.add(asyncio.ensure_future(aejecutar(trabajo)))
+                procesados += 1
+            if not en_curso:
+                return procesados
+            _, en_curso = await asyncio.wait(en_curso, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        await cerrar_cliente()
+
+
+def estado_a_dict(trabajo):
+    """ Representación JSON del estado de un trabajo. """
+    return {
+        'id': trabajo.pk,
+        'estado': trabajo.estado,
+        'procesadas': trabajo.procesadas,
+        'insertadas': trabajo.insertadas,
+        'actualizadas': trabajo.actualizadas,
+        'sin_cambios': trabajo.sin_cambios,
+        'eliminadas': trabajo.eliminadas,
+        'error': trabajo.error,
+        'creado': trabajo.creado.isoformat(),
+        'iniciado': trabajo.iniciado.isoformat() if trabajo.iniciado else None,
+        'terminado': trabajo.terminado.isoformat() if trabajo.terminado else None,
+    }
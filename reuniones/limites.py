@@ -0,0 +1,55 @@
+# ========================================
+# reuniones/limites.py
+# Limitador de tasa (token bucket) seguro entre hilos
+# ========================================
+
+import threading  # Lock del bucket
+import time  # Reloj monotónico
+
+
+class TokenBucket:
+    """
+    Token bucket clásico: `tasa` tokens por segundo con ráfagas de
+    hasta `capacidad`. Compartido entre hilos.
+    """
+
+    def __init__(self, tasa, capacidad=None):
+        self.tasa = float(tasa)
+        self.capacidad = float(capacidad if capacidad is not None else max(tasa, 1))
+        self._tokens = self.capacidad
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _rellenar(self, ahora):
+        transcurrido = ahora - self._ultimo
+        self._tokens = min(self.capacidad, self._tokens + transcurrido * self.tasa)
+        self._ultimo = ahora
+
+    def intentar(self, tokens=1):
+        """
+        Toma tokens si hay disponibles, sin esperar.
+
+        Returns:
+            float: 0 si se tomaron; si no, segundos hasta que haya suficientes
+        """
+        with self._lock:
+            self._rellenar(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.tasa
+
+    def adquirir(self, tokens=1):
+        """
+        Espera hasta poder tomar los tokens.
+
+        Returns:
+            float: Segundos esperados
+        """
+        esperado = 0.0
+        while True:
+            espera = self.intentar(tokens)
+            if not espera:
+                return esperado
+            time.sleep(espera)
+            esperado += espera
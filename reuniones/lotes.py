@@ -0,0 +1,137 @@
+# ========================================
+# reuniones/lotes.py
+# Creación de reuniones por lote (CSV), encolada en el outbox como la eliminación múltiple
+# ========================================
+
+import csv  # Lectura del archivo de reuniones
+import io  # Decodificar el archivo subido
+from datetime import datetime  # Fecha y hora de cada fila
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError  # Zona horaria de cada fila
+
+from . import conflictos, outbox
+
+MAX_FILAS = 500  # Reuniones por archivo
+ZONA_DEFECTO = 'America/Hermosillo'
+
+
+def leer_csv(archivo):
+    """
+    Lee un CSV con columnas titulo, fecha (AAAA-MM-DD), hora (HH:MM),
+    duracion y opcionalmente zona_horaria.
+
+    Args:
+        archivo: Archivo binario o de texto (p. ej. request.FILES['archivo'])
+
+    Yields:
+        dict con las columnas normalizadas
+    """
+    if not isinstance(archivo, io.TextIOBase):
+        archivo = io.TextIOWrapper(archivo, encoding='utf-8-sig', newline='')
+
+    for fila in csv.DictReader(archivo):
+        fila = {(k or '').strip().lower(): (v or '').strip() for k, v in fila.items()}
+        yield {
+            'titulo': fila.get('titulo') or fila.get('topic') or '',
+            'fecha': fila.get('fecha') or fila.get('start_date') or '',
+            'hora': fila.get('hora') or fila.get('start_time') or '',
+            'duracion': fila.get('duracion') or fila.get('duration') or '',
+            'zona_horaria': fila.get('zona_horaria') or fila.get('timezone') or ZONA_DEFECTO,
+        }
+
+
+def _validar(fila):
+    """
+    Convierte una fila en los argumentos de ZoomService.crear_reunion.
+
+    Returns:
+        tuple: (argumentos, fecha_inicio aware)
+
+    Raises:
+        ValueError: Si falta algún campo o tiene formato inválido
+    """
+    if not fila['titulo']:
+        raise ValueError('Falta el título')
+    try:
+        inicio = datetime.strptime(f"{fila['fecha']}T{fila['hora']}", '%Y-%m-%dT%H:%M')
+    except ValueError:
+        raise ValueError('Fecha u hora inválida (AAAA-MM-DD y HH:MM)')
+    try:
+        duracion = int(fila['duracion'])
+    except ValueError:
+        raise ValueError('Duración inválida')
+    if duracion <= 0:
+        raise ValueError('Duración inválida')
+    try:
+        zona = ZoneInfo(fila['zona_horaria'])
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Zona horaria desconocida: {fila['zona_horaria']}")
+
+    argumentos = {
+        'topic': fila['titulo'][:200],
+        'start_time': inicio.strftime('%Y-%m-%dT%H:%M:%S'),
+        'duration': duracion,
+        'timezone': fila['zona_horaria'],
+    }
+    return argumentos, inicio.replace(tzinfo=zona)
+
+
+def crear_reuniones(usuario, filas):
+    """
+    Valida las filas y encola en el outbox las correctas: se guardan como
+    'creando' y el worker procesar_outbox las crea en Zoom por lotes, así
+    la petición no espera a Zoom (500 filas serían minutos).
+
+    Args:
+        usuario: Creador de las reuniones
+        filas: Iterable de dicts como los de leer_csv()
+
+    Returns:
+        list: Un dict por fila con 'fila', 'titulo', 'ok' y
+              'reunion_id' o 'error' (y 'aviso' si se solapa y el modo
+              de conflictos es 'avisar')
+    """
+    modo_conflictos = conflictos.modo()
+    resultados = []
+    pendientes = []  # (resultado, argumentos, fecha_inicio)
+    aceptadas = []  # (inicio, fin, titulo) de filas anteriores del mismo archivo
+    for numero, fila in enumerate(filas, start=1):
+        if numero > MAX_FILAS:
+            resultados.append({'fila': numero, 'titulo': fila['titulo'], 'ok': False,
+                               'error': f'Se admiten {MAX_FILAS} reuniones por archivo'})
+            continue
+        resultado = {'fila': numero, 'titulo': fila['titulo'], 'ok': False}
+        resultados.append(resultado)
+        try:
+            argumentos, inicio = _validar(fila)
+        except ValueError as e:
+            resultado['error'] = str(e)
+            continue
+
+        if modo_conflictos != 'ignorar':
+            fin = conflictos.calcular_fin(inicio, argumentos['duration'])
+            solapadas = [t for i, f, t in aceptadas if i < fin and f > inicio]
+            solapadas += [r.titulo for r in conflictos.buscar_conflictos(usuario, inicio, argumentos['duration'])]
+            if solapadas:
+                texto = f"Se solapa con: {', '.join(solapadas[:conflictos.MAX_CONFLICTOS])}"
+                if modo_conflictos == 'rechazar':
+                    resultado['error'] = texto
+                    continue
+                resultado['aviso'] = texto
+            aceptadas.append((inicio, fin, argumentos['topic']))
+        pendientes.append((resultado, argumentos, inicio))
+
+    creadas = outbox.encolar_creaciones(usuario, [
+        {
+            'titulo': argumentos['topic'],
+            'fecha_inicio': inicio,
+            'duracion': argumentos['duration'],
+            'zona_horaria': argumentos['timezone'],
+            'datos_zoom': argumentos,
+        }
+        for _, argumentos, inicio in pendientes
+    ])
+    for (resultado, _, _), reunion in zip(pendientes, creadas):
+        resultado.update(ok=True, reunion_id=reunion.pk)
+
+    return resultados
+
@@ -0,0 +1,69 @@
+# ========================================
+# reuniones/management/commands/benchmark.py
+# python manage.py benchmark --salida resultados.json [--comparar base.json]
+# ========================================
+
+import json  # Resultados
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reuniones import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark de extremo a extremo (vistas de Django + Zoom local): crear, listar, '
+        'api, sincronizar y webhook. Se ejecuta sobre una BD temporal que se borra al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escenarios', default=','.join(benchmark.ESCENARIOS),
+                            help='Lista separada por comas')
+        parser.add_argument('--peticiones', type=int, default=200, help='Operaciones por escenario')
+        parser.add_argument('--concurrencia', type=int, default=8, help='Hilos cliente')
+        parser.add_argument('--latencia', type=float, default=50, help='Milisegundos por llamada a Zoom')
+        parser.add_argument('--tasa-429', type=float, default=0.0, help='Probabilidad de 429 (0-1)')
+        parser.add_argument('--reuniones', type=int, default=1000, help='Reuniones en Zoom para sincronizar')
+        parser.add_argument('--salida', help='Guardar el resultado en un archivo JSON')
+        parser.add_argument('--comparar', help='Resultado JSON anterior con el que comparar')
+        parser.add_argument('--tolerancia', type=float, default=20, help='Empeoramiento permitido (%%)')
+
+    def handle(self, *args, **options):
+        escenarios = [e.strip() for e in options['escenarios'].split(',') if e.strip()]
+        desconocidos = [e for e in escenarios if e not in benchmark.ESCENARIOS]
+        if desconocidos:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(desconocidos)}")
+
+        base = None
+        if options['comparar']:
+            with open(options['comparar'], encoding='utf-8') as archivo:
+                base = json.load(archivo)
+
+        with benchmark.bd_temporal():
+            resultado = benchmark.ejecutar(
+                escenarios,
+                peticiones=options['peticiones'],
+                concurrencia=options['concurrencia'],
+                latencia=options['latencia'] / 1000,
+                tasa_429=options['tasa_429'],
+                reuniones=options['reuniones'],
+            )
+
+        for nombre, datos in resultado['escenarios'].items():
+            self.stdout.write(
+                f"{nombre:<12} {datos['por_segundo']:>9}/s  p50 {datos['p50_ms']:>9} ms  "
+                f"p99 {datos['p99_ms']:>9} ms  {datos['errores']} errores"
+            )
+
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Resultado guardado en {options['salida']}")
+
+        if base is not None:
+            regresiones = benchmark.comparar(resultado, base, options['tolerancia'] / 100)
+            if regresiones:
+                for texto in regresiones:
+                    self.stdout.write(self.style.ERROR(f'  {texto}'))
+                raise CommandError(f'{len(regresiones)} regresiones respecto a {options["comparar"]}')
+            self.stdout.write(self.style.SUCCESS('Sin regresiones'))
@@ -0,0 +1,141 @@
+# ========================================
+# reuniones/management/commands/benchmark_asgi.py
+# Encolar reuniones vía WSGI (hilos) y ASGI (un event loop), y el outbox
+# enviándolas a Zoom en serie y con varios hilos
+# ========================================
+
+import asyncio  # Fase ASGI
+import json  # Salida opcional
+import time  # Cronómetro
+from concurrent.futures import ThreadPoolExecutor  # Workers WSGI simulados
+from datetime import date, timedelta  # Fechas de las reuniones creadas
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from reuniones import benchmark, outbox, tokens, zoom_fake
+from reuniones.benchmark import resumen
+from reuniones.models import Reunion
+from reuniones.zoom_service import HILOS_LOTE
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark de crear reuniones en dos partes. La vista crear_reunion solo '
+        'encola (no llama a Zoom): N workers WSGI síncronos frente a un solo '
+        'event loop ASGI. La llamada a Zoom la hace el worker del outbox contra '
+        'un Zoom local con latencia: en serie (1 hilo) frente a --hilos. '
+        'Se ejecuta sobre una BD temporal que se borra al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--peticiones', type=int, default=200)
+        parser.add_argument('--latencia', type=float, default=200, help='Milisegundos por llamada a Zoom')
+        parser.add_argument('--workers', type=int, default=8, help='Hilos WSGI (como gunicorn --threads)')
+        parser.add_argument('--concurrencia', type=int, default=200, help='Peticiones ASGI simultáneas')
+        parser.add_argument('--hilos', type=int, default=HILOS_LOTE, help='Llamadas simultáneas a Zoom del outbox')
+        parser.add_argument('--salida', help='Guardar el resultado en un archivo JSON')
+
+    def handle(self, *args, **options):
+        with benchmark.bd_temporal():
+            resultado = self._ejecutar(options)
+
+        for fase, nombre in (('encolar_wsgi', 'ENCOLAR WSGI'), ('encolar_asgi', 'ENCOLAR ASGI')):
+            datos = resultado[fase]
+            self.stdout.write(
+                f"{nombre}: {datos['operaciones']} peticiones en {datos['segundos']}s "
+                f"({datos['por_segundo']}/s), p50 {datos['p50_ms']} ms, "
+                f"p99 {datos['p99_ms']} ms, {datos['errores']} errores"
+            )
+        for fase, nombre in (('outbox_serie', 'OUTBOX 1 HILO'), ('outbox_concurrente', f"OUTBOX {options['hilos']} HILOS")):
+            datos = resultado[fase]
+            self.stdout.write(
+                f"{nombre}: {datos['operaciones']} envíos a Zoom en {datos['segundos']}s "
+                f"({datos['por_segundo']}/s)"
+            )
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump(resultado, archivo, indent=2)
+
+    def _ejecutar(self, options):
+        """
+        Las cuatro fases con un usuario propio contra el Zoom local (solo en
+        BD temporal). Cada fase del outbox envía lo que encoló la anterior.
+        """
+        benchmark.exigir_bd_temporal()
+        usuario, _ = User.objects.get_or_create(username='benchmark-asgi')
+        servidor, url_base = zoom_fake.iniciar(latencia=options['latencia'] / 1000)
+        zoom_fake.conectar(settings, url_base, usuario)
+        settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+
+        try:
+            resultado = {'latencia_zoom_ms': options['latencia']}
+            resultado['encolar_wsgi'] = self._fase_wsgi(usuario, options)
+            resultado['outbox_serie'] = self._fase_outbox(usuario, 1)
+            resultado['encolar_asgi'] = asyncio.run(self._fase_asgi(usuario, options))
+            resultado['outbox_concurrente'] = self._fase_outbox(usuario, options['hilos'])
+            return resultado
+        finally:
+            Reunion.objects.filter(creador=usuario).delete()
+            tokens.revocar(usuario.pk)
+            servidor.shutdown()
+
+    @staticmethod
+    def _datos(i):
+        return {
+            'topic': f'Benchmark {i}',
+            'start_date': (date(2030, 1, 1) + timedelta(days=i)).isoformat(),  # Sin solapamientos
+            'start_time': '10:00',
+            'duration': '40',
+        }
+
+    def _fase_wsgi(self, usuario, options):
+        """ Cada worker atiende una petición a la vez (la vista solo encola). """
+        url = reverse('crear_reunion')
+
+        def peticion(i):
+            cliente = Client()
+            cliente.force_login(usuario)
+            inicio = time.perf_counter()
+            response = cliente.post(url, self._datos(i))
+            return time.perf_counter() - inicio, response.status_code == 302
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            resultados = list(executor.map(peticion, range(options['peticiones'])))
+        duracion = time.perf_counter() - inicio
+        return resumen([r[0] for r in resultados], sum(1 for r in resultados if not r[1]), duracion)
+
+    @staticmethod
+    def _fase_outbox(usuario, hilos):
+        """ El worker envía a Zoom (con latencia) lo que encoló la fase anterior. """
+        inicio = time.perf_counter()
+        procesadas = outbox.procesar_pendientes(hilos=hilos, usuario=usuario)
+        duracion = time.perf_counter() - inicio
+        return {
+            'operaciones': procesadas,
+            'segundos': round(duracion, 3),
+            'por_segundo': round(procesadas / duracion, 1) if duracion else 0.0,
+        }
+
+    async def _fase_asgi(self, usuario, options):
+        """ Un solo proceso y un solo loop atienden todas las peticiones (la vista solo encola). """
+        url = reverse('crear_reunion')
+        cliente = AsyncClient()
+        await cliente.aforce_login(usuario)
+        limite = asyncio.Semaphore(options['concurrencia'])
+
+        async def peticion(i):
+            async with limite:
+                inicio = time.perf_counter()
+                # Días distintos a los de la fase WSGI
+                response = await cliente.post(url, self._datos(options['peticiones'] + i))
+                return time.perf_counter() - inicio, response.status_code == 302
+
+        inicio = time.perf_counter()
+        resultados = await asyncio.gather(*(peticion(i) for i in range(options['peticiones'])))
+        duracion = time.perf_counter() - inicio
+        return resumen([r[0] for r in resultados], sum(1 for r in resultados if not r[1]), duracion)
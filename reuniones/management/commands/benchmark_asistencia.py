@@ -0,0 +1,91 @@
+# ========================================
+# reuniones/management/commands/benchmark_asistencia.py
+# Mide eventos/segundo del motor de asistencia (datos sintéticos, se revierten)
+# ========================================
+
+import random  # Eventos sintéticos
+import time  # Cronómetro
+from datetime import timedelta  # Fin de las reuniones sintéticas
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from reuniones import asistencia
+from reuniones.models import Reunion, Participante
+from reuniones.webhooks import LOTE_EVENTOS
+
+
+class _Revertir(Exception):
+    """ Fuerza el rollback de los datos sintéticos. """
+
+
+class Command(BaseCommand):
+    help = 'Benchmark de registrar_asistencias con datos sintéticos (no deja datos en la BD)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--eventos', type=int, default=20000)
+        parser.add_argument('--reuniones', type=int, default=50)
+        parser.add_argument('--participantes', type=int, default=200, help='Por reunión')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._ejecutar(options)
+                raise _Revertir()
+        except _Revertir:
+            pass
+
+    def _ejecutar(self, options):
+        usuario = User.objects.create(username=f'benchmark-{time.time_ns()}')
+        Reunion.objects.bulk_create([
+            Reunion(
+                titulo=f'Benchmark {i}',
+                zoom_meeting_id=f'bench-{time.time_ns()}-{i}',
+                join_url='https://zoom.us/j/0',
+                start_url='https://zoom.us/s/0',
+                fecha_inicio=timezone.now(),
+                duracion=60,
+                fecha_fin=timezone.now() + timedelta(minutes=60),
+                creador=usuario,
+            )
+            for i in range(options['reuniones'])
+        ])
+        reuniones = list(Reunion.objects.filter(creador=usuario))
+
+        participantes = []
+        for reunion in reuniones:
+            for j in range(options['participantes']):
+                participante = Participante(
+                    reunion=reunion, nombre=f'Participante {j}', email=f'p{j}@example.com'
+                )
+                participante.normalizar()
+                participantes.append(participante)
+        Participante.objects.bulk_create(participantes, batch_size=2000)
+
+        eventos = [
+            {
+                'event': 'meeting.participant_joined',
+                'payload': {'object': {
+                    'id': reunion.zoom_meeting_id,
+                    'participant': {'user_name': f'Participante {j}', 'email': f'p{j}@example.com'},
+                }},
+            }
+            for reunion, j in (
+                (random.choice(reuniones), random.randrange(options['participantes']))
+                for _ in range(options['eventos'])
+            )
+        ]
+
+        asistencia.limpiar_cache()
+        inicio = time.perf_counter()
+        marcados = 0
+        for i in range(0, len(eventos), LOTE_EVENTOS):
+            marcados += asistencia.registrar_asistencias(eventos[i:i + LOTE_EVENTOS])
+        duracion = time.perf_counter() - inicio
+
+        self.stdout.write(
+            f'{len(eventos)} eventos en {duracion:.3f}s '
+            f'({len(eventos) / duracion:,.0f} eventos/s), {marcados} asistencias marcadas'
+        )
@@ -0,0 +1,34 @@
+# ========================================
+# reuniones/management/commands/crear_reuniones_lote.py
+# python manage.py crear_reuniones_lote <usuario> reuniones.csv
+# ========================================
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from reuniones import lotes
+
+
+class Command(BaseCommand):
+    help = 'Encola reuniones para Zoom desde un CSV (titulo, fecha, hora, duracion, zona_horaria); las crea procesar_outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('usuario', help='Username del creador')
+        parser.add_argument('archivo', help='Ruta del CSV')
+
+    def handle(self, *args, **options):
+        try:
+            usuario = User.objects.get(username=options['usuario'])
+        except User.DoesNotExist:
+            raise CommandError(f"No existe el usuario {options['usuario']}")
+
+        with open(options['archivo'], encoding='utf-8-sig', newline='') as archivo:
+            resultados = lotes.crear_reuniones(usuario, list(lotes.leer_csv(archivo)))
+
+        creadas = sum(1 for r in resultados if r['ok'])
+        self.stdout.write(f"{creadas} registradas (procesar_outbox las crea en Zoom), {len(resultados) - creadas} con error")
+        for r in resultados:
+            if not r['ok']:
+                self.stdout.write(self.style.WARNING(f"  fila {r['fila']} ({r['titulo']!r}): {r['error']}"))
+            elif r.get('aviso'):
+                self.stdout.write(f"  fila {r['fila']} ({r['titulo']!r}): {r['aviso']}")
@@ -0,0 +1,41 @@
+# ========================================
+# reuniones/management/commands/enviar_invitaciones.py
+# Worker de invitaciones: python manage.py enviar_invitaciones [--reunion ID] [--una-vez]
+# ========================================
+
+import time  # Espera entre consultas
+
+from django.core.management.base import BaseCommand
+
+from reuniones import invitaciones
+
+
+class Command(BaseCommand):
+    help = (
+        'Envía las invitaciones pendientes (invitacion_enviada=False) de las reuniones '
+        'que ya tienen enlace de Zoom; las que el outbox no ha creado esperan'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reunion', type=int, help='Solo esta reunión (implica --una-vez)')
+        parser.add_argument('--una-vez', action='store_true', help='Envía lo pendiente y termina')
+        parser.add_argument('--intervalo', type=float, default=5.0, help='Segundos entre consultas')
+        parser.add_argument('--hilos', type=int, default=invitaciones.HILOS_ENVIO)
+        parser.add_argument('--por-segundo', type=float, default=invitaciones.CORREOS_POR_SEGUNDO)
+
+    def handle(self, *args, **options):
+        while True:
+            reuniones = invitaciones.reuniones_con_pendientes()
+            if options['reunion']:
+                reuniones = reuniones.filter(pk=options['reunion'])
+
+            for reunion in reuniones:
+                resultado = invitaciones.enviar_invitaciones(
+                    reunion, hilos=options['hilos'], por_segundo=options['por_segundo']
+                )
+                self.stdout.write(
+                    f"{reunion.titulo}: {resultado['enviadas']} enviadas, {resultado['fallidas']} fallidas"
+                )
+            if options['una_vez'] or options['reunion']:
+                break
+            time.sleep(options['intervalo'])
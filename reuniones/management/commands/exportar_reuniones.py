@@ -0,0 +1,40 @@
+# ========================================
+# reuniones/management/commands/exportar_reuniones.py
+# Exporta reuniones y asistencia: python manage.py exportar_reuniones --formato csv
+# ========================================
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from reuniones import exportacion
+
+
+class Command(BaseCommand):
+    help = 'Exporta reuniones con asistencia de participantes en CSV o NDJSON (streaming)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=list(exportacion.FORMATOS), default='csv')
+        parser.add_argument('--usuario', help='Username; si se omite se exportan todas las reuniones')
+        parser.add_argument('--salida', help='Archivo destino (por defecto stdout)')
+        parser.add_argument('--chunk-size', type=int, default=exportacion.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        usuario = None
+        if options['usuario']:
+            try:
+                usuario = User.objects.get(username=options['usuario'])
+            except User.DoesNotExist:
+                raise CommandError(f"No existe el usuario {options['usuario']}")
+
+        lineas = exportacion.generar(
+            options['formato'],
+            exportacion.reuniones_para_exportar(usuario),
+            options['chunk_size'],
+        )
+
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8', newline='') as archivo:
+                archivo.writelines(lineas)
+        else:
+            for linea in lineas:
+                self.stdout.write(linea, ending='')
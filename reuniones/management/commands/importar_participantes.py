@@ -0,0 +1,38 @@
+# ========================================
+# reuniones/management/commands/importar_participantes.py
+# python manage.py importar_participantes <reunion_id> participantes.csv [--enviar]
+# ========================================
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reuniones import invitaciones
+from reuniones.models import Reunion
+
+
+class Command(BaseCommand):
+    help = 'Importa participantes desde un CSV (nombre, email) y opcionalmente envía invitaciones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('reunion_id', type=int)
+        parser.add_argument('archivo', help='Ruta del CSV')
+        parser.add_argument('--enviar', action='store_true', help='Enviar invitaciones al terminar')
+
+    def handle(self, *args, **options):
+        try:
+            reunion = Reunion.objects.get(pk=options['reunion_id'])
+        except Reunion.DoesNotExist:
+            raise CommandError(f"No existe la reunión {options['reunion_id']}")
+
+        with open(options['archivo'], encoding='utf-8-sig', newline='') as archivo:
+            resultado = invitaciones.importar_participantes(reunion, invitaciones.leer_csv(archivo))
+
+        self.stdout.write(
+            f"{resultado['creados']} creados, {resultado['duplicados']} duplicados, "
+            f"{len(resultado['invalidos'])} inválidos"
+        )
+        for email in resultado['invalidos'][:20]:
+            self.stdout.write(self.style.WARNING(f'  inválido: {email!r}'))
+
+        if options['enviar']:
+            envio = invitaciones.enviar_invitaciones(reunion)
+            self.stdout.write(f"{envio['enviadas']} invitaciones enviadas, {envio['fallidas']} fallidas")
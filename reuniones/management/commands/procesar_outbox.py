@@ -0,0 +1,36 @@
+# ========================================
+# reuniones/management/commands/procesar_outbox.py
+# Worker del outbox de Zoom: python manage.py procesar_outbox
+# ========================================
+
+import time  # Espera entre consultas a la cola
+
+from django.core.management.base import BaseCommand
+
+from reuniones import outbox
+from reuniones.zoom_service import HILOS_LOTE
+
+
+class Command(BaseCommand):
+    help = 'Envía a Zoom por lotes las creaciones y eliminaciones encoladas (outbox)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help='Vacía la cola y termina')
+        parser.add_argument('--intervalo', type=float, default=1.0, help='Segundos entre consultas a la cola')
+        parser.add_argument('--lote', type=int, default=outbox.LOTE_OPERACIONES, help='Operaciones por lote')
+        parser.add_argument('--hilos', type=int, default=HILOS_LOTE, help='Llamadas simultáneas a Zoom')
+
+    def handle(self, *args, **options):
+        liberadas = outbox.liberar_colgadas()
+        if liberadas:
+            self.stdout.write(self.style.WARNING(
+                f'{liberadas} operaciones abandonadas (eliminaciones a la cola, creaciones con error)'
+            ))
+
+        while True:
+            procesadas = outbox.procesar_pendientes(options['lote'], options['hilos'])
+            if procesadas:
+                self.stdout.write(f'{procesadas} operaciones enviadas a Zoom')
+            if options['una_vez']:
+                break
+            time.sleep(options['intervalo'])
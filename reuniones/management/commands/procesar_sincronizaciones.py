@@ -0,0 +1,37 @@
+# ========================================
+# reuniones/management/commands/procesar_sincronizaciones.py
+# Worker de sincronizaciones: python manage.py procesar_sincronizaciones
+# ========================================
+
+import asyncio  # Modo concurrente
+import time  # Espera entre consultas a la cola
+
+from django.core.management.base import BaseCommand
+
+from reuniones import jobs
+
+
+class Command(BaseCommand):
+    help = 'Procesa la cola de sincronizaciones con Zoom'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help='Vacía la cola y termina')
+        parser.add_argument('--intervalo', type=float, default=2.0, help='Segundos entre consultas a la cola')
+        parser.add_argument('--concurrencia', type=int, default=1,
+                            help='Sincronizaciones simultáneas (>1 usa el cliente asíncrono)')
+
+    def handle(self, *args, **options):
+        liberados = jobs.liberar_colgados()
+        if liberados:
+            self.stdout.write(self.style.WARNING(f'{liberados} trabajos abandonados marcados como error'))
+
+        while True:
+            if options['concurrencia'] > 1:
+                procesados = asyncio.run(jobs.aprocesar_pendientes(options['concurrencia']))
+            else:
+                procesados = jobs.procesar_pendientes()
+            if procesados:
+                self.stdout.write(f'{procesados} sincronizaciones procesadas')
+            if options['una_vez']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,42 @@
+# ========================================
+# reuniones/management/commands/procesar_webhooks.py
+# Consumidor de eventos de webhook: python manage.py procesar_webhooks
+# ========================================
+
+import time  # Espera entre consultas a la cola
+
+from django.core.management.base import BaseCommand
+
+from reuniones import webhooks
+
+
+class Command(BaseCommand):
+    help = 'Procesa por lotes los eventos de webhook de Zoom encolados'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--una-vez', action='store_true', help='Vacía la cola y termina')
+        parser.add_argument('--intervalo', type=float, default=1.0, help='Segundos entre consultas a la cola')
+        parser.add_argument(
+            '--purgar-dias', type=int, default=webhooks.RETENCION_DIAS,
+            help='Borra eventos terminados (y sus claves de deduplicación) más antiguos'
+        )
+        parser.add_argument(
+            '--purgar-cada', type=float, default=webhooks.PURGA_CADA,
+            help='Segundos entre purgas mientras el consumidor sigue corriendo'
+        )
+
+    def handle(self, *args, **options):
+        proxima_purga = 0  # Purgar al arrancar y luego cada --purgar-cada segundos
+        while True:
+            if time.monotonic() >= proxima_purga:
+                borrados = webhooks.purgar_procesados(options['purgar_dias'])
+                if borrados:
+                    self.stdout.write(f'{borrados} eventos antiguos purgados')
+                proxima_purga = time.monotonic() + options['purgar_cada']
+
+            procesados = webhooks.procesar_pendientes()
+            if procesados:
+                self.stdout.write(f'{procesados} eventos procesados')
+            if options['una_vez']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,62 @@
+# ========================================
+# reuniones/management/commands/servidor_zoom_falso.py
+# Zoom local para desarrollo: python manage.py servidor_zoom_falso --puerto 9000
+# ========================================
+
+import time  # Mantener el proceso vivo
+
+from django.core.management.base import BaseCommand
+
+from reuniones import zoom_fake
+
+
+class Command(BaseCommand):
+    help = (
+        'Levanta un servidor que imita la API de Zoom (OAuth, /users/me, reuniones) '
+        'con latencia y 429 configurables, y opcionalmente emite webhooks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--puerto', type=int, default=9000)
+        parser.add_argument('--latencia', type=float, default=0, help='Milisegundos por llamada')
+        parser.add_argument('--tasa-429', type=float, default=0.0, help='Probabilidad de 429 (0-1)')
+        parser.add_argument('--reuniones', type=int, default=0, help='Reuniones sembradas al arrancar')
+        parser.add_argument('--webhook-url', help='Endpoint de la app que recibe los eventos')
+        parser.add_argument('--webhook-secreto', default='', help='ZOOM_WEBHOOK_SECRET_TOKEN de la app')
+        parser.add_argument('--eventos-por-segundo', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        servidor, url_base = zoom_fake.iniciar(
+            puerto=options['puerto'],
+            latencia=options['latencia'] / 1000,
+            tasa_429=options['tasa_429'],
+            host=options['host'],
+        )
+        estado = servidor.RequestHandlerClass.estado
+        if options['reuniones']:
+            estado.sembrar(options['reuniones'])
+
+        self.stdout.write(f'Zoom falso escuchando en {url_base}')
+        self.stdout.write('Variables para la app (.env):')
+        self.stdout.write(f'  ZOOM_API_BASE_URL={url_base}/v2')
+        self.stdout.write(f'  ZOOM_OAUTH_TOKEN_URL={url_base}/oauth/token')
+        self.stdout.write(f'  ZOOM_OAUTH_AUTHORIZE_URL={url_base}/oauth/authorize')
+
+        detener = None
+        if options['webhook_url']:
+            detener = zoom_fake.iniciar_emisor(
+                estado, options['webhook_url'], options['webhook_secreto'], options['eventos_por_segundo']
+            )
+            self.stdout.write(f"Emitiendo webhooks a {options['webhook_url']}")
+
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if detener:
+                detener.set()
+            servidor.shutdown()
+            self.stdout.write(f'Llamadas recibidas: {dict(estado.llamadas)}')
@@ -0,0 +1,325 @@
+# ========================================
+# reuniones/metricas.py
+# Instrumentación en proceso: latencia por vista, consultas ORM y llamadas a Zoom
+# ========================================
+
+import contextvars  # Contador de consultas de la petición en curso (sync y async)
+import re  # Endpoints de Zoom sin IDs
+import threading  # Agregados compartidos entre hilos
+import time  # Cronómetro
+from bisect import bisect_left  # Cubeta del histograma
+from urllib.parse import urlparse  # Ruta del endpoint
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction  # Middleware híbrido
+
+# Límites superiores de las cubetas (segundos / número de consultas)
+CUBETAS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CUBETAS_CONSULTAS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+_IDS_ZOOM = re.compile(r'/(users|meetings)/(?!me(?:/|$))[^/]+')
+_FIN = object()  # Fin del cuerpo de una StreamingHttpResponse
+
+_lock = threading.Lock()
+_series = {}  # (nombre, etiquetas) -> Histograma | [contador]
+_peticion = contextvars.ContextVar('reuniones_metricas_peticion', default=None)  # [consultas, segundos]
+
+
+class Histograma:
+    """ Cubetas no acumuladas + suma + total; se acumulan al exponer. """
+
+    __slots__ = ('cubetas', 'limites', 'suma', 'total')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.cubetas = [0] * (len(limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.cubetas[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+def _observar(nombre, etiquetas, valor, limites):
+    """ Suma una observación al histograma (llamar con _lock tomado). """
+    clave = (nombre, etiquetas)
+    serie = _series.get(clave)
+    if serie is None:
+        serie = _series[clave] = Histograma(limites)
+    serie.observar(valor)
+
+
+def _incrementar(nombre, etiquetas):
+    """ Suma 1 al contador (llamar con _lock tomado). """
+    clave = (nombre, etiquetas)
+    serie = _series.get(clave)
+    if serie is None:
+        serie = _series[clave] = [0]
+    serie[0] += 1
+
+
+def reiniciar():
+    """ Vacía todos los agregados (tests y benchmarks). """
+    with _lock:
+        _series.clear()
+
+
+# =====================================
+# CONSULTAS ORM
+# =====================================
+
+def _contar_consulta(execute, sql, params, many, context):
+    """ execute_wrapper: suma la consulta a la petición en curso (si la hay). """
+    actual = _peticion.get()
+    if actual is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        actual[0] += 1
+        actual[1] += time.perf_counter() - inicio
+
+
+def instrumentar_conexion(sender, connection, **kwargs):
+    """
+    Receiver de connection_created: instala el contador en cada conexión.
+    Sirve también para las vistas async, porque sync_to_async copia el
+    contexto (y con él el contador de la petición) al hilo de la BD.
+    """
+    if _contar_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_contar_consulta)
+
+
+# =====================================
+# PETICIONES (middleware)
+# =====================================
+
+def registrar_peticion(vista, metodo, status, segundos, consultas, segundos_bd):
+    """ Agrega una petición atendida. """
+    etiquetas = (('vista', vista), ('metodo', metodo))
+    with _lock:
+        _observar('reuniones_peticion_segundos', etiquetas, segundos, CUBETAS_SEGUNDOS)
+        _observar('reuniones_peticion_consultas', etiquetas, consultas, CUBETAS_CONSULTAS)
+        _observar('reuniones_peticion_bd_segundos', etiquetas, segundos_bd, CUBETAS_SEGUNDOS)
+        _incrementar('reuniones_peticiones_total', etiquetas + (('status', str(status)),))
+
+
+class MetricasMiddleware:
+    """
+    Mide cada petición: latencia total, consultas ORM y su tiempo.
+    La vista se identifica por el nombre de la URL (cardinalidad acotada).
+    Va primero en MIDDLEWARE para incluir al resto de middlewares.
+    En una StreamingHttpResponse el cuerpo se genera después de devolverla,
+    así que se mide (tiempo y consultas) hasta enviar el último trozo.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.es_async = iscoroutinefunction(get_response)
+        if self.es_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.es_async:
+            return self._acall(request)
+        contador = [0, 0.0]
+        token = _peticion.set(contador)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _peticion.reset(token)
+        self._registrar(request, response, inicio, contador)
+        return response
+
+    async def _acall(self, request):
+        contador = [0, 0.0]
+        token = _peticion.set(contador)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _peticion.reset(token)
+        self._registrar(request, response, inicio, contador)
+        return response
+
+    @staticmethod
+    def _registrar(request, response, inicio, contador):
+        ruta = getattr(request, 'resolver_match', None)
+        vista = (ruta.view_name or ruta._func_path) if ruta else 'sin_ruta'
+
+        def registrar():
+            registrar_peticion(vista, request.method, response.status_code,
+                               time.perf_counter() - inicio, contador[0], contador[1])
+
+        if not response.streaming:
+            registrar()
+        elif response.is_async:
+            response.streaming_content = _amedir_contenido(response.streaming_content, contador, registrar)
+        else:
+            response.streaming_content = _medir_contenido(response.streaming_content, contador, registrar)
+
+
+def _medir_contenido(contenido, contador, registrar):
+    """
+    Envuelve el cuerpo de una StreamingHttpResponse: cuenta las consultas
+    de cada trozo en la petición y la registra al terminar (o al cerrarse
+    si el cliente se desconecta).
+    """
+    try:
+        iterador = iter(contenido)
+        while True:
+            token = _peticion.set(contador)
+            try:
+                trozo = next(iterador, _FIN)
+            finally:
+                _peticion.reset(token)
+            if trozo is _FIN:
+                return
+            yield trozo
+    finally:
+        registrar()
+
+
+async def _amedir_contenido(contenido, contador, registrar):
+    """ Igual que _medir_contenido(), para cuerpos asíncronos. """
+    try:
+        iterador = aiter(contenido)
+        while True:
+            token = _peticion.set(contador)
+            try:
+                trozo = await anext(iterador, _FIN)
+            finally:
+                _peticion.reset(token)
+            if trozo is _FIN:
+                return
+            yield trozo
+    finally:
+        registrar()
+
+
+# =====================================
+# LLAMADAS A ZOOM
+# =====================================
+
+def endpoint_zoom(url):
+    """ '/v2/meetings/123' -> '/v2/meetings/{id}' (etiqueta sin IDs). """
+    return _IDS_ZOOM.sub(r'/\1/{id}', urlparse(url).path)
+
+
+def registrar_zoom(metodo, url, status, segundos):
+    """ Agrega un intento HTTP a Zoom (cada reintento cuenta aparte). """
+    etiquetas = (('metodo', metodo), ('endpoint', endpoint_zoom(url)), ('status', str(status)))
+    with _lock:
+        _observar('zoom_llamada_segundos', etiquetas, segundos, CUBETAS_SEGUNDOS)
+
+
+def medir_zoom(metodo, url, enviar):
+    """
+    Ejecuta `enviar()` (un intento HTTP) y registra su duración y status.
+    Los errores de red se registran con status 'error'.
+    """
+    inicio = time.perf_counter()
+    status = 'error'
+    try:
+        response = enviar()
+        status = response.status_code
+        return response
+    finally:
+        registrar_zoom(metodo, url, status, time.perf_counter() - inicio)
+
+
+async def amedir_zoom(metodo, url, enviar):
+    """ Igual que medir_zoom(), para `enviar()` que devuelve un awaitable. """
+    inicio = time.perf_counter()
+    status = 'error'
+    try:
+        response = await enviar()
+        status = response.status_code
+        return response
+    finally:
+        registrar_zoom(metodo, url, status, time.perf_counter() - inicio)
+
+
+# =====================================
+# EXPOSICIÓN (formato de texto de Prometheus)
+# =====================================
+
+AYUDA = {
+    'reuniones_peticion_segundos': ('histogram', 'Latencia de las peticiones por vista'),
+    'reuniones_peticion_consultas': ('histogram', 'Consultas ORM por petición'),
+    'reuniones_peticion_bd_segundos': ('histogram', 'Tiempo en consultas ORM por petición'),
+    'reuniones_peticiones_total': ('counter', 'Peticiones atendidas por vista y status'),
+    'zoom_llamada_segundos': ('histogram', 'Duración de cada llamada HTTP a Zoom'),
+}
+
+# Valores instantáneos de ZoomService.metricas(); el resto son contadores que solo crecen
+GAUGES_ZOOM = {'en_cola', 'pools'}
+
+
+def _etiquetas(pares):
+    if not pares:
+        return ''
+    texto = ','.join(
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pares
+    )
+    return '{' + texto + '}'
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def exposicion():
+    """
+    Agregados del proceso en formato de texto de Prometheus (0.0.4),
+    más los contadores del transporte y del programador de Zoom.
+
+    Returns:
+        str
+    """
+    from .zoom_service import ZoomService  # Evita la importación circular
+
+    with _lock:
+        copia = {
+            clave: (serie[0] if isinstance(serie, list)
+                    else (serie.limites, list(serie.cubetas), serie.suma, serie.total))
+            for clave, serie in _series.items()
+        }
+
+    lineas = []
+    for nombre in sorted({nombre for nombre, _ in copia}):
+        tipo, ayuda = AYUDA.get(nombre, ('untyped', nombre))
+        lineas.append(f'# HELP {nombre} {ayuda}')
+        lineas.append(f'# TYPE {nombre} {tipo}')
+        for (serie, etiquetas), valor in sorted(copia.items()):
+            if serie != nombre:
+                continue
+            if tipo != 'histogram':
+                lineas.append(f'{nombre}{_etiquetas(etiquetas)} {valor}')
+                continue
+            limites, cubetas, suma, total = valor
+            acumulado = 0
+            for limite, cantidad in zip(limites, cubetas):
+                acumulado += cantidad
+                lineas.append(f'{nombre}_bucket{_etiquetas(etiquetas + (("le", _numero(limite)),))} {acumulado}')
+            lineas.append(f'{nombre}_bucket{_etiquetas(etiquetas + (("le", "+Inf"),))} {total}')
+            lineas.append(f'{nombre}_sum{_etiquetas(etiquetas)} {_numero(suma)}')
+            lineas.append(f'{nombre}_count{_etiquetas(etiquetas)} {total}')
+
+    for clave, valor in sorted(ZoomService.metricas().items()):
+        if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            if clave in GAUGES_ZOOM:
+                nombre, tipo = f'zoom_{clave}', 'gauge'
+            else:
+                nombre, tipo = f'zoom_{clave}_total', 'counter'
+            lineas.append(f'# TYPE {nombre} {tipo}')
+            lineas.append(f'{nombre} {_numero(valor)}')
+
+    return '\n'.join(lineas) + '\n'
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.10 on 2026-10-16 23:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reuniones', '0002_sincronizacion_incremental'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrabajoSincronizacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso'), ('completado', 'Completado'), ('error', 'Error')], default='pendiente', max_length=20)),
+                ('procesadas', models.IntegerField(default=0)),
+                ('insertadas', models.IntegerField(default=0)),
+                ('actualizadas', models.IntegerField(default=0)),
+                ('sin_cambios', models.IntegerField(default=0)),
+                ('eliminadas', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('iniciado', models.DateTimeField(blank=True, null=True)),
+                ('terminado', models.DateTimeField(blank=True, null=True)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trabajos_sincronizacion', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Trabajos de sincronización',
+                'ordering': ['creado'],
+                'indexes': [models.Index(fields=['estado', 'creado'], name='reuniones_t_estado_00313c_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('estado', 'pendiente')), fields=('usuario',), name='sincronizacion_pendiente_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.10 on 2026-10-16 23:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reuniones', '0003_trabajos_sincronizacion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoWebhook',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('evento', models.CharField(max_length=100)),
+                ('cuerpo', models.TextField()),
+                ('recibido', models.DateTimeField(auto_now_add=True)),
+                ('procesado', models.BooleanField(default=False)),
+                ('intentos', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Eventos de webhook',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['procesado', 'id'], name='reuniones_e_procesa_a18831_idx')],
+            },
+        ),
+    ]
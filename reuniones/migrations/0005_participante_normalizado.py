@@ -0,0 +1,51 @@
+# Generated by Django 5.2.10 on 2026-10-16 23:58
+
+from django.conf import settings
+import unicodedata
+
+from django.db import migrations, models
+
+
+def rellenar_normalizados(apps, schema_editor):
+    Participante = apps.get_model('reuniones', 'Participante')
+    pendientes = []
+    for participante in Participante.objects.all().iterator(chunk_size=2000):
+        sin_acentos = unicodedata.normalize('NFKD', participante.nombre or '').encode('ascii', 'ignore').decode()
+        participante.nombre_normalizado = ' '.join(sin_acentos.lower().split())[:100]
+        participante.email_normalizado = (participante.email or '').strip().lower()
+        pendientes.append(participante)
+        if len(pendientes) >= 2000:
+            Participante.objects.bulk_update(pendientes, ['nombre_normalizado', 'email_normalizado'])
+            pendientes = []
+    if pendientes:
+        Participante.objects.bulk_update(pendientes, ['nombre_normalizado', 'email_normalizado'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reuniones', '0004_eventos_webhook'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participante',
+            name='email_normalizado',
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='participante',
+            name='nombre_normalizado',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='participante',
+            index=models.Index(fields=['reunion', 'nombre_normalizado'], name='reuniones_p_reunion_311671_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participante',
+            index=models.Index(fields=['reunion', 'email_normalizado'], name='reuniones_p_reunion_976ed0_idx'),
+        ),
+        migrations.RunPython(rellenar_normalizados, migrations.RunPython.noop),
+    ]
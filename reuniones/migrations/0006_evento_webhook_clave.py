@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-16 23:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reuniones', '0005_participante_normalizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventowebhook',
+            name='clave',
+            field=models.CharField(max_length=64, null=True, unique=True),
+        ),
+    ]
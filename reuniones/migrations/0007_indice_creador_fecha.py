@@ -0,0 +1,19 @@
+# Generated by Django 5.2.10 on 2026-10-17 00:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reuniones', '0006_evento_webhook_clave'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reunion',
+            index=models.Index(fields=['creador', '-fecha_inicio', '-id'], name='reunion_creador_fecha_idx'),
+        ),
+    ]
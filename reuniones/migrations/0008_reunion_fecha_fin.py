@@ -0,0 +1,49 @@
+# Generated by Django 5.2.10 on 2026-10-17 00:00
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def rellenar_fecha_fin(apps, schema_editor):
+    Reunion = apps.get_model('reuniones', 'Reunion')
+    pendientes = []
+    for reunion in Reunion.objects.only('id', 'fecha_inicio', 'duracion').iterator(chunk_size=2000):
+        reunion.fecha_fin = reunion.fecha_inicio + timedelta(minutes=reunion.duracion)
+        pendientes.append(reunion)
+        if len(pendientes) >= 2000:
+            Reunion.objects.bulk_update(pendientes, ['fecha_fin'])
+            pendientes = []
+    if pendientes:
+        Reunion.objects.bulk_update(pendientes, ['fecha_fin'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reuniones', '0007_indice_creador_fecha'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reunion',
+            name='fecha_fin',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(rellenar_fecha_fin, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='reunion',
+            name='fecha_fin',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='reunion',
+            index=models.Index(fields=['creador', 'fecha_fin'], name='reunion_creador_fin_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reunion',
+            index=models.Index(fields=['creador', 'duracion'], name='reunion_creador_duracion_idx'),
+        ),
+    ]
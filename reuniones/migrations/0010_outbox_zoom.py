@@ -0,0 +1,63 @@
+# Generated by Django 5.2.10 on 2026-10-17 00:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reuniones', '0009_token_zoom'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reunion',
+            name='error_zoom',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='reunion',
+            name='estado_zoom',
+            field=models.CharField(choices=[('sincronizada', 'Sincronizada'), ('creando', 'Creando en Zoom'), ('eliminando', 'Eliminando en Zoom'), ('error', 'Error con Zoom')], default='sincronizada', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='reunion',
+            name='join_url',
+            field=models.URLField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='reunion',
+            name='start_url',
+            field=models.URLField(blank=True),
+        ),
+        migrations.AlterField(
+            model_name='reunion',
+            name='zoom_meeting_id',
+            field=models.CharField(blank=True, max_length=50, null=True, unique=True),
+        ),
+        migrations.CreateModel(
+            name='OperacionZoom',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('crear', 'Crear'), ('eliminar', 'Eliminar')], max_length=10)),
+                ('datos', models.JSONField(blank=True, default=dict)),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso'), ('error', 'Error')], default='pendiente', max_length=20)),
+                ('intentos', models.IntegerField(default=0)),
+                ('siguiente_intento', models.DateTimeField(default=django.utils.timezone.now)),
+                ('error', models.TextField(blank=True)),
+                ('lote', models.CharField(blank=True, max_length=32)),
+                ('tomado', models.DateTimeField(blank=True, null=True)),
+                ('creado', models.DateTimeField(auto_now_add=True)),
+                ('reunion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='operaciones_zoom', to='reuniones.reunion')),
+            ],
+            options={
+                'verbose_name': 'Operación con Zoom',
+                'verbose_name_plural': 'Operaciones con Zoom',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['estado', 'siguiente_intento'], name='reuniones_o_estado_bf2e82_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('estado__in', ['pendiente', 'en_proceso'])), fields=('reunion', 'tipo'), name='operacion_zoom_activa_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reuniones', '0010_outbox_zoom'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='participante',
+            name='intentos_invitacion',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -1,22 +1,49 @@
 from django.db import models  # ORM de Django
 from django.contrib.auth.models import User  # Modelo de usuario
+from django.utils import timezone  # Reintentos del outbox
+from datetime import timedelta  # Fin de la reunión
+import unicodedata  # Quitar acentos al normalizar nombres
+
+
+def normalizar_nombre(nombre):
+    """ 'José  Pérez' -> 'jose perez' (sin acentos, minúsculas, espacios simples). """
+    sin_acentos = unicodedata.normalize('NFKD', nombre or '').encode('ascii', 'ignore').decode()
+    return ' '.join(sin_acentos.lower().split())[:100]
+
+
+def normalizar_email(email):
+    """ Email sin espacios y en minúsculas. """
+    return (email or '').strip().lower()
+
 
 class Reunion(models.Model):
     """Modelo para almacenar reuniones de Zoom"""
     
+    SINCRONIZADA = 'sincronizada'
+    CREANDO = 'creando'
+    ELIMINANDO = 'eliminando'
+    ERROR = 'error'
+    ESTADOS_ZOOM = [
+        (SINCRONIZADA, 'Sincronizada'),
+        (CREANDO, 'Creando en Zoom'),
+        (ELIMINANDO, 'Eliminando en Zoom'),
+        (ERROR, 'Error con Zoom'),
+    ]
+    
     # Información básica
     titulo = models.CharField(max_length=200)  # Título de la reunión
     descripcion = models.TextField(blank=True)  # Agenda/descripción (opcional)
     
     # Información de Zoom
-    zoom_meeting_id = models.CharField(max_length=50, unique=True)  # ID único de Zoom (ej: 123456789)
+    zoom_meeting_id = models.CharField(max_length=50, unique=True, null=True, blank=True)  # ID único de Zoom (ej: 123456789); vacío hasta crearla en Zoom
     zoom_meeting_password = models.CharField(max_length=20, blank=True)  # Contraseña de la reunión
-    join_url = models.URLField()  # URL para participantes unirse
-    start_url = models.URLField()  # URL para host iniciar reunión
+    join_url = models.URLField(blank=True)  # URL para participantes unirse
+    start_url = models.URLField(blank=True)  # URL para host iniciar reunión
     
     # Fechas y horarios
     fecha_inicio = models.DateTimeField()  # Fecha y hora programada
     duracion = models.IntegerField()  # Duración en minutos
+    fecha_fin = models.DateTimeField(editable=False)  # fecha_inicio + duracion (detección de solapamientos)
     zona_horaria = models.CharField(max_length=50, default='America/Hermosillo')  # Zona horaria
     
     # Relaciones
@@ -29,10 +56,29 @@ class Reunion(models.Model):
     # Metadatos
     creado = models.DateTimeField(auto_now_add=True)  # Fecha de creación en Django
     actualizado = models.DateTimeField(auto_now=True)  # Fecha de última modificación
+    zoom_hash = models.CharField(max_length=64, blank=True)  # Huella del contenido en Zoom (sincronización)
+    estado_zoom = models.CharField(max_length=20, choices=ESTADOS_ZOOM, default=SINCRONIZADA)  # Operación con Zoom en curso
+    error_zoom = models.TextField(blank=True)  # Último error del outbox
     
     class Meta:
         ordering = ['-fecha_inicio']  # Ordenar por fecha descendente
         verbose_name_plural = 'Reuniones'  # Nombre en plural en admin
+        indexes = [
+            # Listado paginado por cursor: WHERE creador = ? ORDER BY fecha_inicio DESC, id DESC
+            models.Index(fields=['creador', '-fecha_inicio', '-id'], name='reunion_creador_fecha_idx'),
+            # Solapamientos: WHERE creador = ? AND fecha_fin > inicio AND fecha_inicio < fin
+            models.Index(fields=['creador', 'fecha_fin'], name='reunion_creador_fin_idx'),
+            # Acota el rango anterior: SELECT MAX(duracion) WHERE creador = ?
+            models.Index(fields=['creador', 'duracion'], name='reunion_creador_duracion_idx'),
+        ]
+    
+    def save(self, *args, **kwargs):
+        self.calcular_fin()
+        super().save(*args, **kwargs)
+    
+    def calcular_fin(self):
+        """ Rellena fecha_fin (llamar antes de bulk_create/bulk_update). """
+        self.fecha_fin = self.fecha_inicio + timedelta(minutes=int(self.duracion))
     
     def __str__(self):
         return f"{self.titulo} - {self.fecha_inicio.strftime('%d/%m/%Y %H:%M')}"
@@ -51,9 +97,189 @@ class Participante(models.Model):
     # Estado
     asistio = models.BooleanField(default=False)  # Marcado si asistió a la reunión
     invitacion_enviada = models.BooleanField(default=False)  # Si se envió correo de invitación
+    intentos_invitacion = models.IntegerField(default=0)  # Envíos fallidos (se deja de intentar al llegar al máximo)
     
     creado = models.DateTimeField(auto_now_add=True)  # Fecha de creación
     
+    # Columnas normalizadas para resolver asistencia desde webhooks
+    nombre_normalizado = models.CharField(max_length=100, blank=True, editable=False)  # Sin acentos, minúsculas
+    email_normalizado = models.CharField(max_length=254, blank=True, editable=False)  # Email en minúsculas
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['reunion', 'nombre_normalizado']),
+            models.Index(fields=['reunion', 'email_normalizado']),
+        ]
+    
+    def save(self, *args, **kwargs):
+        self.normalizar()
+        super().save(*args, **kwargs)
+    
+    def normalizar(self):
+        """ Rellena las columnas normalizadas (llamar antes de bulk_create). """
+        self.nombre_normalizado = normalizar_nombre(self.nombre)
+        self.email_normalizado = normalizar_email(self.email)
+    
     def __str__(self):
         nombre_completo = self.usuario.get_full_name() if self.usuario else self.nombre  # Obtiene nombre
-        return f"{nombre_completo} - {self.reunion.titulo}"
\ No newline at end of file
+        return f"{nombre_completo} - {self.reunion.titulo}"
+
+
+class EstadoSincronizacion(models.Model):
+    """Cursor de sincronización con Zoom por usuario"""
+    
+    usuario = models.OneToOneField(User, on_delete=models.CASCADE, related_name='estado_sincronizacion')  # Dueño
+    ultima_sincronizacion = models.DateTimeField(null=True, blank=True)  # Fin de la última sincronización
+    total_reuniones = models.IntegerField(default=0)  # Reuniones vistas en Zoom
+    huella = models.CharField(max_length=64, blank=True)  # Huella de los IDs del último listado (independiente del orden)
+    
+    class Meta:
+        verbose_name_plural = 'Estados de sincronización'
+    
+    def __str__(self):
+        return f"{self.usuario.username} - {self.ultima_sincronizacion}"
+
+
+class TokenZoom(models.Model):
+    """Tokens OAuth de Zoom de cada usuario (cada anfitrión usa su propia cuenta)"""
+    
+    usuario = models.OneToOneField(User, on_delete=models.CASCADE, related_name='token_zoom')  # Dueño
+    access_token = models.TextField()  # Token de acceso vigente
+    refresh_token = models.TextField()  # Zoom lo rota en cada renovación
+    expira = models.DateTimeField()  # Caducidad del access token
+    actualizado = models.DateTimeField(auto_now=True)  # Última autorización o renovación
+    
+    class Meta:
+        verbose_name = 'Token de Zoom'
+        verbose_name_plural = 'Tokens de Zoom'
+    
+    def __str__(self):
+        return f"Token Zoom {self.usuario.username} - {self.expira}"
+
+
+class TrabajoSincronizacion(models.Model):
+    """Cola de trabajos de sincronización con Zoom (procesada por un worker)"""
+    
+    PENDIENTE = 'pendiente'
+    EN_PROCESO = 'en_proceso'
+    COMPLETADO = 'completado'
+    ERROR = 'error'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_PROCESO, 'En proceso'),
+        (COMPLETADO, 'Completado'),
+        (ERROR, 'Error'),
+    ]
+    
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='trabajos_sincronizacion')  # Dueño
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)  # Estado del trabajo
+    
+    # Progreso
+    procesadas = models.IntegerField(default=0)  # Reuniones leídas de Zoom hasta ahora
+    insertadas = models.IntegerField(default=0)
+    actualizadas = models.IntegerField(default=0)
+    sin_cambios = models.IntegerField(default=0)
+    eliminadas = models.IntegerField(default=0)
+    error = models.TextField(blank=True)  # Mensaje si falló
+    
+    # Fechas
+    creado = models.DateTimeField(auto_now_add=True)  # Encolado
+    iniciado = models.DateTimeField(null=True, blank=True)  # Tomado por el worker
+    terminado = models.DateTimeField(null=True, blank=True)  # Completado o fallido
+    
+    class Meta:
+        ordering = ['creado']
+        verbose_name_plural = 'Trabajos de sincronización'
+        indexes = [
+            models.Index(fields=['estado', 'creado']),  # El worker busca el pendiente más antiguo
+        ]
+        constraints = [
+            # Como mucho un trabajo pendiente por usuario (coalescencia)
+            models.UniqueConstraint(
+                fields=['usuario'],
+                condition=models.Q(estado='pendiente'),
+                name='sincronizacion_pendiente_unica',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Sincronización {self.usuario.username} - {self.estado}"
+
+
+class OperacionZoom(models.Model):
+    """Outbox: creación o eliminación pendiente de enviar a Zoom (procesada por un worker)"""
+    
+    CREAR = 'crear'
+    ELIMINAR = 'eliminar'
+    TIPOS = [
+        (CREAR, 'Crear'),
+        (ELIMINAR, 'Eliminar'),
+    ]
+    
+    PENDIENTE = 'pendiente'
+    EN_PROCESO = 'en_proceso'
+    ERROR = 'error'
+    ESTADOS = [
+        (PENDIENTE, 'Pendiente'),
+        (EN_PROCESO, 'En proceso'),
+        (ERROR, 'Error'),
+    ]
+    
+    reunion = models.ForeignKey(Reunion, on_delete=models.CASCADE, related_name='operaciones_zoom')  # Reunión local
+    tipo = models.CharField(max_length=10, choices=TIPOS)  # Qué hay que hacer en Zoom
+    datos = models.JSONField(default=dict, blank=True)  # Argumentos de crear_reunion (topic, start_time...)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default=PENDIENTE)  # Las completadas se borran
+    
+    # Reintentos
+    intentos = models.IntegerField(default=0)  # Envíos a Zoom fallidos
+    siguiente_intento = models.DateTimeField(default=timezone.now)  # No se toma antes de esta fecha
+    error = models.TextField(blank=True)  # Último error de Zoom
+    
+    # Reclamo por el worker
+    lote = models.CharField(max_length=32, blank=True)  # Marca del worker que la tomó
+    tomado = models.DateTimeField(null=True, blank=True)  # Detección de workers caídos
+    
+    creado = models.DateTimeField(auto_now_add=True)  # Encolado
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Operación con Zoom'
+        verbose_name_plural = 'Operaciones con Zoom'
+        indexes = [
+            models.Index(fields=['estado', 'siguiente_intento']),  # El worker busca las pendientes vencidas
+        ]
+        constraints = [
+            # Como mucho una operación activa de cada tipo por reunión
+            models.UniqueConstraint(
+                fields=['reunion', 'tipo'],
+                condition=models.Q(estado__in=['pendiente', 'en_proceso']),
+                name='operacion_zoom_activa_unica',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.tipo} {self.reunion_id} - {self.estado}"
+
+
+class EventoWebhook(models.Model):
+    """Cola durable de eventos recibidos por el webhook de Zoom"""
+    
+    evento = models.CharField(max_length=100)  # Tipo (ej: meeting.participant_joined)
+    clave = models.CharField(max_length=64, unique=True, null=True)  # Huella para descartar reintentos de Zoom
+    cuerpo = models.TextField()  # JSON crudo tal como lo envió Zoom
+    recibido = models.DateTimeField(auto_now_add=True)  # Fecha de recepción
+    
+    # Procesamiento
+    procesado = models.BooleanField(default=False)  # Ya lo consumió el worker
+    intentos = models.IntegerField(default=0)  # Veces que se intentó procesar
+    error = models.TextField(blank=True)  # Último error al procesar
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name_plural = 'Eventos de webhook'
+        indexes = [
+            models.Index(fields=['procesado', 'id']),  # El consumidor lee pendientes en orden
+        ]
+    
+    def __str__(self):
+        return f"{self.evento} - {self.recibido}"
@@ -0,0 +1,412 @@
+# ========================================
+# reuniones/outbox.py
+# Outbox transaccional: crear/eliminar en Zoom desde un worker
+# ========================================
+
+import uuid  # Marca del lote reclamado
+from collections import defaultdict  # Operaciones por usuario
+from datetime import timedelta  # Reintentos y trabajos colgados
+
+from asgiref.sync import sync_to_async  # Encolar desde vistas async
+from django.db import connection, transaction  # Fila local + operación en un solo paso
+from django.utils import timezone  # Fechas con zona horaria
+
+from .models import OperacionZoom, Reunion
+from .sync import huella_reunion, parsear_fecha_zoom
+from .zoom_service import ZoomService, HILOS_LOTE
+from . import dashboard, versiones
+
+LOTE_OPERACIONES = 100  # Operaciones reclamadas por iteración del worker
+MAX_INTENTOS = 5  # Después de esto la operación queda con error
+RETRASO_BASE = 30  # Segundos antes del primer reintento (se duplica en cada uno)
+
+
+# =====================================
+# ENCOLAR (lo llaman las vistas, sin esperar a Zoom)
+# =====================================
+
+def encolar_creacion(usuario, titulo, fecha_inicio, duracion, datos_zoom, zona_horaria='America/Hermosillo'):
+    """
+    Registra la reunión como 'creando' y, en la misma transacción, la
+    operación que la creará en Zoom. zoom_meeting_id y los enlaces se
+    rellenan cuando el worker la envía.
+
+    Args:
+        usuario: Creador de la reunión
+        titulo: Título local
+        fecha_inicio: Inicio (datetime)
+        duracion: Minutos
+        datos_zoom: Argumentos de ZoomService.crear_reunion (topic, start_time, duration, timezone)
+        zona_horaria: Zona horaria de la reunión
+
+    Returns:
+        Reunion
+    """
+    with transaction.atomic():
+        reunion = Reunion.objects.create(
+            titulo=titulo,
+            fecha_inicio=fecha_inicio,
+            duracion=duracion,
+            zona_horaria=zona_horaria,
+            creador=usuario,
+            estado_zoom=Reunion.CREANDO,
+        )
+        OperacionZoom.objects.create(reunion=reunion, tipo=OperacionZoom.CREAR, datos=datos_zoom)
+    return reunion
+
+
+def encolar_creaciones(usuario, reuniones):
+    """
+    encolar_creacion() para muchas reuniones a la vez (lote CSV): las
+    reuniones y sus operaciones se insertan por lotes en una transacción.
+
+    Args:
+        usuario: Creador de las reuniones
+        reuniones: Lista de dicts con titulo, fecha_inicio, duracion,
+                   zona_horaria y datos_zoom
+
+    Returns:
+        list: Reunion creadas, en el mismo orden
+    """
+    nuevas = []
+    for datos in reuniones:
+        reunion = Reunion(
+            titulo=datos['titulo'],
+            fecha_inicio=datos['fecha_inicio'],
+            duracion=datos['duracion'],
+            zona_horaria=datos['zona_horaria'],
+            creador=usuario,
+            estado_zoom=Reunion.CREANDO,
+        )
+        reunion.calcular_fin()  # bulk_create no llama a save()
+        nuevas.append(reunion)
+    if not nuevas:
+        return []
+
+    with transaction.atomic():
+        if connection.features.can_return_rows_from_bulk_insert:
+            Reunion.objects.bulk_create(nuevas)
+        else:
+            for reunion in nuevas:  # Sin RETURNING (MySQL) bulk_create no rellena los pks
+                reunion.save()
+        OperacionZoom.objects.bulk_create([
+            OperacionZoom(reunion=reunion, tipo=OperacionZoom.CREAR, datos=datos['datos_zoom'])
+            for reunion, datos in zip(nuevas, reuniones)
+        ])
+
+    # bulk_create no dispara post_save
+    dashboard.invalidar(usuario.pk)
+    versiones.invalidar(usuario.pk)
+    return nuevas
+
+
+def encolar_eliminacion(usuario, reunion_ids):
+    """
+    Marca las reuniones como 'eliminando' y encola su borrado en Zoom.
+    Las que aún no llegaron a Zoom se borran aquí mismo (se cancela su
+    creación), salvo que el worker ya la esté enviando.
+
+    Args:
+        usuario: Dueño de las reuniones
+        reunion_ids: pks locales
+
+    Returns:
+        dict: {'encoladas': int, 'eliminadas': int} (eliminadas = borradas solo localmente)
+    """
+    with transaction.atomic():
+        reuniones = list(
+            Reunion.objects.filter(creador=usuario, pk__in=reunion_ids).only('id', 'zoom_meeting_id', 'estado_zoom')
+        )
+        en_cola = [r.pk for r in reuniones if r.estado_zoom == Reunion.ELIMINANDO]  # Ya encoladas antes
+        reuniones = [r for r in reuniones if r.estado_zoom != Reunion.ELIMINANDO]
+        sin_zoom = [r.pk for r in reuniones if r.zoom_meeting_id is None]
+
+        # Creaciones que el worker no ha tomado: basta con no enviarlas
+        OperacionZoom.objects.filter(
+            reunion_id__in=sin_zoom, tipo=OperacionZoom.CREAR
+        ).exclude(estado=OperacionZoom.EN_PROCESO).delete()
+        enviando = set(OperacionZoom.objects.filter(
+            reunion_id__in=sin_zoom, tipo=OperacionZoom.CREAR, estado=OperacionZoom.EN_PROCESO
+        ).values_list('reunion_id', flat=True))
+        locales = [pk for pk in sin_zoom if pk not in enviando]
+        eliminadas = Reunion.objects.filter(pk__in=locales).delete()[1].get('reuniones.Reunion', 0)
+
+        encolar = [r.pk for r in reuniones if r.pk not in locales]
+        Reunion.objects.filter(pk__in=encolar).update(
+            estado_zoom=Reunion.ELIMINANDO, error_zoom='', actualizado=timezone.now()
+        )
+        OperacionZoom.objects.filter(reunion_id__in=encolar, tipo=OperacionZoom.ELIMINAR).delete()  # Errores previos
+        OperacionZoom.objects.bulk_create([
+            OperacionZoom(reunion_id=pk, tipo=OperacionZoom.ELIMINAR) for pk in encolar
+        ])
+
+    # update() y bulk_create no disparan señales
+    if encolar:
+        versiones.invalidar(usuario.pk)
+    return {'encoladas': len(encolar) + len(en_cola), 'eliminadas': eliminadas}
+
+
+aencolar_creacion = sync_to_async(encolar_creacion)
+aencolar_eliminacion = sync_to_async(encolar_eliminacion)
+
+
+# =====================================
+# WORKER
+# =====================================
+
+def tomar_lote(limite=LOTE_OPERACIONES, usuario=None):
+    """
+    Reclama hasta `limite` operaciones pendientes y vencidas.
+    El UPDATE condicionado al estado garantiza que dos workers no tomen
+    la misma. Las eliminaciones de reuniones cuya creación sigue en
+    curso esperan a que termine.
+
+    Args:
+        limite: Operaciones como máximo
+        usuario: Solo operaciones de reuniones de este usuario (None = todas)
+
+    Returns:
+        list: OperacionZoom reclamadas (con su reunión)
+    """
+    vencidas = OperacionZoom.objects.filter(
+        estado=OperacionZoom.PENDIENTE, siguiente_intento__lte=timezone.now()
+    ).exclude(
+        tipo=OperacionZoom.ELIMINAR, reunion__zoom_meeting_id__isnull=True
+    )
+    if usuario is not None:
+        vencidas = vencidas.filter(reunion__creador=usuario)
+    ids = list(vencidas.order_by('id').values_list('id', flat=True)[:limite])
+    if not ids:
+        return []
+
+    marca = uuid.uuid4().hex
+    OperacionZoom.objects.filter(pk__in=ids, estado=OperacionZoom.PENDIENTE).update(
+        estado=OperacionZoom.EN_PROCESO, lote=marca, tomado=timezone.now()
+    )
+    return list(OperacionZoom.objects.filter(lote=marca).select_related('reunion').order_by('id'))
+
+
+def _reintentable(operacion, resultado):
+    """
+    Una creación solo se reintenta si Zoom no la procesó: 429 o la petición
+    no llegó a enviarse (error de conexión). Tras un timeout de lectura, un
+    corte o un 5xx pudo haberse creado, y repetirla la duplicaría (como en
+    zoom_scheduler con los métodos no idempotentes). Las eliminaciones son
+    idempotentes: también se reintentan tras errores de red y 5xx.
+    """
+    status = resultado.get('status_code')
+    if status == 429 or resultado.get('sin_enviar'):
+        return True
+    if operacion.tipo == OperacionZoom.ELIMINAR:
+        return status is None or status >= 500
+    return False
+
+
+def _fallo(operacion, resultado, ahora):
+    """ Prepara la operación para reintentarla o la marca con error. """
+    operacion.intentos += 1
+    operacion.error = resultado['error']
+    if operacion.intentos < MAX_INTENTOS and _reintentable(operacion, resultado):
+        operacion.estado = OperacionZoom.PENDIENTE
+        operacion.siguiente_intento = ahora + timedelta(seconds=RETRASO_BASE * 2 ** (operacion.intentos - 1))
+    else:
+        operacion.estado = OperacionZoom.ERROR
+    return operacion.estado == OperacionZoom.ERROR
+
+
+def _enviar(usuario_id, operaciones, hilos):
+    """
+    Envía a Zoom las operaciones de un usuario (concurrentemente).
+
+    Returns:
+        list: (OperacionZoom, resultado de ZoomService) por operación
+    """
+    zoom_service = ZoomService(usuario_id)
+    crear = [o for o in operaciones if o.tipo == OperacionZoom.CREAR]
+    eliminar = [o for o in operaciones if o.tipo == OperacionZoom.ELIMINAR]
+    resultados = _lote(crear, lambda: zoom_service.crear_reuniones_batch([o.datos for o in crear], hilos=hilos))
+    resultados += _lote(eliminar, lambda: zoom_service.eliminar_reuniones_batch(
+        [o.reunion.zoom_meeting_id for o in eliminar], hilos=hilos
+    ))
+    return list(zip(crear + eliminar, resultados))
+
+
+def _lote(operaciones, enviar):
+    """
+    Resultados de `enviar()` o, si falla antes de enviar nada (sin token,
+    identidad, etc.), el mismo error para todas: no llegaron a Zoom.
+    """
+    if not operaciones:
+        return []
+    try:
+        return enviar()
+    except Exception as e:
+        return [{'ok': False, 'error': str(e), 'status_code': None, 'sin_enviar': True} for _ in operaciones]
+
+
+def _aplicar(enviadas):
+    """
+    Guarda en una transacción el resultado de un lote: rellena las
+    reuniones creadas, borra las eliminadas y reprograma o marca con
+    error las fallidas. Las operaciones completadas se borran.
+
+    Args:
+        enviadas: Lista de (OperacionZoom, resultado)
+    """
+    ahora = timezone.now()
+    creadas = {}  # reunion_id -> respuesta de Zoom
+    borrar = set()  # reuniones a borrar localmente
+    con_error = {}  # reunion_id -> mensaje
+    completadas = []
+    reprogramadas = []
+    for operacion, resultado in enviadas:
+        if resultado['ok']:
+            completadas.append(operacion.pk)
+            if operacion.tipo == OperacionZoom.CREAR:
+                creadas[operacion.reunion_id] = resultado['datos']
+            else:
+                borrar.add(operacion.reunion_id)  # También si ya no existía en Zoom (3001)
+            continue
+        if _fallo(operacion, resultado, ahora):
+            if operacion.tipo == OperacionZoom.ELIMINAR:
+                prefijo = 'No se pudo eliminar en Zoom'
+            elif resultado.get('status_code') is None and not resultado.get('sin_enviar'):
+                prefijo = 'No se sabe si se creó en Zoom (sincroniza para comprobarlo)'
+            else:
+                prefijo = 'No se pudo crear en Zoom'
+            con_error[operacion.reunion_id] = f"{prefijo}: {resultado['error']}"
+        reprogramadas.append(operacion)
+
+    with transaction.atomic():
+        reuniones = Reunion.objects.select_for_update().in_bulk(set(creadas) | set(con_error))
+        modificadas = []
+        for reunion_id, meeting in creadas.items():
+            reunion = reuniones.get(reunion_id)
+            if reunion is None:
+                continue  # Borrada localmente mientras se enviaba
+            zoom_id = str(meeting['id'])
+            # Una sincronización pudo traerla antes que el worker: gana la fila original
+            Reunion.objects.filter(zoom_meeting_id=zoom_id).exclude(pk=reunion_id).delete()
+            reunion.zoom_meeting_id = zoom_id
+            reunion.join_url = meeting['join_url']
+            reunion.start_url = meeting['start_url']
+            # La hora que vale es la que Zoom programó: la huella la da por sincronizada
+            reunion.fecha_inicio = parsear_fecha_zoom(meeting['start_time'])
+            reunion.duracion = meeting['duration']
+            reunion.calcular_fin()
+            reunion.zoom_hash = huella_reunion(meeting)
+            if reunion.estado_zoom == Reunion.CREANDO:
+                reunion.estado_zoom = Reunion.SINCRONIZADA  # Si no, hay una eliminación esperando
+            modificadas.append(reunion)
+        for reunion_id, mensaje in con_error.items():
+            reunion = reuniones.get(reunion_id)
+            if reunion is None:
+                continue
+            if reunion.estado_zoom == Reunion.ELIMINANDO and reunion.zoom_meeting_id is None:
+                borrar.add(reunion_id)  # No llegó a Zoom y el usuario ya la eliminó
+                continue
+            reunion.estado_zoom = Reunion.ERROR
+            reunion.error_zoom = mensaje
+            modificadas.append(reunion)
+        for reunion in modificadas:
+            reunion.actualizado = ahora  # bulk_update no aplica auto_now
+        if modificadas:
+            Reunion.objects.bulk_update(
+                modificadas,
+                ['zoom_meeting_id', 'join_url', 'start_url', 'fecha_inicio', 'duracion', 'fecha_fin',
+                 'zoom_hash', 'estado_zoom', 'error_zoom', 'actualizado'],
+            )
+        OperacionZoom.objects.filter(pk__in=completadas).delete()
+        if reprogramadas:
+            OperacionZoom.objects.bulk_update(
+                reprogramadas, ['estado', 'intentos', 'siguiente_intento', 'error']
+            )
+        if borrar:
+            # delete() del queryset sí dispara post_delete (cachés de asistencia y versión)
+            Reunion.objects.filter(pk__in=borrar).delete()
+
+    # bulk_update no dispara señales: invalidar a mano
+    for usuario_id in {r.creador_id for r in modificadas}:
+        dashboard.invalidar(usuario_id)
+        versiones.invalidar(usuario_id)
+
+
+def procesar_lote(limite=LOTE_OPERACIONES, hilos=HILOS_LOTE, usuario=None):
+    """
+    Reclama un lote, lo envía a Zoom agrupado por usuario y guarda los
+    resultados.
+
+    Returns:
+        int: Operaciones procesadas
+    """
+    operaciones = tomar_lote(limite, usuario)
+    if not operaciones:
+        return 0
+
+    por_usuario = defaultdict(list)
+    for operacion in operaciones:
+        por_usuario[operacion.reunion.creador_id].append(operacion)
+
+    enviadas = []
+    for usuario_id, propias in por_usuario.items():
+        enviadas += _enviar(usuario_id, propias, hilos)
+    _aplicar(enviadas)
+    return len(operaciones)
+
+
+def procesar_pendientes(limite=LOTE_OPERACIONES, hilos=HILOS_LOTE, usuario=None):
+    """
+    Procesa lotes hasta que no queden operaciones vencidas.
+
+    Args:
+        limite: Operaciones por lote
+        hilos: Llamadas simultáneas a Zoom
+        usuario: Solo operaciones de este usuario (None = todas)
+
+    Returns:
+        int: Operaciones procesadas
+    """
+    total = 0
+    while True:
+        procesadas = procesar_lote(limite, hilos, usuario)
+        if not procesadas:
+            return total
+        total += procesadas
+
+
+def liberar_colgadas(minutos=10):
+    """
+    Operaciones 'en_proceso' de un worker caído. Las eliminaciones vuelven
+    a la cola; las creaciones quedan con error, porque pudieron llegar a
+    Zoom y reenviarlas duplicaría la reunión (una sincronización la trae
+    si se creó). Si el usuario ya la había eliminado (sin ID de Zoom su
+    eliminación nunca se enviaría), la reunión se borra localmente.
+
+    Returns:
+        int: Operaciones liberadas
+    """
+    ahora = timezone.now()
+    colgadas = OperacionZoom.objects.filter(
+        estado=OperacionZoom.EN_PROCESO, tomado__lt=ahora - timedelta(minutes=minutos)
+    )
+    mensaje = 'El worker se detuvo mientras se creaba en Zoom: sincroniza para comprobar si llegó a crearse'
+    with transaction.atomic():
+        reuniones = list(colgadas.filter(tipo=OperacionZoom.CREAR).values_list('reunion_id', flat=True))
+        creaciones = colgadas.filter(tipo=OperacionZoom.CREAR).update(
+            estado=OperacionZoom.ERROR, lote='', error=mensaje
+        )
+        Reunion.objects.filter(pk__in=reuniones, estado_zoom=Reunion.CREANDO).update(
+            estado_zoom=Reunion.ERROR, error_zoom=mensaje, actualizado=ahora
+        )
+        # delete() del queryset dispara post_delete (cachés) y arrastra sus operaciones
+        Reunion.objects.filter(
+            pk__in=reuniones, estado_zoom=Reunion.ELIMINANDO, zoom_meeting_id__isnull=True
+        ).delete()
+        eliminaciones = colgadas.filter(tipo=OperacionZoom.ELIMINAR).update(
+            estado=OperacionZoom.PENDIENTE, lote=''
+        )
+    # update() no dispara señales
+    for usuario_id in set(Reunion.objects.filter(pk__in=reuniones).values_list('creador_id', flat=True)):
+        dashboard.invalidar(usuario_id)
+        versiones.invalidar(usuario_id)
+    return creaciones + eliminaciones
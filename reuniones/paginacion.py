@@ -0,0 +1,85 @@
+# ========================================
+# reuniones/paginacion.py
+# Paginación por cursor (keyset) sobre (fecha_inicio, id)
+# ========================================
+
+import base64  # Cursor opaco en la URL
+from datetime import datetime  # Fecha del cursor
+
+from django.db.models import Q  # Comparación por tupla
+
+TAMANO_PAGINA = 25  # Reuniones por página
+
+
+def codificar_cursor(reunion):
+    """
+    Cursor opaco que apunta a una reunión concreta.
+
+    Returns:
+        str: Cursor URL-safe
+    """
+    crudo = f"{reunion.fecha_inicio.isoformat()}|{reunion.pk}"
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """
+    Inverso de codificar_cursor.
+
+    Returns:
+        tuple | None: (fecha_inicio, id) o None si el cursor no es válido
+    """
+    if not cursor:
+        return None
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        fecha, pk = base64.urlsafe_b64decode(cursor + relleno).decode().split('|')
+        return datetime.fromisoformat(fecha), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def paginar(queryset, despues=None, antes=None, tamano=TAMANO_PAGINA):
+    """
+    Página de reuniones en orden (-fecha_inicio, -id) sin OFFSET.
+    El coste es el mismo en la página 1 que en la 1000: se usa el índice
+    (creador, fecha_inicio, id) para saltar directamente al cursor.
+
+    Args:
+        queryset: Reuniones ya filtradas (p. ej. por creador)
+        despues: Cursor; devuelve las reuniones que van después (más antiguas)
+        antes: Cursor; devuelve las reuniones que van antes (más recientes)
+        tamano: Reuniones por página
+
+    Returns:
+        dict con 'reuniones', 'siguiente' y 'anterior' (cursores o None)
+    """
+    despues = decodificar_cursor(despues)
+    antes = decodificar_cursor(antes)
+
+    if antes:
+        fecha, pk = antes
+        qs = queryset.filter(
+            Q(fecha_inicio__gt=fecha) | Q(fecha_inicio=fecha, id__gt=pk)
+        ).order_by('fecha_inicio', 'id')
+        filas = list(qs[:tamano + 1])
+        hay_mas = len(filas) > tamano
+        reuniones = list(reversed(filas[:tamano]))
+        return {
+            'reuniones': reuniones,
+            'anterior': codificar_cursor(reuniones[0]) if hay_mas else None,
+            'siguiente': codificar_cursor(reuniones[-1]) if reuniones else None,
+        }
+
+    qs = queryset.order_by('-fecha_inicio', '-id')
+    if despues:
+        fecha, pk = despues
+        qs = qs.filter(Q(fecha_inicio__lt=fecha) | Q(fecha_inicio=fecha, id__lt=pk))
+    filas = list(qs[:tamano + 1])
+    hay_mas = len(filas) > tamano
+    reuniones = filas[:tamano]
+    return {
+        'reuniones': reuniones,
+        'anterior': codificar_cursor(reuniones[0]) if despues and reuniones else None,
+        'siguiente': codificar_cursor(reuniones[-1]) if hay_mas else None,
+    }
@@ -0,0 +1,96 @@
+# ========================================
+# reuniones/qr.py
+# Códigos QR locales (sin servicios externos) con caché en dos niveles
+# ========================================
+
+import hashlib  # Clave de caché
+import io  # Buffer de salida
+import threading  # Lock de la LRU
+from collections import OrderedDict  # LRU en memoria
+
+import segno  # Generador de QR (PNG/SVG sin dependencias)
+from django.core.cache import cache  # Segundo nivel de caché
+
+TAMANO_MIN = 100  # Píxeles
+TAMANO_MAX = 1000
+FORMATOS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+MAX_LRU = 256  # Imágenes guardadas en memoria del proceso
+CACHE_TTL = 7 * 86400  # Segundos en la caché de Django
+BORDE = 2  # Módulos de margen alrededor del código
+
+_lru = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+def clave_qr(reunion_id, join_url, tamano, formato):
+    """
+    Clave de caché: reunión, tamaño, formato y hash del join_url
+    (si el enlace cambia, la clave cambia).
+
+    Returns:
+        str
+    """
+    url_hash = hashlib.sha1(join_url.encode()).hexdigest()[:12]
+    return f'qr:{reunion_id}:{tamano}:{formato}:{url_hash}'
+
+
+def _generar(join_url, tamano, formato):
+    """ Dibuja el QR con el tamaño aproximado pedido (en píxeles). """
+    codigo = segno.make(join_url, error='m')
+    modulos = codigo.symbol_size(border=BORDE)[0]
+    escala = max(1, tamano // modulos)
+
+    buffer = io.BytesIO()
+    codigo.save(buffer, kind=formato, scale=escala, border=BORDE)
+    return buffer.getvalue()
+
+
+def _lru_get(clave):
+    with _lru_lock:
+        datos = _lru.get(clave)
+        if datos is not None:
+            _lru.move_to_end(clave)
+        return datos
+
+
+def _lru_set(clave, datos):
+    with _lru_lock:
+        _lru[clave] = datos
+        _lru.move_to_end(clave)
+        while len(_lru) > MAX_LRU:
+            _lru.popitem(last=False)
+
+
+def normalizar_tamano(tamano):
+    """ Limita el tamaño pedido a [TAMANO_MIN, TAMANO_MAX]. """
+    try:
+        tamano = int(tamano)
+    except (TypeError, ValueError):
+        tamano = 300
+    return min(max(tamano, TAMANO_MIN), TAMANO_MAX)
+
+
+def qr_reunion(reunion_id, join_url, tamano=300, formato='png'):
+    """
+    Bytes del QR del join_url de una reunión.
+    Orden de búsqueda: LRU del proceso -> caché de Django -> generar.
+
+    Returns:
+        tuple: (bytes, clave)
+    """
+    clave = clave_qr(reunion_id, join_url, tamano, formato)
+
+    datos = _lru_get(clave)
+    if datos is not None:
+        return datos, clave
+
+    datos = cache.get(clave)
+    if datos is None:
+        datos = _generar(join_url, tamano, formato)
+        cache.set(clave, datos, CACHE_TTL)
+
+    _lru_set(clave, datos)
+    return datos, clave
@@ -0,0 +1,25 @@
+# ========================================
+# reuniones/signals.py
+# Señales para mantener cachés en memoria coherentes
+# ========================================
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Reunion
+from . import asistencia, dashboard, versiones
+
+
+@receiver(post_delete, sender=Reunion)
+def reunion_eliminada(sender, instance, **kwargs):
+    """ Quita la reunión borrada de la caché de asistencia. """
+    asistencia.olvidar_reunion(instance.zoom_meeting_id)
+    dashboard.invalidar(instance.creador_id)
+    versiones.invalidar(instance.creador_id)
+
+
+@receiver(post_save, sender=Reunion)
+def reunion_guardada(sender, instance, **kwargs):
+    """ Los contadores del dashboard y la versión del dueño ya no son válidos. """
+    dashboard.invalidar(instance.creador_id)
+    versiones.invalidar(instance.creador_id)
@@ -0,0 +1,291 @@
+# ========================================
+# reuniones/sync.py
+# Sincronización incremental por lotes Zoom -> base de datos local
+# ========================================
+
+import hashlib  # Huellas de contenido
+import json  # Serialización canónica para la huella
+from datetime import datetime, timedelta, timezone as dt_timezone  # Manejo de fechas
+from itertools import islice  # Partir el iterador en lotes
+
+from asgiref.sync import sync_to_async  # Escrituras desde la variante asíncrona
+from django.db import transaction  # Una transacción por lote
+from django.utils import timezone  # Fechas con zona horaria
+
+from .models import Reunion, EstadoSincronizacion
+from . import dashboard, versiones
+
+CHUNK_SIZE = 500  # Reuniones procesadas por lote
+
+# Campos que se copian desde Zoom a Reunion
+CAMPOS_SINCRONIZADOS = ['titulo', 'join_url', 'start_url', 'fecha_inicio', 'duracion', 'fecha_fin', 'creador']
+
+# Campos de Zoom que forman la huella de una reunión
+CAMPOS_HUELLA = ['topic', 'start_time', 'duration', 'timezone', 'join_url', 'start_url']
+
+
+def parsear_fecha_zoom(valor):
+    """
+    Convierte el start_time de Zoom a datetime con zona horaria (UTC).
+
+    Args:
+        valor: Fecha ISO de Zoom (ej: "2024-03-15T10:00:00Z")
+
+    Returns:
+        datetime: Fecha aware en UTC
+    """
+    fecha_iso = valor.replace('Z', '')
+    try:
+        start_dt = datetime.fromisoformat(fecha_iso)
+    except ValueError:
+        start_dt = datetime.strptime(valor, '%Y-%m-%dT%H:%M:%SZ')
+
+    if timezone.is_naive(start_dt):
+        start_dt = start_dt.replace(tzinfo=dt_timezone.utc)
+    return start_dt
+
+
+def huella_reunion(meeting):
+    """
+    Huella SHA-256 del contenido relevante de una reunión de Zoom.
+
+    Returns:
+        str: Hash hexadecimal (64 caracteres)
+    """
+    contenido = {campo: meeting.get(campo) for campo in CAMPOS_HUELLA}
+    serializado = json.dumps(contenido, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(serializado.encode()).hexdigest()
+
+
+def _datos_reunion(meeting, usuario):
+    """ Traduce una reunión de Zoom a los valores de los campos de Reunion. """
+    inicio = parsear_fecha_zoom(meeting['start_time'])
+    return {
+        'titulo': meeting['topic'],
+        'join_url': meeting['join_url'],
+        'start_url': meeting.get('start_url', ''),
+        'fecha_inicio': inicio,
+        'duracion': meeting['duration'],
+        'fecha_fin': inicio + timedelta(minutes=meeting['duration']),  # bulk_create no llama a save()
+        'creador': usuario,
+    }
+
+
+def _lotes(iterable, tamano):
+    """ Parte cualquier iterable en listas de `tamano` elementos. """
+    iterador = iter(iterable)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+
+def _sincronizar_lote(lote, usuario):
+    """
+    Inserta o actualiza un lote de reuniones en una sola transacción.
+    Las reuniones cuya huella no cambió no se leen completas ni se escriben.
+
+    Returns:
+        tuple: (insertadas, actualizadas, sin_cambios, {zoom_id: huella})
+    """
+    # Deduplicar por ID dentro del lote (gana la última aparición)
+    por_id = {str(m['id']): m for m in lote}
+    huellas = {zoom_id: huella_reunion(m) for zoom_id, m in por_id.items()}
+
+    # Consulta ligera: solo ID, huella y dueño
+    actuales = {
+        zoom_id: (huella, creador_id)
+        for zoom_id, huella, creador_id in Reunion.objects.filter(
+            zoom_meeting_id__in=list(por_id)
+        ).values_list('zoom_meeting_id', 'zoom_hash', 'creador_id').order_by()
+    }
+
+    nuevas = []
+    cambiadas = []
+    sin_cambios = 0
+    for zoom_id, meeting in por_id.items():
+        if zoom_id not in actuales:
+            nuevas.append(Reunion(
+                zoom_meeting_id=zoom_id,
+                zoom_hash=huellas[zoom_id],
+                **_datos_reunion(meeting, usuario)
+            ))
+        elif actuales[zoom_id] == (huellas[zoom_id], usuario.pk):
+            sin_cambios += 1
+        else:
+            cambiadas.append(zoom_id)
+
+    modificadas = []
+    if cambiadas:
+        ahora = timezone.now()
+        for reunion in Reunion.objects.filter(zoom_meeting_id__in=cambiadas):
+            for campo, valor in _datos_reunion(por_id[reunion.zoom_meeting_id], usuario).items():
+                setattr(reunion, campo, valor)
+            reunion.zoom_hash = huellas[reunion.zoom_meeting_id]
+            reunion.actualizado = ahora  # bulk_update no aplica auto_now
+            modificadas.append(reunion)
+
+    if nuevas or modificadas:
+        with transaction.atomic():
+            if nuevas:
+                Reunion.objects.bulk_create(nuevas, batch_size=CHUNK_SIZE)
+            if modificadas:
+                Reunion.objects.bulk_update(
+                    modificadas,
+                    CAMPOS_SINCRONIZADOS + ['zoom_hash', 'actualizado'],
+                    batch_size=CHUNK_SIZE
+                )
+
+    return len(nuevas), len(modificadas), sin_cambios, huellas
+
+
+def _eliminar_desaparecidas(usuario, vistas, chunk_size, desde):
+    """
+    Borra las reuniones locales del usuario que ya no existen en Zoom.
+    Solo mira las que aún no habían terminado al empezar la sincronización:
+    el listado de Zoom omite las pasadas (caducadas), y borrarlas se
+    llevaría también su asistencia.
+
+    Args:
+        usuario: Dueño de las reuniones
+        vistas: IDs de Zoom del listado
+        chunk_size: Reuniones borradas por transacción
+        desde: Inicio de la sincronización
+
+    Returns:
+        int: Reuniones eliminadas
+    """
+    # Las que aún no llegaron a Zoom (outbox) no tienen ID y no se tocan
+    sobrantes = [
+        pk for pk, zoom_id in Reunion.objects.filter(
+            creador=usuario, zoom_meeting_id__isnull=False, fecha_fin__gt=desde
+        ).values_list('pk', 'zoom_meeting_id').order_by().iterator(chunk_size=2000)
+        if zoom_id not in vistas
+    ]
+
+    eliminadas = 0
+    for lote in _lotes(sobrantes, chunk_size):
+        with transaction.atomic():
+            eliminadas += Reunion.objects.filter(pk__in=lote).delete()[1].get('reuniones.Reunion', 0)
+    return eliminadas
+
+
+def _acumular(resultado, vistas, parcial):
+    """ Suma el resultado de un lote al total y anota los IDs listados. """
+    insertadas, actualizadas, sin_cambios, huellas = parcial
+    resultado['insertadas'] += insertadas
+    resultado['actualizadas'] += actualizadas
+    resultado['sin_cambios'] += sin_cambios
+    vistas.update(huellas)
+
+
+def huella_listado(vistas):
+    """
+    Huella del conjunto de IDs listados (independiente del orden de las
+    páginas). Se ordenan los IDs en vez de combinar huellas con XOR para
+    que dos listados distintos no puedan dar la misma.
+
+    Returns:
+        str: SHA-256 en hexadecimal
+    """
+    return hashlib.sha256('\n'.join(sorted(vistas)).encode()).hexdigest()
+
+
+def _finalizar(usuario, resultado, vistas, chunk_size, desde):
+    """
+    Barre las reuniones desaparecidas (si hace falta), invalida cachés y
+    guarda el cursor del usuario. Modifica `resultado`.
+    """
+    huella = huella_listado(vistas)
+    estado, _ = EstadoSincronizacion.objects.get_or_create(usuario=usuario)
+
+    # Mismos IDs que en la sincronización anterior (que ya barrió): nada desapareció
+    sin_novedades = (
+        estado.huella == huella
+        and resultado['insertadas'] == 0
+        and resultado['actualizadas'] == 0
+    )
+    if not sin_novedades:
+        resultado['eliminadas'] = _eliminar_desaparecidas(usuario, vistas, chunk_size, desde)
+
+    # bulk_create/bulk_update no disparan señales: invalidar a mano
+    if resultado['insertadas'] or resultado['actualizadas'] or resultado['eliminadas']:
+        dashboard.invalidar(usuario.pk)
+        versiones.invalidar(usuario.pk)
+
+    estado.ultima_sincronizacion = timezone.now()
+    estado.total_reuniones = len(vistas)
+    estado.huella = huella
+    estado.save()
+
+
+def sincronizar_reuniones(meetings, usuario, chunk_size=CHUNK_SIZE, progreso=None):
+    """
+    Sincroniza reuniones de Zoom con la base de datos local (incremental).
+
+    Por cada lote: una consulta ligera de (ID, huella) y, solo si algo
+    cambió, un bulk_create/bulk_update dentro de una transacción. Al final
+    se eliminan las reuniones locales por terminar que ya no están en Zoom;
+    ese barrido se omite si los IDs listados son los mismos que la vez
+    anterior.
+
+    Args:
+        meetings: Iterable de reuniones de Zoom (puede ser un generador)
+        usuario: Usuario dueño de las reuniones
+        chunk_size: Reuniones por lote
+        progreso: Función opcional llamada con el resultado parcial tras cada lote
+
+    Returns:
+        dict con 'insertadas', 'actualizadas', 'sin_cambios' y 'eliminadas'
+    """
+    resultado = {'insertadas': 0, 'actualizadas': 0, 'sin_cambios': 0, 'eliminadas': 0}
+    vistas = set()
+    desde = timezone.now()  # Antes de listar: lo que termine durante el listado no se barre
+
+    for lote in _lotes(meetings, chunk_size):
+        _acumular(resultado, vistas, _sincronizar_lote(lote, usuario))
+        if progreso:
+            progreso(dict(resultado))
+
+    _finalizar(usuario, resultado, vistas, chunk_size, desde)
+    return resultado
+
+
+async def asincronizar_reuniones(meetings, usuario, chunk_size=CHUNK_SIZE, progreso=None):
+    """
+    Variante asíncrona de sincronizar_reuniones para iteradores asíncronos
+    (ZoomServiceAsync.aiterar_reuniones). Mientras un lote se escribe en la
+    base de datos, el iterador ya puede estar descargando la página siguiente.
+    Las escrituras siguen siendo síncronas porque usan transacciones.
+
+    Args:
+        meetings: Iterable asíncrono de reuniones de Zoom
+        usuario: Usuario dueño de las reuniones
+        chunk_size: Reuniones por lote
+        progreso: Corrutina opcional llamada con el resultado parcial tras cada lote
+
+    Returns:
+        dict con 'insertadas', 'actualizadas', 'sin_cambios' y 'eliminadas'
+    """
+    resultado = {'insertadas': 0, 'actualizadas': 0, 'sin_cambios': 0, 'eliminadas': 0}
+    vistas = set()
+    desde = timezone.now()
+
+    async def procesar(lote):
+        parcial = await sync_to_async(_sincronizar_lote)(lote, usuario)
+        _acumular(resultado, vistas, parcial)
+        if progreso:
+            await progreso(dict(resultado))
+
+    lote = []
+    async for meeting in meetings:
+        lote.append(meeting)
+        if len(lote) >= chunk_size:
+            await procesar(lote)
+            lote = []
+    if lote:
+        await procesar(lote)
+
+    await sync_to_async(_finalizar)(usuario, resultado, vistas, chunk_size, desde)
+    return resultado
@@ -1,3 +1,1420 @@
-from django.test import TestCase
+# ========================================
+# reuniones/tests.py
+# Pruebas del outbox, paginación, webhooks, conflictos, API y trabajos
+# python manage.py test reuniones
+# ========================================
 
-# Create your tests here.
+import csv  # Exportación
+import io  # Exportación
+import json  # Cuerpos de webhooks
+import threading  # Hilo de renovación anticipada
+import time  # Timestamps de firma
+from concurrent.futures import ThreadPoolExecutor  # Peticiones simultáneas
+from datetime import datetime, timedelta  # Fechas de las reuniones
+from unittest import mock  # Fallos simulados
+
+import httpx  # Errores de red del programador
+import requests  # Errores de red del programador
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
+
+from .models import EventoWebhook, OperacionZoom, Participante, Reunion, TokenZoom, TrabajoSincronizacion
+from .zoom_async import ZoomServiceAsync, cerrar_cliente
+from .zoom_service import ZoomService
+from . import asistencia, calendario, conflictos, dashboard, exportacion, invitaciones, jobs, limites, metricas, outbox, paginacion, sync, tokens, webhooks, zoom_fake, zoom_http, zoom_scheduler
+
+SECRETO = 'secreto_de_prueba'
+
+
+def _fecha(dia, hora, minuto=0):
+    """ Fecha aware en la zona del proyecto (enero de 2030). """
+    return timezone.make_aware(datetime(2030, 1, dia, hora, minuto))
+
+
+def _reunion(usuario, titulo, inicio, duracion=60, **extra):
+    return Reunion.objects.create(titulo=titulo, fecha_inicio=inicio, duracion=duracion, creador=usuario, **extra)
+
+
+def _datos_zoom(titulo, inicio, duracion=60):
+    return {
+        'topic': titulo,
+        'start_time': inicio.strftime('%Y-%m-%dT%H:%M:%S'),
+        'duration': duracion,
+        'timezone': 'America/Hermosillo',
+    }
+
+
+# =====================================
+# OUTBOX
+# =====================================
+
+class ServidorZoomFalsoMixin:
+    """
+    Levanta zoom_fake para cada prueba y autoriza a self.usuario contra él.
+    Los settings que toca conectar() se restauran al terminar.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        tokens.olvidar()
+        ajustes = override_settings()
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.servidor, url = zoom_fake.iniciar()
+        self.addCleanup(self.servidor.server_close)
+        self.addCleanup(self.servidor.shutdown)
+        self.addCleanup(zoom_scheduler.reiniciar_programador)
+        self.addCleanup(zoom_http.cerrar_pool)
+        self.addCleanup(tokens.olvidar)
+        self.estado = self.servidor.RequestHandlerClass.estado
+
+        self.usuario = User.objects.create_user('docente')
+        zoom_fake.conectar(settings, url, self.usuario)
+
+
+class OutboxZoomTests(ServidorZoomFalsoMixin, TransactionTestCase):
+    """ Ida y vuelta contra el servidor falso (los envíos van en hilos). """
+
+    def test_creacion_rellena_la_reunion_y_borra_la_operacion(self):
+        inicio = _fecha(7, 10)
+        reunion = outbox.encolar_creacion(self.usuario, 'Clase', inicio, 60, _datos_zoom('Clase', inicio))
+        self.assertEqual(reunion.estado_zoom, Reunion.CREANDO)
+        self.assertIsNone(reunion.zoom_meeting_id)
+
+        self.assertEqual(outbox.procesar_pendientes(usuario=self.usuario), 1)
+
+        reunion.refresh_from_db()
+        self.assertEqual(reunion.estado_zoom, Reunion.SINCRONIZADA)
+        self.assertIsNotNone(reunion.zoom_meeting_id)
+        self.assertTrue(reunion.join_url)
+        self.assertFalse(OperacionZoom.objects.exists())
+
+    def test_eliminacion_borra_en_zoom_y_localmente(self):
+        inicio = _fecha(7, 10)
+        reunion = outbox.encolar_creacion(self.usuario, 'Clase', inicio, 60, _datos_zoom('Clase', inicio))
+        outbox.procesar_pendientes(usuario=self.usuario)
+
+        self.assertEqual(outbox.encolar_eliminacion(self.usuario, [reunion.pk]), {'encoladas': 1, 'eliminadas': 0})
+        self.assertEqual(Reunion.objects.get(pk=reunion.pk).estado_zoom, Reunion.ELIMINANDO)
+
+        self.assertEqual(outbox.procesar_pendientes(usuario=self.usuario), 1)
+        self.assertFalse(Reunion.objects.filter(pk=reunion.pk).exists())
+        self.assertFalse(OperacionZoom.objects.exists())
+
+    def test_creaciones_por_lote(self):
+        inicios = [_fecha(dia, 9) for dia in range(1, 6)]
+        reuniones = outbox.encolar_creaciones(self.usuario, [
+            {'titulo': f'R{i}', 'fecha_inicio': inicio, 'duracion': 30,
+             'zona_horaria': 'America/Hermosillo', 'datos_zoom': _datos_zoom(f'R{i}', inicio, 30)}
+            for i, inicio in enumerate(inicios)
+        ])
+        self.assertEqual([r.fecha_fin for r in reuniones], [i + timedelta(minutes=30) for i in inicios])
+        self.assertEqual(OperacionZoom.objects.filter(tipo=OperacionZoom.CREAR).count(), 5)
+
+        outbox.procesar_pendientes(usuario=self.usuario)
+        self.assertEqual(Reunion.objects.filter(estado_zoom=Reunion.SINCRONIZADA).count(), 5)
+
+    def test_formulario_outbox_y_sincronizacion_coinciden_con_zoom(self):
+        self.client.force_login(self.usuario)
+        self.client.post(reverse('crear_reunion'), {
+            'topic': 'Clase', 'start_date': '2030-01-01', 'start_time': '10:00', 'duration': '60',
+        })
+        outbox.procesar_pendientes(usuario=self.usuario)
+        jobs.encolar_sincronizacion(self.usuario)
+        jobs.procesar_pendientes(usuario=self.usuario)
+
+        [meeting] = self.estado.reuniones.values()
+        self.assertEqual(meeting['start_time'], '2030-01-01T17:00:00Z')  # 10:00 en Hermosillo
+        reunion = Reunion.objects.get()
+        self.assertEqual(reunion.zoom_meeting_id, str(meeting['id']))
+        self.assertEqual(reunion.fecha_inicio, _fecha(1, 17))
+
+
+class ZoomFalsoTests(TestCase):
+
+    def test_hora_local_a_utc(self):
+        self.assertEqual(zoom_fake.hora_utc('2030-01-01T10:00:00', 'America/Hermosillo'), '2030-01-01T17:00:00Z')
+        self.assertEqual(zoom_fake.hora_utc('2030-07-01T10:00:00', 'Europe/Madrid'), '2030-07-01T08:00:00Z')
+        self.assertEqual(zoom_fake.hora_utc('2030-01-01T10:00:00', ''), '2030-01-01T17:00:00Z')  # Zona de la cuenta
+        self.assertEqual(zoom_fake.hora_utc('2030-01-01T10:00:00Z', 'Europe/Madrid'), '2030-01-01T10:00:00Z')
+
+
+class OutboxEstadosTests(TestCase):
+    """ Transiciones del outbox y clasificación de reintentos (sin red). """
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('docente')
+
+    def _crear(self, titulo='Clase'):
+        inicio = _fecha(7, 10)
+        return outbox.encolar_creacion(self.usuario, titulo, inicio, 60, _datos_zoom(titulo, inicio))
+
+    def test_eliminar_antes_de_enviar_cancela_la_creacion(self):
+        reunion = self._crear()
+        self.assertEqual(outbox.encolar_eliminacion(self.usuario, [reunion.pk]), {'encoladas': 0, 'eliminadas': 1})
+        self.assertFalse(Reunion.objects.exists())
+        self.assertFalse(OperacionZoom.objects.exists())
+
+    def test_tomar_lote_reclama_una_sola_vez(self):
+        self._crear()
+        tomadas = outbox.tomar_lote()
+        self.assertEqual(len(tomadas), 1)
+        self.assertEqual(tomadas[0].estado, OperacionZoom.EN_PROCESO)
+        self.assertEqual(outbox.tomar_lote(), [])
+
+    def test_tomar_lote_respeta_el_usuario(self):
+        self._crear()
+        otro = User.objects.create_user('otro')
+        self.assertEqual(outbox.tomar_lote(usuario=otro), [])
+        self.assertEqual(len(outbox.tomar_lote(usuario=self.usuario)), 1)
+
+    def test_eliminacion_espera_a_que_termine_la_creacion(self):
+        reunion = self._crear()
+        outbox.tomar_lote()  # El worker la está creando
+        self.assertEqual(outbox.encolar_eliminacion(self.usuario, [reunion.pk]), {'encoladas': 1, 'eliminadas': 0})
+        self.assertEqual(outbox.tomar_lote(), [])  # Sin zoom_meeting_id todavía
+
+    def test_reintentable(self):
+        crear = OperacionZoom(tipo=OperacionZoom.CREAR)
+        eliminar = OperacionZoom(tipo=OperacionZoom.ELIMINAR)
+        casos = [
+            ({'status_code': 429}, True, True),
+            ({'status_code': None, 'sin_enviar': True}, True, True),
+            ({'status_code': None}, False, True),  # Timeout: pudo crearse
+            ({'status_code': 502}, False, True),
+            ({'status_code': 400}, False, False),
+        ]
+        for resultado, en_crear, en_eliminar in casos:
+            with self.subTest(resultado=resultado):
+                self.assertIs(outbox._reintentable(crear, resultado), en_crear)
+                self.assertIs(outbox._reintentable(eliminar, resultado), en_eliminar)
+
+    def test_fallo_reprograma_con_espera_creciente_y_luego_error(self):
+        operacion = OperacionZoom(tipo=OperacionZoom.CREAR)
+        ahora = timezone.now()
+        resultado = {'ok': False, 'error': 'Too Many Requests', 'status_code': 429}
+        for intento in range(1, outbox.MAX_INTENTOS):
+            self.assertFalse(outbox._fallo(operacion, resultado, ahora))
+            self.assertEqual(operacion.estado, OperacionZoom.PENDIENTE)
+            espera = timedelta(seconds=outbox.RETRASO_BASE * 2 ** (intento - 1))
+            self.assertEqual(operacion.siguiente_intento, ahora + espera)
+        self.assertTrue(outbox._fallo(operacion, resultado, ahora))
+        self.assertEqual(operacion.estado, OperacionZoom.ERROR)
+
+    def test_creacion_ambigua_queda_con_error(self):
+        reunion = self._crear()
+        operacion = outbox.tomar_lote()[0]
+        outbox._aplicar([(operacion, {'ok': False, 'error': 'Read timed out', 'status_code': None})])
+
+        reunion.refresh_from_db()
+        operacion.refresh_from_db()
+        self.assertEqual(operacion.estado, OperacionZoom.ERROR)
+        self.assertEqual(reunion.estado_zoom, Reunion.ERROR)
+        self.assertIn('No se sabe si se creó', reunion.error_zoom)
+
+    def test_creacion_no_enviada_vuelve_a_la_cola(self):
+        self._crear()
+        operacion = outbox.tomar_lote()[0]
+        outbox._aplicar([(operacion, {'ok': False, 'error': 'Connection refused',
+                                      'status_code': None, 'sin_enviar': True})])
+        operacion.refresh_from_db()
+        self.assertEqual(operacion.estado, OperacionZoom.PENDIENTE)
+        self.assertEqual(operacion.intentos, 1)
+
+    def test_creacion_adopta_la_hora_de_zoom(self):
+        reunion = self._crear()
+        operacion = outbox.tomar_lote()[0]
+        meeting = {'id': 987, 'join_url': 'https://zoom.us/j/987', 'start_url': 'https://zoom.us/s/987',
+                   'topic': 'Clase', 'start_time': '2030-01-07T17:00:00Z', 'duration': 45,
+                   'timezone': 'America/Hermosillo'}
+        outbox._aplicar([(operacion, {'ok': True, 'datos': meeting})])
+
+        reunion.refresh_from_db()
+        self.assertEqual(reunion.fecha_inicio, _fecha(7, 17))
+        self.assertEqual(reunion.duracion, 45)
+        self.assertEqual(reunion.fecha_fin, _fecha(7, 17, 45))
+
+    def test_liberar_colgadas(self):
+        creando = self._crear('Creando')
+        borrando = _reunion(self.usuario, 'Borrando', _fecha(8, 10), zoom_meeting_id='123')
+        outbox.encolar_eliminacion(self.usuario, [borrando.pk])
+        outbox.tomar_lote()
+        OperacionZoom.objects.update(tomado=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(outbox.liberar_colgadas(), 2)
+        creando.refresh_from_db()
+        self.assertEqual(creando.estado_zoom, Reunion.ERROR)
+        self.assertEqual(OperacionZoom.objects.get(tipo=OperacionZoom.CREAR).estado, OperacionZoom.ERROR)
+        self.assertEqual(OperacionZoom.objects.get(tipo=OperacionZoom.ELIMINAR).estado, OperacionZoom.PENDIENTE)
+
+    def test_liberar_colgadas_borra_la_creacion_ya_eliminada(self):
+        reunion = self._crear()
+        outbox.tomar_lote()
+        # El usuario la elimina mientras el worker (que luego se cae) la enviaba
+        self.assertEqual(outbox.encolar_eliminacion(self.usuario, [reunion.pk]), {'encoladas': 1, 'eliminadas': 0})
+        OperacionZoom.objects.update(tomado=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(outbox.liberar_colgadas(), 1)
+        self.assertFalse(Reunion.objects.exists())
+        self.assertFalse(OperacionZoom.objects.exists())
+
+
+class FormularioCrearTests(TestCase):
+    """ La hora del formulario es local a la zona de la reunión, no UTC. """
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('docente')
+        self.client.force_login(self.usuario)
+
+    def test_hora_local_de_la_reunion(self):
+        self.client.post(reverse('crear_reunion'), {
+            'topic': 'Clase', 'start_date': '2030-01-01', 'start_time': '10:00', 'duration': '60',
+        })
+        reunion = Reunion.objects.get()
+        self.assertEqual(reunion.zona_horaria, 'America/Hermosillo')
+        self.assertEqual(reunion.fecha_inicio, _fecha(1, 17))  # UTC-7
+        self.assertEqual(reunion.operaciones_zoom.get().datos, {
+            'topic': 'Clase', 'start_time': '2030-01-01T10:00:00', 'duration': 60,
+            'timezone': 'America/Hermosillo',
+        })
+
+    def test_conflicto_con_la_hora_local(self):
+        _reunion(self.usuario, 'Existente', _fecha(1, 17, 30))
+        self.client.post(reverse('crear_reunion'), {
+            'topic': 'Clase', 'start_date': '2030-01-01', 'start_time': '10:00', 'duration': '60',
+        })
+        self.assertEqual(Reunion.objects.count(), 1)  # Rechazada: 10:00-11:00 local choca con 17:30Z
+
+
+# =====================================
+# SINCRONIZACIÓN
+# =====================================
+
+def _meeting(zoom_id, inicio, topic='Clase', duracion=60):
+    """ Reunión como la lista Zoom (start_time en UTC). """
+    return {
+        'id': zoom_id, 'topic': topic, 'start_time': inicio.strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'duration': duracion, 'timezone': 'UTC',
+        'join_url': f'https://zoom.us/j/{zoom_id}', 'start_url': f'https://zoom.us/s/{zoom_id}',
+    }
+
+
+class SincronizacionTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('docente')
+        self.futura = timezone.now().replace(microsecond=0) + timedelta(days=1)
+
+    def _sincronizar(self, meetings):
+        return sync.sincronizar_reuniones(meetings, self.usuario, chunk_size=2)
+
+    def test_incremental(self):
+        meetings = [_meeting(i, self.futura + timedelta(hours=i)) for i in range(1, 4)]
+        self.assertEqual(self._sincronizar(meetings),
+                         {'insertadas': 3, 'actualizadas': 0, 'sin_cambios': 0, 'eliminadas': 0})
+        self.assertEqual(self._sincronizar(meetings),
+                         {'insertadas': 0, 'actualizadas': 0, 'sin_cambios': 3, 'eliminadas': 0})
+
+        meetings[1]['topic'] = 'Renombrada'
+        self.assertEqual(self._sincronizar(meetings)['actualizadas'], 1)
+        reunion = Reunion.objects.get(zoom_meeting_id='2')
+        self.assertEqual(reunion.titulo, 'Renombrada')
+        self.assertEqual(reunion.fecha_fin, reunion.fecha_inicio + timedelta(minutes=60))
+
+    def test_barre_las_futuras_que_desaparecen(self):
+        self._sincronizar([_meeting(1, self.futura), _meeting(2, self.futura)])
+        self.assertEqual(self._sincronizar([_meeting(1, self.futura)])['eliminadas'], 1)
+        self.assertFalse(Reunion.objects.filter(zoom_meeting_id='2').exists())
+
+    def test_conserva_las_pasadas_y_su_asistencia(self):
+        pasada = _reunion(self.usuario, 'Pasada', timezone.now() - timedelta(days=3), zoom_meeting_id='9')
+        Participante.objects.create(reunion=pasada, email='ana@example.com', asistio=True)
+
+        self.assertEqual(self._sincronizar([_meeting(1, self.futura)])['eliminadas'], 0)
+        self.assertTrue(Participante.objects.filter(reunion=pasada, asistio=True).exists())
+
+    def test_mismo_total_con_otros_ids_barre(self):
+        self._sincronizar([_meeting(1, self.futura), _meeting(2, self.futura)])
+        resultado = self._sincronizar([_meeting(1, self.futura), _meeting(3, self.futura)])
+        self.assertEqual(resultado['eliminadas'], 1)
+        self.assertEqual(set(Reunion.objects.values_list('zoom_meeting_id', flat=True)), {'1', '3'})
+
+    def test_no_toca_las_que_esperan_al_outbox(self):
+        inicio = self.futura
+        outbox.encolar_creacion(self.usuario, 'Pendiente', inicio, 60, _datos_zoom('Pendiente', inicio))
+        self._sincronizar([_meeting(1, self.futura)])
+        self.assertTrue(Reunion.objects.filter(titulo='Pendiente', estado_zoom=Reunion.CREANDO).exists())
+
+    def test_huella_del_listado_no_depende_del_orden(self):
+        self.assertEqual(sync.huella_listado({'1', '2'}), sync.huella_listado({'2', '1'}))
+        self.assertNotEqual(sync.huella_listado({'1', '2'}), sync.huella_listado({'1', '3'}))
+
+
+# =====================================
+# EXPORTACIÓN
+# =====================================
+
+class ExportacionTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('docente')
+        for i in range(5):
+            reunion = _reunion(self.usuario, f'R{i}', _fecha(i + 1, 10))
+            for n in range(i):  # La primera sin participantes
+                Participante.objects.create(reunion=reunion, nombre=f'P{n}', email=f'p{n}.{i}@example.com')
+        self.qs = exportacion.reuniones_para_exportar(self.usuario)
+
+    def test_csv(self):
+        filas = list(csv.reader(io.StringIO(''.join(exportacion.generar('csv', self.qs, chunk_size=2)))))
+        self.assertEqual(filas[0], exportacion.COLUMNAS_CSV)
+        self.assertEqual(len(filas), 1 + 1 + 1 + 2 + 3 + 4)
+
+    def test_ndjson(self):
+        objetos = [json.loads(l) for l in ''.join(exportacion.generar('ndjson', self.qs, chunk_size=2)).splitlines()]
+        self.assertEqual([len(o['participantes']) for o in objetos], [0, 1, 2, 3, 4])
+
+    def test_consultas_por_lote(self):
+        # 3 lotes de reuniones + su prefetch, y la lectura vacía del final
+        with self.assertNumQueries(3 * 2 + 1):
+            list(exportacion.generar('csv', self.qs, chunk_size=2))
+
+    def test_vista_en_streaming(self):
+        self.client.force_login(self.usuario)
+        respuesta = self.client.get(reverse('exportar_reuniones'), {'formato': 'ndjson'})
+        self.assertTrue(respuesta.streaming)
+        self.assertFalse(respuesta.is_async)
+        self.assertEqual(len(b''.join(respuesta.streaming_content).splitlines()), 5)
+
+    async def test_vista_asgi_envia_por_lotes(self):
+        cliente = AsyncClient()
+        await cliente.aforce_login(self.usuario)
+        respuesta = await cliente.get(reverse('exportar_reuniones'))
+        self.assertTrue(respuesta.is_async)  # Sin list() de Django sobre un generador síncrono
+        recibido = b''.join([trozo async for trozo in respuesta.streaming_content])
+
+        esperado = await sync_to_async(lambda: ''.join(exportacion.generar('csv', self.qs)))()
+        self.assertEqual(recibido, esperado.encode())
+
+    def test_formato_desconocido(self):
+        with self.assertRaises(ValueError):
+            exportacion.generar('xml', self.qs)
+
+
+# =====================================
+# PAGINACIÓN POR CURSOR
+# =====================================
+
+class PaginacionTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('docente')
+        # Dos reuniones por día: los empates en fecha_inicio se deshacen por id
+        self.reuniones = [
+            _reunion(self.usuario, f'R{dia}-{n}', _fecha(dia, 10))
+            for dia in range(1, 5) for n in range(2)
+        ]
+        self.orden = sorted(self.reuniones, key=lambda r: (r.fecha_inicio, r.pk), reverse=True)
+        self.qs = Reunion.objects.filter(creador=self.usuario)
+
+    def test_recorre_todas_sin_repetir(self):
+        vistas = []
+        pagina = paginacion.paginar(self.qs, tamano=3)
+        self.assertIsNone(pagina['anterior'])
+        while True:
+            vistas += pagina['reuniones']
+            if not pagina['siguiente']:
+                break
+            pagina = paginacion.paginar(self.qs, despues=pagina['siguiente'], tamano=3)
+        self.assertEqual([r.pk for r in vistas], [r.pk for r in self.orden])
+
+    def test_antes_devuelve_la_pagina_anterior(self):
+        primera = paginacion.paginar(self.qs, tamano=3)
+        segunda = paginacion.paginar(self.qs, despues=primera['siguiente'], tamano=3)
+        self.assertIsNotNone(segunda['anterior'])
+
+        vuelta = paginacion.paginar(self.qs, antes=segunda['anterior'], tamano=3)
+        self.assertEqual([r.pk for r in vuelta['reuniones']], [r.pk for r in primera['reuniones']])
+        self.assertIsNone(vuelta['anterior'])
+
+    def test_cursor_ida_y_vuelta(self):
+        reunion = self.reuniones[3]
+        self.assertEqual(
+            paginacion.decodificar_cursor(paginacion.codificar_cursor(reunion)),
+            (reunion.fecha_inicio, reunion.pk),
+        )
+
+    def test_cursor_invalido_es_la_primera_pagina(self):
+        self.assertIsNone(paginacion.decodificar_cursor('no-es-un-cursor'))
+        pagina = paginacion.paginar(self.qs, despues='no-es-un-cursor', tamano=3)
+        self.assertEqual([r.pk for r in pagina['reuniones']], [r.pk for r in self.orden[:3]])
+
+
+# =====================================
+# WEBHOOKS
+# =====================================
+
+@override_settings(ZOOM_WEBHOOK_SECRET_TOKEN=SECRETO)
+class WebhookTests(TestCase):
+
+    def setUp(self):
+        webhooks._recientes.clear()
+        self.addCleanup(webhooks._recientes.clear)
+        self.payload = zoom_fake.evento_participante('555', 'Ana', 'ana@example.com')
+        self.cuerpo = json.dumps(self.payload).encode()
+
+    def test_firma_valida(self):
+        cabeceras = zoom_fake.cabeceras_webhook(self.cuerpo, SECRETO)
+        self.assertTrue(webhooks.verificar_firma(
+            self.cuerpo, cabeceras['x-zm-request-timestamp'], cabeceras['x-zm-signature']
+        ))
+
+    def test_firma_invalida(self):
+        cabeceras = zoom_fake.cabeceras_webhook(self.cuerpo, 'otro_secreto')
+        ts, firma = cabeceras['x-zm-request-timestamp'], cabeceras['x-zm-signature']
+        self.assertFalse(webhooks.verificar_firma(self.cuerpo, ts, firma))
+        self.assertFalse(webhooks.verificar_firma(self.cuerpo, ts, None))
+        self.assertFalse(webhooks.verificar_firma(self.cuerpo, 'ayer', firma))
+
+    def test_cuerpo_alterado(self):
+        cabeceras = zoom_fake.cabeceras_webhook(self.cuerpo, SECRETO)
+        self.assertFalse(webhooks.verificar_firma(
+            self.cuerpo + b' ', cabeceras['x-zm-request-timestamp'], cabeceras['x-zm-signature']
+        ))
+
+    def test_timestamp_caducado(self):
+        viejo = int(time.time()) - webhooks.TOLERANCIA_FIRMA - 60
+        cabeceras = zoom_fake.cabeceras_webhook(self.cuerpo, SECRETO, timestamp=viejo)
+        self.assertFalse(webhooks.verificar_firma(
+            self.cuerpo, cabeceras['x-zm-request-timestamp'], cabeceras['x-zm-signature']
+        ))
+
+    def test_reintento_de_zoom_se_descarta(self):
+        self.assertTrue(webhooks.encolar_evento(self.payload['event'], self.cuerpo, self.payload))
+        self.assertFalse(webhooks.encolar_evento(self.payload['event'], self.cuerpo, self.payload))
+
+        # Otro proceso (sin la clave en memoria): lo detecta el índice único
+        webhooks._recientes.clear()
+        self.assertFalse(webhooks.encolar_evento(self.payload['event'], self.cuerpo, self.payload))
+        self.assertEqual(EventoWebhook.objects.count(), 1)
+
+    def test_otro_participante_no_es_duplicado(self):
+        otro = zoom_fake.evento_participante('555', 'Luis', 'luis@example.com', event_ts=self.payload['event_ts'])
+        self.assertTrue(webhooks.encolar_evento(self.payload['event'], self.cuerpo, self.payload))
+        self.assertTrue(webhooks.encolar_evento(otro['event'], json.dumps(otro).encode(), otro))
+
+    def test_vista(self):
+        url = reverse('zoom_webhook')
+        cabeceras = zoom_fake.cabeceras_webhook(self.cuerpo, SECRETO)
+        firmadas = {
+            'HTTP_X_ZM_REQUEST_TIMESTAMP': cabeceras['x-zm-request-timestamp'],
+            'HTTP_X_ZM_SIGNATURE': cabeceras['x-zm-signature'],
+        }
+        respuesta = self.client.post(url, self.cuerpo, content_type='application/json', **firmadas)
+        self.assertEqual(respuesta.json(), {'status': 'success'})
+        respuesta = self.client.post(url, self.cuerpo, content_type='application/json', **firmadas)
+        self.assertEqual(respuesta.json(), {'status': 'duplicate'})
+
+        respuesta = self.client.post(url, self.cuerpo, content_type='application/json')
+        self.assertEqual(respuesta.status_code, 401)
+
+    def test_purga_procesados_y_agotados(self):
+        viejo = timezone.now() - timedelta(days=webhooks.RETENCION_DIAS + 1)
+        eventos = {
+            'procesado': {'procesado': True},
+            'agotado': {'intentos': webhooks.MAX_INTENTOS, 'error': 'falló'},
+            'pendiente': {'intentos': 1},
+        }
+        for clave, campos in eventos.items():
+            EventoWebhook.objects.create(evento='x', clave=clave, cuerpo='{}', **campos)
+        EventoWebhook.objects.update(recibido=viejo)
+        EventoWebhook.objects.create(evento='x', clave='reciente', cuerpo='{}', procesado=True)
+
+        self.assertEqual(webhooks.purgar_procesados(), 2)
+        self.assertEqual(
+            set(EventoWebhook.objects.values_list('clave', flat=True)), {'pendiente', 'reciente'}
+        )
+
+    def test_consumidor_purga_periodicamente(self):
+        class Parar(Exception):
+            pass
+
+        esperas = mock.Mock(side_effect=[None, None, Parar])
+        with mock.patch.object(webhooks, 'purgar_procesados', return_value=0) as purgar, \
+                mock.patch('time.sleep', esperas):
+            with self.assertRaises(Parar):
+                call_command('procesar_webhooks', '--purgar-cada', '0', stdout=io.StringIO())
+        self.assertEqual(purgar.call_count, 3)  # Al arrancar y en cada vuelta, no solo al inicio
+
+
+# =====================================
+# CONFLICTOS DE AGENDA
+# =====================================
+
+class ConflictosTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('docente')
+        self.diez = _reunion(self.usuario, 'Diez', _fecha(7, 10))
+        self.once = _reunion(self.usuario, 'Once', _fecha(7, 11))
+        self.trece = _reunion(self.usuario, 'Trece', _fecha(7, 13), duracion=120)
+
+    def test_solapamiento(self):
+        encontrados = conflictos.buscar_conflictos(self.usuario, _fecha(7, 10, 30), 60)
+        self.assertEqual([r.pk for r in encontrados], [self.diez.pk, self.once.pk])
+
+    def test_reuniones_contiguas_no_chocan(self):
+        self.assertEqual(conflictos.buscar_conflictos(self.usuario, _fecha(7, 12), 60), [])
+
+    def test_reunion_larga_que_empezo_antes(self):
+        encontrados = conflictos.buscar_conflictos(self.usuario, _fecha(7, 14, 30), 15)
+        self.assertEqual([r.pk for r in encontrados], [self.trece.pk])
+
+    def test_excluir_la_propia(self):
+        encontrados = conflictos.buscar_conflictos(self.usuario, _fecha(7, 10), 60, excluir=self.diez.pk)
+        self.assertEqual(encontrados, [])
+
+    def test_otro_usuario_no_cuenta(self):
+        otro = User.objects.create_user('otro')
+        self.assertEqual(conflictos.buscar_conflictos(otro, _fecha(7, 10), 60), [])
+
+    def test_siguiente_hueco(self):
+        self.assertEqual(
+            conflictos.siguiente_hueco(self.usuario, 60, desde=_fecha(7, 10)),
+            (_fecha(7, 12), _fecha(7, 13)),
+        )
+        # 90 minutos no caben entre 12:00 y 13:00
+        self.assertEqual(
+            conflictos.siguiente_hueco(self.usuario, 90, desde=_fecha(7, 10)),
+            (_fecha(7, 15), _fecha(7, 16, 30)),
+        )
+
+    def test_siguiente_hueco_desde_una_reunion_en_curso(self):
+        self.assertEqual(
+            conflictos.siguiente_hueco(self.usuario, 30, desde=_fecha(7, 10, 30)),
+            (_fecha(7, 12), _fecha(7, 12, 30)),
+        )
+
+    def test_fecha_sin_zona_se_rechaza(self):
+        with self.assertRaises(ValueError):
+            conflictos.buscar_conflictos(self.usuario, datetime(2030, 1, 7, 10), 60)
+        with self.assertRaises(ValueError):
+            conflictos.siguiente_hueco(self.usuario, 60, desde=datetime(2030, 1, 7, 10))
+
+    def test_api_interpreta_la_hora_en_la_zona(self):
+        self.client.force_login(self.usuario)
+        url = reverse('api_agenda_conflictos')
+        # 03:30 en Hermosillo = 10:30Z: choca con Diez y Once
+        respuesta = self.client.get(url, {'start_time': '2030-01-07T03:30', 'duration': 60})
+        self.assertEqual([c['id'] for c in respuesta.json()['conflictos']], [self.diez.pk, self.once.pk])
+        respuesta = self.client.get(url, {'start_time': '2030-01-07T10:30', 'duration': 60, 'timezone': 'UTC'})
+        self.assertEqual(len(respuesta.json()['conflictos']), 2)
+        respuesta = self.client.get(url, {'start_time': '2030-01-07T10:30', 'duration': 60, 'timezone': 'Marte/Base'})
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_sin_hueco_antes_del_limite(self):
+        self.assertIsNone(conflictos.siguiente_hueco(self.usuario, 90, desde=_fecha(7, 10), hasta=_fecha(7, 16)))
+
+
+# =====================================
+# API: GET CONDICIONAL
+# =====================================
+
+class ApiEtagTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user('docente')
+        self.client.force_login(self.usuario)
+        _reunion(self.usuario, 'Clase', _fecha(7, 10))
+        self.url = reverse('api_reuniones')
+
+    def test_304_si_no_cambia(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        etag = respuesta['ETag']
+
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta.content, b'')
+
+    def test_cambio_invalida_el_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        _reunion(self.usuario, 'Otra', _fecha(8, 10))
+
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta['ETag'], etag)
+        self.assertEqual(len(respuesta.json()['reuniones']), 2)
+
+    def test_etag_distinto_por_url(self):
+        etag = self.client.get(self.url)['ETag']
+        respuesta = self.client.get(self.url, {'campos': 'id,titulo'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_304_sin_consultar_reuniones(self):
+        etag = self.client.get(self.url)['ETag']
+        with CaptureQueriesContext(connection) as consultas:
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # Solo sesión, usuario y la versión en caché
+        self.assertFalse([c for c in consultas if Reunion._meta.db_table in c['sql']])
+
+    def test_sin_sesion(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+
+# =====================================
+# TRABAJOS DE SINCRONIZACIÓN
+# =====================================
+
+class TrabajosTests(TestCase):
+
+    def setUp(self):
+        self.ana = User.objects.create_user('ana')
+        self.luis = User.objects.create_user('luis')
+
+    def test_coalescencia(self):
+        trabajo, creado = jobs.encolar_sincronizacion(self.ana)
+        self.assertTrue(creado)
+        self.assertEqual(jobs.encolar_sincronizacion(self.ana), (trabajo, False))
+
+    def test_toma_el_mas_antiguo_una_sola_vez(self):
+        primero, _ = jobs.encolar_sincronizacion(self.ana)
+        segundo, _ = jobs.encolar_sincronizacion(self.luis)
+        TrabajoSincronizacion.objects.filter(pk=primero.pk).update(creado=timezone.now() - timedelta(minutes=1))
+
+        tomado = jobs.tomar_siguiente()
+        self.assertEqual(tomado.pk, primero.pk)
+        self.assertEqual(tomado.estado, TrabajoSincronizacion.EN_PROCESO)
+        self.assertIsNotNone(tomado.iniciado)
+        self.assertEqual(jobs.tomar_siguiente().pk, segundo.pk)
+        self.assertIsNone(jobs.tomar_siguiente())
+
+    def test_filtra_por_usuario(self):
+        jobs.encolar_sincronizacion(self.ana)
+        self.assertIsNone(jobs.tomar_siguiente(usuario=self.luis))
+        self.assertEqual(jobs.tomar_siguiente(usuario=self.ana).usuario, self.ana)
+
+    def test_en_proceso_permite_encolar_otro(self):
+        jobs.encolar_sincronizacion(self.ana)
+        en_curso = jobs.tomar_siguiente()
+        nuevo, creado = jobs.encolar_sincronizacion(self.ana)
+        self.assertTrue(creado)  # El que está en proceso pudo listar antes del cambio
+        self.assertNotEqual(nuevo.pk, en_curso.pk)
+        self.assertEqual(nuevo.estado, TrabajoSincronizacion.PENDIENTE)
+        self.assertEqual(jobs.encolar_sincronizacion(self.ana), (nuevo, False))
+
+    def test_carrera_con_pendiente_ya_tomado_reintenta_la_insercion(self):
+        crear = TrabajoSincronizacion.objects.create
+        llamadas = []
+
+        def create(**kwargs):
+            llamadas.append(kwargs)
+            if len(llamadas) == 1:
+                # Otra petición encoló y un worker lo tomó antes de que se pudiera leer
+                raise IntegrityError('sincronizacion_pendiente_unica')
+            return crear(**kwargs)
+
+        with mock.patch.object(TrabajoSincronizacion.objects, 'create', create):
+            trabajo, creado = jobs.encolar_sincronizacion(self.ana)
+        self.assertTrue(creado)
+        self.assertEqual(len(llamadas), 2)
+        self.assertEqual(trabajo.estado, TrabajoSincronizacion.PENDIENTE)
+
+    def test_liberar_colgados(self):
+        jobs.encolar_sincronizacion(self.ana)
+        trabajo = jobs.tomar_siguiente()
+        TrabajoSincronizacion.objects.filter(pk=trabajo.pk).update(iniciado=timezone.now() - timedelta(hours=1))
+        self.assertEqual(jobs.liberar_colgados(), 1)
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, TrabajoSincronizacion.ERROR)
+
+
+# =====================================
+# INVITACIONES
+# =====================================
+
+class ConexionQueFalla:
+    """
+    Conexión de correo que entrega en mail.outbox, rechaza a los
+    destinatarios de `rechaza` y cuyo open() falla a partir de la
+    llamada número `falla_en`.
+    """
+
+    def __init__(self, falla_en, rechaza=()):
+        self.falla_en = falla_en
+        self.rechaza = set(rechaza)
+        self.aperturas = 0
+
+    def open(self):
+        self.aperturas += 1
+        if self.aperturas >= self.falla_en:
+            raise ConnectionRefusedError('smtp caído')
+
+    def close(self):
+        pass
+
+    def send_messages(self, mensajes):
+        for mensaje in mensajes:
+            if self.rechaza.intersection(mensaje.to):
+                raise ConnectionResetError('conexión perdida')
+        mail.outbox.extend(mensajes)
+        return len(mensajes)
+
+
+class InvitacionesTests(TestCase):
+
+    def setUp(self):
+        self.usuario = User.objects.create_user('docente')
+        self.reunion = _reunion(
+            self.usuario, 'Clase', _fecha(1, 17), zoom_meeting_id='555',
+            join_url='https://zoom.us/j/555', zona_horaria='America/Hermosillo',
+        )
+        for i in range(3):
+            Participante.objects.create(reunion=self.reunion, nombre=f'P{i}', email=f'p{i}@ejemplo.com')
+
+    def test_envia_con_la_hora_local_y_marca(self):
+        resultado = invitaciones.enviar_invitaciones(self.reunion, hilos=1, por_segundo=1000)
+        self.assertEqual(resultado, {'enviadas': 3, 'fallidas': 0})
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn('Fecha: 01/01/2030 10:00 (America/Hermosillo)', mail.outbox[0].body)
+        self.assertFalse(self.reunion.participantes.filter(invitacion_enviada=False).exists())
+        self.assertNotIn(self.reunion, invitaciones.reuniones_con_pendientes())
+
+    def test_sin_enlace_no_envia(self):
+        Reunion.objects.filter(pk=self.reunion.pk).update(join_url='')
+        self.reunion.refresh_from_db()
+        self.assertEqual(invitaciones.enviar_invitaciones(self.reunion, hilos=1), {'enviadas': 0, 'fallidas': 0})
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_reapertura_fallida_marca_los_ya_enviados(self):
+        # La primera apertura funciona; la reapertura tras el fallo de p1 no
+        conexion = ConexionQueFalla(falla_en=2, rechaza=['p1@ejemplo.com'])
+        with mock.patch.object(invitaciones, 'get_connection', return_value=conexion):
+            resultado = invitaciones.enviar_invitaciones(self.reunion, hilos=1, por_segundo=1000)
+
+        self.assertEqual(resultado, {'enviadas': 1, 'fallidas': 2})
+        self.assertEqual(len(mail.outbox), 1)
+        enviados = set(self.reunion.participantes.filter(invitacion_enviada=True).values_list('email', flat=True))
+        self.assertEqual(enviados, {'p0@ejemplo.com'})
+        self.assertEqual(
+            list(self.reunion.participantes.filter(invitacion_enviada=False).values_list('intentos_invitacion', flat=True)),
+            [1, 1],
+        )
+
+    def test_deja_de_reintentar_al_llegar_al_maximo(self):
+        for _ in range(invitaciones.MAX_INTENTOS_ENVIO):
+            with mock.patch.object(invitaciones, 'get_connection', return_value=ConexionQueFalla(falla_en=1)):
+                self.assertEqual(invitaciones.enviar_invitaciones(self.reunion, hilos=1)['fallidas'], 3)
+
+        self.assertNotIn(self.reunion, invitaciones.reuniones_con_pendientes())
+        self.assertEqual(invitaciones.enviar_invitaciones(self.reunion, hilos=1), {'enviadas': 0, 'fallidas': 0})
+        self.assertEqual(len(mail.outbox), 0)
+
+
+# =====================================
+# PROGRAMADOR DE PETICIONES A ZOOM
+# =====================================
+
+class RelojFalso:
+    """ Sustituye al módulo time: sleep() avanza el reloj sin esperar. """
+
+    def __init__(self):
+        self.ahora = 1000.0
+        self.esperas = []
+
+    def monotonic(self):
+        return self.ahora
+
+    def time(self):
+        return self.ahora
+
+    def sleep(self, segundos):
+        self.esperas.append(segundos)
+        self.ahora += segundos
+
+
+class RespuestaFalsa:
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def _error_requests(causa):
+    """ requests.ConnectionError tal como lo lanza requests (MaxRetryError con la causa). """
+    return requests.ConnectionError(MaxRetryError(None, 'https://api.zoom.us/v2/users/me/meetings', causa))
+
+
+class ProgramadorTests(TestCase):
+    URL_CREAR = 'https://api.zoom.us/v2/users/me/meetings'
+    URL_REUNION = 'https://api.zoom.us/v2/meetings/555'
+
+    def setUp(self):
+        self.reloj = RelojFalso()
+        for modulo in (zoom_scheduler, limites):
+            parche = mock.patch.object(modulo, 'time', self.reloj)
+            parche.start()
+            self.addCleanup(parche.stop)
+        self.programador = zoom_scheduler.ProgramadorZoom(backoff_base=0.5, backoff_tope=30)
+
+    def _ejecutar(self, method, url, resultados):
+        """ Ejecuta una petición cuyas respuestas (o excepciones) salen de `resultados`. """
+        pendientes = list(resultados)
+        llamadas = []
+
+        def enviar():
+            llamadas.append(method)
+            resultado = pendientes.pop(0)
+            if isinstance(resultado, Exception):
+                raise resultado
+            return resultado
+
+        return self.programador.ejecutar(enviar, method, url, cuenta=1), len(llamadas)
+
+    def test_429_espera_retry_after(self):
+        respuesta, llamadas = self._ejecutar('POST', self.URL_CREAR, [
+            RespuestaFalsa(429, {'Retry-After': '2'}), RespuestaFalsa(201),
+        ])
+        self.assertEqual((respuesta.status_code, llamadas), (201, 2))
+        self.assertEqual(self.reloj.esperas, [2.0])
+        metricas = self.programador.metricas()
+        self.assertEqual((metricas['limitadas_429'], metricas['reintentos']), (1, 1))
+
+    def test_429_con_retry_after_largo_no_reintenta(self):
+        respuesta, llamadas = self._ejecutar('GET', self.URL_REUNION, [
+            RespuestaFalsa(429, {'Retry-After': '3600'}),
+        ])
+        self.assertEqual((respuesta.status_code, llamadas), (429, 1))
+
+    def test_5xx_solo_se_reintenta_si_es_idempotente(self):
+        respuesta, llamadas = self._ejecutar('GET', self.URL_REUNION, [RespuestaFalsa(503), RespuestaFalsa(200)])
+        self.assertEqual((respuesta.status_code, llamadas), (200, 2))
+
+        respuesta, llamadas = self._ejecutar('POST', self.URL_CREAR, [RespuestaFalsa(503), RespuestaFalsa(201)])
+        self.assertEqual((respuesta.status_code, llamadas), (503, 1))
+
+    def test_5xx_respeta_max_reintentos(self):
+        total = self.programador.max_reintentos + 1
+        respuesta, llamadas = self._ejecutar('GET', self.URL_REUNION, [RespuestaFalsa(502)] * total)
+        self.assertEqual((respuesta.status_code, llamadas), (502, total))
+
+    def test_post_reintenta_solo_si_no_llego_a_enviarse(self):
+        rechazada = _error_requests(NewConnectionError(None, 'Connection refused'))
+        respuesta, llamadas = self._ejecutar('POST', self.URL_CREAR, [rechazada, RespuestaFalsa(201)])
+        self.assertEqual((respuesta.status_code, llamadas), (201, 2))
+
+        respuesta, llamadas = self._ejecutar('POST', self.URL_CREAR, [httpx.ConnectError('refused'), RespuestaFalsa(201)])
+        self.assertEqual((respuesta.status_code, llamadas), (201, 2))
+
+        with self.assertRaises(requests.ReadTimeout):
+            self._ejecutar('POST', self.URL_CREAR, [requests.ReadTimeout(), RespuestaFalsa(201)])
+        with self.assertRaises(requests.ConnectionError):
+            self._ejecutar('POST', self.URL_CREAR, [_error_requests(ProtocolError('cortada')), RespuestaFalsa(201)])
+
+    def test_fallo_al_conectar_igual_en_ambos_transportes(self):
+        for error in (
+            requests.ConnectTimeout(),
+            _error_requests(NewConnectionError(None, 'Connection refused')),
+            httpx.ConnectError('refused'),
+            httpx.ConnectTimeout('timeout'),
+        ):
+            self.assertTrue(zoom_scheduler.fallo_al_conectar(error), error)
+        for error in (
+            requests.ReadTimeout(),
+            _error_requests(ProtocolError('cortada')),
+            httpx.ReadTimeout('timeout'),
+            httpx.RemoteProtocolError('cortada'),
+        ):
+            self.assertFalse(zoom_scheduler.fallo_al_conectar(error), error)
+
+    def test_bucket_limita_la_tasa_por_cuenta(self):
+        self.programador.limites = {'light': 2}
+        inicio = self.reloj.ahora
+        for _ in range(6):
+            self._ejecutar('GET', self.URL_REUNION, [RespuestaFalsa(200)])
+        # Ráfaga de 2 y luego 2 por segundo: 4 peticiones más tardan 2 s
+        self.assertAlmostEqual(self.reloj.ahora - inicio, 2.0)
+        self.assertEqual(self.programador.metricas()['esperas_locales'], 4)
+
+        # Otra cuenta tiene su propio bucket
+        antes = self.reloj.ahora
+        self.programador.ejecutar(lambda: RespuestaFalsa(200), 'GET', self.URL_REUNION, cuenta=2)
+        self.assertEqual(self.reloj.ahora, antes)
+
+
+# =====================================
+# CÓDIGO QR
+# =====================================
+
+class QrTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user('docente')
+        self.client.force_login(self.usuario)
+        self.reunion = _reunion(
+            self.usuario, 'Clase', _fecha(1, 17), zoom_meeting_id='555', join_url='https://zoom.us/j/555'
+        )
+        self.url = reverse('qr_reunion', args=[self.reunion.pk])
+
+    def test_png_y_svg(self):
+        respuesta = self.client.get(self.url, {'tamano': 300})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta['Content-Type'], 'image/png')
+        self.assertTrue(respuesta.content.startswith(b'\x89PNG'))
+
+        respuesta = self.client.get(self.url, {'formato': 'svg'})
+        self.assertEqual(respuesta['Content-Type'], 'image/svg+xml')
+        self.assertEqual(self.client.get(self.url, {'formato': 'gif'}).status_code, 400)
+
+    def test_etag_y_304(self):
+        etag = self.client.get(self.url)['ETag']
+        respuesta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+
+        # Otro enlace, otra imagen
+        Reunion.objects.filter(pk=self.reunion.pk).update(join_url='https://zoom.us/j/556')
+        self.assertNotEqual(self.client.get(self.url)['ETag'], etag)
+
+    def test_sin_enlace_404_y_sin_imagen(self):
+        Reunion.objects.filter(pk=self.reunion.pk).update(
+            zoom_meeting_id=None, join_url='', estado_zoom=Reunion.CREANDO
+        )
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        detalle = self.client.get(reverse('detalle_reunion', args=[self.reunion.pk]))
+        self.assertNotContains(detalle, self.url)
+        self.assertContains(detalle, 'El código QR estará disponible')
+
+    def test_solo_el_dueno(self):
+        self.client.force_login(User.objects.create_user('otro'))
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+# =====================================
+# TOKENS DE ZOOM
+# =====================================
+
+class RenovacionTokenTests(ServidorZoomFalsoMixin, TransactionTestCase):
+    """ Renovación single-flight y anticipada contra el servidor falso. """
+
+    def _renovaciones(self):
+        return self.estado.llamadas['POST /oauth/token'] - 1  # La primera es la autorización
+
+    def _caducar(self, segundos=-10):
+        actuales = tokens.obtener(self.usuario.pk)
+        tokens.guardar(self.usuario.pk, actuales.access_token, actuales.refresh_token, time.time() + segundos)
+        return actuales.access_token
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_caducado_se_renueva_una_sola_vez(self):
+        anterior = self._caducar()
+
+        # La BD de tests (SQLite en memoria) falla con "table is locked" en vez
+        # de esperar cuando dos hilos la tocan a la vez: se serializan sus accesos
+        # y el lock de renovación va en una caché del proceso (aquí todos son hilos)
+        bd = threading.Lock()
+
+        def serializado(funcion):
+            def envoltura(*args):
+                with bd:
+                    return funcion(*args)
+            return envoltura
+
+        def pedir(_):
+            try:
+                return ZoomService(self.usuario).get_access_token()
+            finally:
+                connection.close()
+
+        with mock.patch.object(tokens, 'recargar', serializado(tokens.recargar)), \
+                mock.patch.object(tokens, 'guardar', serializado(tokens.guardar)), \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            obtenidos = set(executor.map(pedir, range(8)))
+
+        self.assertEqual(self._renovaciones(), 1)
+        self.assertEqual(len(obtenidos), 1)
+        self.assertNotIn(anterior, obtenidos)
+
+    def test_renovado_por_otro_proceso_no_se_renueva(self):
+        self._caducar()
+        # Otro proceso ya guardó un token nuevo; este proceso tiene el caducado en memoria
+        TokenZoom.objects.filter(usuario=self.usuario).update(
+            access_token='token_de_otro_proceso', expira=timezone.now() + timedelta(hours=1)
+        )
+        self.assertEqual(ZoomService(self.usuario).get_access_token(), 'token_de_otro_proceso')
+        self.assertEqual(self._renovaciones(), 0)
+
+    def test_por_caducar_se_renueva_en_segundo_plano(self):
+        anterior = self._caducar(segundos=60)  # Dentro del margen de renovación anticipada
+        self.assertEqual(ZoomService(self.usuario).get_access_token(), anterior)  # No espera
+
+        for hilo in threading.enumerate():
+            if hilo.name == 'zoom-token-refresh':
+                hilo.join(5)
+        self.assertEqual(self._renovaciones(), 1)
+        self.assertNotEqual(tokens.obtener(self.usuario.pk).access_token, anterior)
+
+    def test_refresh_token_revocado_exige_autorizar_de_nuevo(self):
+        self._caducar()
+        TokenZoom.objects.filter(usuario=self.usuario).update(refresh_token='')
+        tokens.olvidar()
+        with self.assertRaises(Exception):
+            ZoomService(self.usuario).get_access_token()
+
+
+class AlmacenTokensTests(TestCase):
+    """ Tokens por usuario: BD + copia en memoria del proceso. """
+
+    def setUp(self):
+        tokens.olvidar()
+        self.addCleanup(tokens.olvidar)
+        self.ana = User.objects.create_user('ana')
+        self.luis = User.objects.create_user('luis')
+
+    def test_cada_usuario_tiene_sus_tokens(self):
+        tokens.guardar(self.ana.pk, 'acceso_ana', 'refresh_ana', time.time() + 3600)
+        tokens.guardar(self.luis.pk, 'acceso_luis', 'refresh_luis', time.time() + 3600)
+        self.assertEqual(tokens.obtener(self.ana.pk).access_token, 'acceso_ana')
+        self.assertEqual(tokens.obtener(self.luis.pk).access_token, 'acceso_luis')
+
+        tokens.revocar(self.ana.pk)
+        self.assertIsNone(tokens.obtener(self.ana.pk))
+        self.assertEqual(tokens.obtener(self.luis.pk).refresh_token, 'refresh_luis')
+
+    def test_bd_solo_la_primera_vez(self):
+        tokens.guardar(self.ana.pk, 'acceso', 'refresh', time.time() + 3600)
+        tokens.olvidar()  # Como un proceso recién arrancado
+        with self.assertNumQueries(1):
+            tokens.obtener(self.ana.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(tokens.obtener(self.ana.pk).access_token, 'acceso')
+
+    def test_guardar_es_write_through(self):
+        expira = time.time() + 3600
+        tokens.guardar(self.ana.pk, 'acceso', 'refresh', expira)
+        tokens.guardar(self.ana.pk, 'acceso_2', 'refresh_2', expira)
+        fila = TokenZoom.objects.get(usuario=self.ana)
+        self.assertEqual((fila.access_token, fila.refresh_token), ('acceso_2', 'refresh_2'))
+        self.assertAlmostEqual(fila.expira.timestamp(), expira, places=3)
+
+    def test_recargar_ve_la_rotacion_de_otro_proceso(self):
+        tokens.guardar(self.ana.pk, 'acceso', 'refresh', time.time() + 3600)
+        TokenZoom.objects.filter(usuario=self.ana).update(refresh_token='rotado')
+        self.assertEqual(tokens.obtener(self.ana.pk).refresh_token, 'refresh')  # Copia en memoria
+        self.assertEqual(tokens.recargar(self.ana.pk).refresh_token, 'rotado')
+        self.assertEqual(tokens.obtener(self.ana.pk).refresh_token, 'rotado')
+
+
+# =====================================
+# LISTADO PAGINADO DE ZOOM
+# =====================================
+
+class ListadoZoomTests(ServidorZoomFalsoMixin, TransactionTestCase):
+    """ iterar_reuniones sigue next_page_token y entrega conforme llega cada página. """
+
+    def setUp(self):
+        super().setUp()
+        self.ids = self.estado.sembrar(7)
+
+    def _paginas_pedidas(self):
+        return self.estado.llamadas['GET /v2/users/{id}/meetings']
+
+    def test_recorre_todas_las_paginas(self):
+        meetings = list(ZoomService(self.usuario).iterar_reuniones(page_size=3))
+        self.assertEqual([m['id'] for m in meetings], sorted(self.ids))
+        self.assertEqual(self._paginas_pedidas(), 3)
+
+    def test_es_perezoso(self):
+        iterador = ZoomService(self.usuario).iterar_reuniones(page_size=3)
+        next(iterador)
+        self.assertEqual(self._paginas_pedidas(), 1)
+        iterador.close()
+
+    def test_prefetch_entrega_lo_mismo(self):
+        meetings = list(ZoomService(self.usuario).iterar_reuniones(page_size=3, prefetch=True))
+        self.assertEqual([m['id'] for m in meetings], sorted(self.ids))
+        self.assertEqual(self._paginas_pedidas(), 3)
+
+    def test_page_size_limitado_al_maximo_de_zoom(self):
+        list(ZoomService(self.usuario).iterar_reuniones(page_size=5000))
+        self.assertEqual(self._paginas_pedidas(), 1)
+        self.assertEqual(len(ZoomService(self.usuario).listar_reuniones()), 7)
+
+    async def test_variante_asincrona(self):
+        try:
+            meetings = [m async for m in ZoomServiceAsync(self.usuario).aiterar_reuniones(page_size=3)]
+        finally:
+            await cerrar_cliente()
+        self.assertEqual([m['id'] for m in meetings], sorted(self.ids))
+        self.assertEqual(self._paginas_pedidas(), 3)
+
+
+# =====================================
+# ASISTENCIA DESDE WEBHOOKS
+# =====================================
+
+class AsistenciaTests(TestCase):
+
+    def setUp(self):
+        asistencia.limpiar_cache()
+        self.addCleanup(asistencia.limpiar_cache)
+        self.usuario = User.objects.create_user('docente')
+        self.reunion = _reunion(self.usuario, 'Clase', _fecha(1, 17), zoom_meeting_id='555')
+        self.otra = _reunion(self.usuario, 'Otra', _fecha(2, 17), zoom_meeting_id='556')
+        for reunion in (self.reunion, self.otra):
+            Participante.objects.create(reunion=reunion, nombre='José  Pérez', email='jose@ejemplo.com')
+            Participante.objects.create(reunion=reunion, nombre='Ana', email='ana@ejemplo.com')
+            Participante.objects.create(reunion=reunion, nombre='Luis', email='luis@ejemplo.com')
+
+    def _asistentes(self, reunion):
+        return set(reunion.participantes.filter(asistio=True).values_list('nombre', flat=True))
+
+    def test_coincide_por_nombre_o_email_normalizados(self):
+        marcados = asistencia.registrar_asistencias([
+            zoom_fake.evento_participante('555', 'jose perez', 'otro@ejemplo.com'),  # Por nombre
+            zoom_fake.evento_participante('555', 'Invitado', ' ANA@Ejemplo.com '),  # Por email
+            zoom_fake.evento_participante('556', 'Desconocido', 'nadie@ejemplo.com'),
+        ])
+        self.assertEqual(marcados, 2)
+        self.assertEqual(self._asistentes(self.reunion), {'José  Pérez', 'Ana'})
+        self.assertEqual(self._asistentes(self.otra), set())
+
+    def test_un_update_por_reunion(self):
+        eventos = [
+            zoom_fake.evento_participante('555', nombre, f'{nombre.lower()}@ejemplo.com')
+            for nombre in ('Ana', 'Luis')
+        ] + [zoom_fake.evento_participante('556', 'Ana', 'ana@ejemplo.com')]
+        # Resolver IDs (1) + un UPDATE por reunión (2) + actualizado de las
+        # reuniones (1) + versión del usuario en la caché de la BD (1)
+        with self.assertNumQueries(5):
+            self.assertEqual(asistencia.registrar_asistencias(eventos), 3)
+
+    def test_reuniones_resueltas_desde_la_cache(self):
+        asistencia.resolver_reuniones(['555', '556'])
+        with self.assertNumQueries(0):
+            resueltas = asistencia.resolver_reuniones(['555', '556', 555])
+        self.assertEqual(resueltas['555'], (self.reunion.pk, self.usuario.pk))
+
+        # Al borrar la reunión sale de la caché
+        self.otra.delete()
+        self.assertNotIn('556', asistencia.resolver_reuniones(['556']))
+
+    def test_reunion_desconocida_o_evento_incompleto(self):
+        self.assertEqual(asistencia.registrar_asistencias([
+            zoom_fake.evento_participante('999', 'Ana', 'ana@ejemplo.com'),
+            {'event': 'meeting.participant_joined', 'payload': {'object': {'id': '555', 'participant': {}}}},
+        ]), 0)
+
+    def test_procesado_por_el_consumidor(self):
+        payload = zoom_fake.evento_participante('555', 'Luis', 'luis@ejemplo.com')
+        webhooks.encolar_evento(payload['event'], json.dumps(payload).encode(), payload)
+        self.assertEqual(webhooks.procesar_pendientes(), 1)
+        self.assertEqual(self._asistentes(self.reunion), {'Luis'})
+        self.assertTrue(EventoWebhook.objects.get().procesado)
+
+
+# =====================================
+# DASHBOARD
+# =====================================
+
+class DashboardTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user('docente')
+        ahora = timezone.now()
+        _reunion(self.usuario, 'Pasada', ahora - timedelta(days=2))
+        _reunion(self.usuario, 'Próxima', ahora + timedelta(days=2))
+        _reunion(self.usuario, 'Otra próxima', ahora + timedelta(days=3))
+        _reunion(User.objects.create_user('otro'), 'Ajena', ahora + timedelta(days=1))
+
+    def _consultas_a_reuniones(self, funcion):
+        with CaptureQueriesContext(connection) as contexto:
+            resultado = funcion()
+        return resultado, [q for q in contexto.captured_queries if 'reuniones_reunion' in q['sql']]
+
+    def test_una_consulta_y_luego_cache(self):
+        resumen, consultas = self._consultas_a_reuniones(lambda: dashboard.resumen_usuario(self.usuario))
+        self.assertEqual(resumen, {'totales': 3, 'proximas': 2, 'pasadas': 1})
+        self.assertEqual(len(consultas), 1)
+
+        resumen, consultas = self._consultas_a_reuniones(lambda: dashboard.resumen_usuario(self.usuario))
+        self.assertEqual(resumen['totales'], 3)
+        self.assertEqual(consultas, [])
+
+    def test_caduca_al_empezar_la_siguiente(self):
+        _reunion(self.usuario, 'Inminente', timezone.now() + timedelta(seconds=90))
+        with mock.patch.object(dashboard.cache, 'set') as guardar:
+            dashboard.resumen_usuario(self.usuario)
+        ttl = guardar.call_args.args[2]
+        self.assertLessEqual(ttl, 91)
+        self.assertGreater(ttl, 0)
+
+    def test_se_invalida_al_cambiar_las_reuniones(self):
+        dashboard.resumen_usuario(self.usuario)
+        nueva = _reunion(self.usuario, 'Nueva', timezone.now() + timedelta(days=5))  # post_save
+        self.assertEqual(dashboard.resumen_usuario(self.usuario)['totales'], 4)
+        nueva.delete()  # post_delete
+        self.assertEqual(dashboard.resumen_usuario(self.usuario)['totales'], 3)
+
+        # bulk_create (sin señales) de la sincronización y del outbox
+        sync.sincronizar_reuniones([_meeting('900', timezone.now() + timedelta(days=6))], self.usuario)
+        self.assertEqual(dashboard.resumen_usuario(self.usuario)['proximas'], 3)
+        inicio = _fecha(9, 10)
+        outbox.encolar_creaciones(self.usuario, [{
+            'titulo': 'Lote', 'fecha_inicio': inicio, 'duracion': 30,
+            'zona_horaria': 'America/Hermosillo', 'datos_zoom': _datos_zoom('Lote', inicio, 30),
+        }])
+        self.assertEqual(dashboard.resumen_usuario(self.usuario)['proximas'], 4)
+
+    def test_vista_inicio(self):
+        self.client.force_login(self.usuario)
+        respuesta = self.client.get(reverse('inicio'))
+        self.assertEqual(
+            (respuesta.context['totales'], respuesta.context['proximas'], respuesta.context['pasadas']), (3, 2, 1)
+        )
+
+
+# =====================================
+# CALENDARIO ICS
+# =====================================
+
+class CalendarioTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = User.objects.create_user('docente')
+        self.primera = _reunion(
+            self.usuario, 'Clase; tema, uno', _fecha(1, 17), zoom_meeting_id='555', join_url='https://zoom.us/j/555'
+        )
+        self.segunda = _reunion(
+            self.usuario, 'Ñandú ' * 20, _fecha(2, 17), zoom_meeting_id='556', join_url='https://zoom.us/j/556'
+        )
+        _reunion(self.usuario, 'En el outbox', _fecha(3, 17))  # Sin enlace aún: no se publica
+        self.url = reverse('calendario_ics', args=[calendario.token_usuario(self.usuario.pk)])
+
+    def test_formato(self):
+        _, datos = calendario.feed_usuario(self.usuario.pk)
+        self.assertTrue(datos.startswith(b'BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(datos.endswith(b'END:VCALENDAR\r\n'))
+        self.assertEqual(datos.count(b'BEGIN:VEVENT'), 2)
+        self.assertIn(b'SUMMARY:Clase\\; tema\\, uno\r\n', datos)
+        self.assertIn(b'DTSTART:20300101T170000Z\r\n', datos)
+        self.assertIn(b'UID:reunion-555@zoom-reuniones', datos)
+        self.assertNotIn(b'En el outbox', datos)
+        for linea in datos.split(b'\r\n'):
+            self.assertLessEqual(len(linea), 75)
+            linea.decode('utf-8')  # El plegado no parte caracteres
+
+    def test_sin_cambios_no_consulta_reuniones(self):
+        calendario.feed_usuario(self.usuario.pk)
+        with CaptureQueriesContext(connection) as contexto:
+            calendario.feed_usuario(self.usuario.pk)
+        self.assertFalse([q for q in contexto.captured_queries if 'reuniones_reunion' in q['sql']])
+
+    def test_solo_regenera_las_modificadas(self):
+        etag, _ = calendario.feed_usuario(self.usuario.pk)
+        self.primera.titulo = 'Renombrada'
+        self.primera.save()
+        self.segunda.delete()
+
+        with mock.patch.object(calendario, 'vevent', wraps=calendario.vevent) as generar:
+            nuevo_etag, datos = calendario.feed_usuario(self.usuario.pk)
+        self.assertEqual(generar.call_count, 1)
+        self.assertNotEqual(nuevo_etag, etag)
+        self.assertIn(b'SUMMARY:Renombrada', datos)
+        self.assertNotIn(b'UID:reunion-556', datos)
+
+    def test_vista(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=respuesta['ETag']).status_code, 304)
+
+        falsa = reverse('calendario_ics', args=[f'{self.usuario.pk}:firma-falsa'])
+        self.assertEqual(self.client.get(falsa).status_code, 404)
+
+
+# =====================================
+# MÉTRICAS
+# =====================================
+
+class MetricasTests(TestCase):
+
+    def setUp(self):
+        metricas.reiniciar()
+        self.addCleanup(metricas.reiniciar)
+        self.usuario = User.objects.create_user('docente')
+        self.client.force_login(self.usuario)
+
+    def _lineas(self, prefijo):
+        return [linea for linea in metricas.exposicion().splitlines() if linea.startswith(prefijo)]
+
+    def test_peticion_con_sus_consultas(self):
+        self.client.get(reverse('inicio'))
+        [contador] = self._lineas('reuniones_peticiones_total{vista="inicio"')
+        self.assertTrue(contador.endswith(' 1'))
+        self.assertIn('status="200"', contador)
+        [consultas] = self._lineas('reuniones_peticion_consultas_sum{vista="inicio"')
+        self.assertGreater(float(consultas.split()[-1]), 0)
+
+    def test_cuerpo_en_streaming_se_mide_al_terminar(self):
+        for dia in (1, 2, 3):
+            _reunion(self.usuario, f'R{dia}', _fecha(dia, 10))
+        respuesta = self.client.get(reverse('exportar_reuniones'))
+        self.assertEqual(self._lineas('reuniones_peticiones_total{vista="exportar_reuniones"'), [])
+
+        b''.join(respuesta.streaming_content)
+        [consultas] = self._lineas('reuniones_peticion_consultas_sum{vista="exportar_reuniones"')
+        self.assertGreater(float(consultas.split()[-1]), 0)  # Las del cuerpo cuentan
+
+    def test_formato_de_exposicion(self):
+        metricas.registrar_peticion('inicio', 'GET', 200, 0.02, 3, 0.001)
+        metricas.registrar_peticion('inicio', 'GET', 200, 0.3, 3, 0.001)
+        texto = metricas.exposicion()
+
+        self.assertIn('# TYPE reuniones_peticion_segundos histogram', texto)
+        self.assertIn('# TYPE reuniones_peticiones_total counter', texto)
+        self.assertIn('reuniones_peticion_segundos_bucket{vista="inicio",metodo="GET",le="0.025"} 1', texto)
+        self.assertIn('reuniones_peticion_segundos_bucket{vista="inicio",metodo="GET",le="0.5"} 2', texto)  # Acumulado
+        self.assertIn('reuniones_peticion_segundos_bucket{vista="inicio",metodo="GET",le="+Inf"} 2', texto)
+        self.assertIn('reuniones_peticion_segundos_count{vista="inicio",metodo="GET"} 2', texto)
+
+        # Del programador de Zoom: la cola es un gauge; el resto, contadores
+        self.assertIn('# TYPE zoom_en_cola gauge', texto)
+        self.assertIn('# TYPE zoom_reintentos_total counter', texto)
+        self.assertNotIn('# TYPE zoom_en_cola_total', texto)
+
+    def test_llamadas_a_zoom_sin_ids_en_las_etiquetas(self):
+        self.assertEqual(metricas.endpoint_zoom('https://api.zoom.us/v2/meetings/123456'), '/v2/meetings/{id}')
+        self.assertEqual(metricas.endpoint_zoom('https://api.zoom.us/v2/users/me'), '/v2/users/me')
+        self.assertEqual(metricas.endpoint_zoom('https://api.zoom.us/v2/users/abc/meetings'), '/v2/users/{id}/meetings')
+
+        with self.assertRaises(requests.ConnectTimeout):
+            metricas.medir_zoom('GET', 'https://api.zoom.us/v2/meetings/1', mock.Mock(side_effect=requests.ConnectTimeout))
+        self.assertTrue(self._lineas(
+            'zoom_llamada_segundos_count{metodo="GET",endpoint="/v2/meetings/{id}",status="error"} 1'
+        ))
+
+    def test_acceso_al_endpoint(self):
+        url = reverse('metricas')
+        self.assertEqual(self.client.get(url).status_code, 403)  # No staff
+
+        with override_settings(METRICAS_TOKEN='secreto'):
+            self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer otro').status_code, 401)
+            respuesta = self.client.get(url, HTTP_AUTHORIZATION='Bearer secreto')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertTrue(respuesta['Content-Type'].startswith('text/plain; version=0.0.4'))
@@ -0,0 +1,104 @@
+# ========================================
+# reuniones/tokens.py
+# Tokens OAuth de Zoom por usuario: BD + caché caliente en memoria
+# ========================================
+
+import threading  # Protege la caché del proceso
+from collections import namedtuple  # Entrada inmutable de la caché
+from datetime import datetime, timezone as dt_timezone  # Caducidad
+
+from asgiref.sync import sync_to_async  # Lectura de la BD desde vistas async
+
+from .models import TokenZoom
+
+# expira: instante (epoch) en que caduca el access token
+Tokens = namedtuple('Tokens', ['access_token', 'refresh_token', 'expira'])
+
+_locales = {}  # usuario_id -> Tokens (lectura O(1) sin consultas)
+_lock = threading.Lock()
+
+
+def obtener(usuario_id):
+    """
+    Tokens del usuario. Se leen de la memoria del proceso; solo la primera
+    vez (o tras olvidar()) se consulta la BD.
+
+    Returns:
+        Tokens | None: None si el usuario no ha autorizado Zoom
+    """
+    tokens = _locales.get(usuario_id)
+    if tokens is None:
+        tokens = recargar(usuario_id)
+    return tokens
+
+
+async def aobtener(usuario_id):
+    """ Igual que obtener(); solo va a un hilo si hay que leer la BD. """
+    tokens = _locales.get(usuario_id)
+    if tokens is None:
+        tokens = await sync_to_async(recargar, thread_sensitive=False)(usuario_id)
+    return tokens
+
+
+def recargar(usuario_id):
+    """
+    Lee los tokens de la BD y refresca la memoria del proceso.
+    Se usa antes de renovar: otro proceso pudo haber rotado el refresh token.
+
+    Returns:
+        Tokens | None
+    """
+    fila = TokenZoom.objects.filter(usuario_id=usuario_id).values_list(
+        'access_token', 'refresh_token', 'expira'
+    ).first()
+    with _lock:
+        if fila is None:
+            _locales.pop(usuario_id, None)
+            return None
+        tokens = Tokens(fila[0], fila[1], fila[2].timestamp())
+        _locales[usuario_id] = tokens
+    return tokens
+
+
+def guardar(usuario_id, access_token, refresh_token, expira):
+    """
+    Escritura directa (write-through): BD y memoria del proceso a la vez,
+    así un reinicio no obliga a volver a autorizar.
+
+    Args:
+        usuario_id: Dueño de los tokens
+        access_token: Token de acceso nuevo
+        refresh_token: Refresh token nuevo (Zoom lo rota)
+        expira: Epoch en que caduca el access token
+
+    Returns:
+        Tokens
+    """
+    campos = {
+        'access_token': access_token,
+        'refresh_token': refresh_token,
+        'expira': datetime.fromtimestamp(expira, tz=dt_timezone.utc),
+    }
+    # UPDATE directo (una sentencia, sin transacción de lectura+escritura);
+    # solo la primera autorización crea la fila
+    if not TokenZoom.objects.filter(usuario_id=usuario_id).update(**campos):
+        TokenZoom.objects.update_or_create(usuario_id=usuario_id, defaults=campos)
+    tokens = Tokens(access_token, refresh_token, expira)
+    with _lock:
+        _locales[usuario_id] = tokens
+    return tokens
+
+
+def olvidar(usuario_id=None):
+    """ Descarta la copia en memoria de un usuario (o de todos). """
+    with _lock:
+        if usuario_id is None:
+            _locales.clear()
+        else:
+            _locales.pop(usuario_id, None)
+
+
+def revocar(usuario_id):
+    """ Borra los tokens del usuario (desautorizar la app). """
+    TokenZoom.objects.filter(usuario_id=usuario_id).delete()
+    olvidar(usuario_id)
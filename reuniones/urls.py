@@ -1,6 +1,6 @@
 # reuniones/urls.py
 from django.urls import path
-from . import views
+from . import api, views
 
 urlpatterns = [
     # ===== Autenticación OAuth =====
@@ -11,8 +11,27 @@ urlpatterns = [
     # ===== Vistas principales =====
     path('', views.inicio, name='inicio'),
     path('crear/', views.crear_reunion, name='crear_reunion'),
+    path('crear/lote/', views.crear_reuniones_lote, name='crear_reuniones_lote'),
     path('lista/', views.lista_reuniones, name='lista_reuniones'),
     path('detalle/<int:reunion_id>/', views.detalle_reunion, name='detalle_reunion'),
+    path('detalle/<int:reunion_id>/qr/', views.qr_reunion, name='qr_reunion'),
     path('eliminar/<int:reunion_id>/', views.eliminar_reunion, name='eliminar_reunion'),
+    path('eliminar/lote/', views.eliminar_reuniones_lote, name='eliminar_reuniones_lote'),
+    path('detalle/<int:reunion_id>/participantes/importar/', views.importar_participantes, name='importar_participantes'),
     path('sincronizar/', views.sincronizar_reuniones, name='sincronizar_reuniones'),
+    path('exportar/', views.exportar_reuniones, name='exportar_reuniones'),
+    path('calendario/<str:token>.ics', views.calendario_ics, name='calendario_ics'),
+    path('api/sincronizacion/estado/', views.estado_sincronizacion, name='estado_sincronizacion'),
+    
+    # ===== API JSON =====
+    path('api/reuniones/', api.reuniones, name='api_reuniones'),
+    path('api/reuniones/<int:reunion_id>/', api.reunion, name='api_reunion'),
+    path('api/agenda/conflictos/', api.agenda_conflictos, name='api_agenda_conflictos'),
+    path('api/agenda/hueco/', api.agenda_hueco, name='api_agenda_hueco'),
+    
+    # ===== Métricas (Prometheus) =====
+    path('metricas/', views.metricas_prometheus, name='metricas'),
+    
+    # ===== Webhooks de Zoom =====
+    path('zoom/webhook/', views.zoom_webhook, name='zoom_webhook'),
 ]
\ No newline at end of file
@@ -0,0 +1,48 @@
+# ========================================
+# reuniones/versiones.py
+# Versión (ETag / Last-Modified) de las reuniones de cada usuario
+# ========================================
+
+from django.core.cache import cache  # Sistema de caché
+from django.db.models import Count, Max  # Agregados
+
+from .models import Reunion
+
+VERSION_TTL = 86400  # La versión se recalcula al invalidarse; esto es solo un tope
+
+
+def _clave(usuario_id):
+    """ Clave de caché de la versión de un usuario. """
+    return f'reuniones_version:{usuario_id}'
+
+
+def invalidar(usuario_id):
+    """ Fuerza a recalcular la versión en la próxima petición. """
+    cache.delete(_clave(usuario_id))
+
+
+def version_usuario(usuario_id):
+    """
+    Versión actual de las reuniones del usuario.
+    Mientras nada cambie se sirve desde caché (sin consultas); al cambiar
+    una reunión las señales la invalidan y se recalcula con un agregado.
+
+    Returns:
+        dict con 'etag' (str) y 'ultima_modificacion' (datetime | None)
+    """
+    clave = _clave(usuario_id)
+    version = cache.get(clave)
+    if version is not None:
+        return version
+
+    datos = Reunion.objects.filter(creador_id=usuario_id).aggregate(
+        total=Count('id'),
+        ultima=Max('actualizado'),
+    )
+    marca = datos['ultima'].timestamp() if datos['ultima'] else 0
+    version = {
+        'etag': f"{usuario_id}-{datos['total']}-{marca:.6f}",
+        'ultima_modificacion': datos['ultima'],
+    }
+    cache.set(clave, version, VERSION_TTL)
+    return version
@@ -3,38 +3,54 @@
 # Vistas para OAuth User-Level (gratuito)
 # ========================================
 
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
-from django.core.cache import cache
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from .zoom_service import ZoomService
 from .models import Reunion, Participante
+from . import calendario, conflictos, dashboard, exportacion, invitaciones, jobs, lotes, metricas, outbox, paginacion, qr, tokens, webhooks
 from datetime import datetime
+from zoneinfo import ZoneInfo
+import csv
+import hashlib
+import hmac
 import json
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
+
+# Las plantillas leen request.user y la sesión de forma síncrona
+arender = sync_to_async(render)
+abuscar_conflictos = sync_to_async(conflictos.buscar_conflictos)
+asiguiente_hueco = sync_to_async(conflictos.siguiente_hueco)
+
 
 # =====================================
 # VISTAS DE AUTENTICACIÓN OAUTH
 # =====================================
 
+@login_required
 def zoom_login(request):
     """ Redirige al usuario a la página de autorización de Zoom. """
-    zoom_service = ZoomService()
+    zoom_service = ZoomService(request.user)
     authorization_url = zoom_service.get_authorization_url()
     return redirect(authorization_url)
 
 
+@login_required
 def zoom_oauth_callback(request):
-    """ Callback de Zoom después de que el usuario autoriza. """
+    """ Callback de Zoom después de que el usuario autoriza (tokens del usuario en sesión). """
     code = request.GET.get('code')
     if not code:
         messages.error(request, '❌ Error: No se recibió código de autorización')
         return redirect('inicio')
     
     try:
-        zoom_service = ZoomService()
+        zoom_service = ZoomService(request.user)
         token_data = zoom_service.exchange_code_for_token(code)
         messages.success(request, '✅ Aplicación autorizada - ¡Listo para crear reuniones!')
         return redirect('inicio')
@@ -44,8 +60,8 @@ def zoom_oauth_callback(request):
 
 
 def verificar_autorizacion(request):
-    """ API para verificar si ya hay token en caché. """
-    tiene_token = cache.get('zoom_access_token') is not None
+    """ API para verificar si el usuario ya autorizó Zoom. """
+    tiene_token = request.user.is_authenticated and tokens.obtener(request.user.pk) is not None
     return JsonResponse({'autorizado': tiene_token})
 
 
@@ -57,34 +73,31 @@ def inicio(request):
     """ 
     Página de inicio con contadores dinámicos para el Dashboard. 
     """
-    tiene_token = cache.get('zoom_access_token') is not None
+    tiene_token = request.user.is_authenticated and tokens.obtener(request.user.pk) is not None
     
     # Inicializamos contadores por defecto
-    totales = 0
-    proximas = 0
-    pasadas = 0
+    resumen = {'totales': 0, 'proximas': 0, 'pasadas': 0}
     
-    # Si el usuario está logueado, contamos sus reuniones desde la DB
+    # Si el usuario está logueado, contamos sus reuniones (una consulta, cacheada)
     if request.user.is_authenticated:
-        ahora = datetime.now()
-        reuniones_qs = Reunion.objects.filter(creador=request.user)
-        
-        totales = reuniones_qs.count()
-        proximas = reuniones_qs.filter(fecha_inicio__gt=ahora).count()
-        pasadas = reuniones_qs.filter(fecha_inicio__lte=ahora).count()
+        resumen = dashboard.resumen_usuario(request.user)
 
     context = {
         'autorizado': tiene_token,
-        'totales': totales,
-        'proximas': proximas,
-        'pasadas': pasadas,
+        'totales': resumen['totales'],
+        'proximas': resumen['proximas'],
+        'pasadas': resumen['pasadas'],
     }
     return render(request, 'reuniones/inicio.html', context)
 
 
 @login_required
-def crear_reunion(request):
-    """ Crea una reunión en Zoom y la registra en la base de datos local. """
+async def crear_reunion(request):
+    """
+    Registra la reunión y encola su creación en Zoom (outbox).
+    La petición no espera a Zoom: el worker procesar_outbox la envía y
+    rellena el ID y los enlaces.
+    """
     if request.method == 'POST':
         try:
             topic = request.POST.get('topic')
@@ -94,42 +107,140 @@ def crear_reunion(request):
             
             if not all([topic, fecha, hora, duration]):
                 messages.error(request, "❌ Por favor, completa todos los campos obligatorios.")
-                return render(request, 'reuniones/crear_reunion.html')
+                return await arender(request, 'reuniones/crear_reunion.html')
 
+            # La hora del formulario es local a la zona de la reunión (como en lotes y la API)
+            zona = lotes.ZONA_DEFECTO
             start_time_combined = f"{fecha}T{hora}"
             start_datetime = datetime.strptime(start_time_combined, '%Y-%m-%dT%H:%M')
             start_time_iso = start_datetime.strftime('%Y-%m-%dT%H:%M:%S')
+            start_datetime = start_datetime.replace(tzinfo=ZoneInfo(zona))
+            usuario = await request.auser()
             
-            zoom_service = ZoomService()
-            meeting_data = zoom_service.crear_reunion(
-                topic=topic,
-                start_time=start_time_iso,
-                duration=int(duration)
-            )
+            # Solapamientos con otras reuniones del usuario (antes de llamar a Zoom)
+            modo = conflictos.modo()
+            solapadas = []
+            if modo != 'ignorar' and not request.POST.get('ignorar_conflictos'):
+                solapadas = await abuscar_conflictos(usuario, start_datetime, duration)
+            if solapadas and modo == 'rechazar':
+                messages.error(request, '❌ El horario se solapa con otras reuniones.')
+                return await arender(request, 'reuniones/crear_reunion.html', {
+                    'datos': request.POST,
+                    'conflictos': solapadas,
+                    'hueco': await asiguiente_hueco(usuario, duration, desde=start_datetime),
+                })
             
-            Reunion.objects.create(
-                titulo=topic,
-                zoom_meeting_id=meeting_data['id'],
-                join_url=meeting_data['join_url'],
-                start_url=meeting_data['start_url'],
-                fecha_inicio=start_datetime,
-                duracion=int(duration),
-                creador=request.user
+            # Fila 'creando' + operación del outbox; el worker la crea en Zoom
+            await outbox.aencolar_creacion(
+                usuario, topic, start_datetime, int(duration),
+                {'topic': topic, 'start_time': start_time_iso, 'duration': int(duration), 'timezone': zona},
+                zona_horaria=zona,
             )
             
-            messages.success(request, f'✅ Reunión "{topic}" creada exitosamente!')
+            messages.success(request, f'✅ Reunión "{topic}" registrada. El enlace de Zoom aparecerá en unos momentos.')
+            if solapadas:
+                messages.warning(request, f'⚠️ Se solapa con: {conflictos.describir(solapadas)}')
             return redirect('lista_reuniones')
         except Exception as e:
             messages.error(request, f'❌ Error al crear reunión: {str(e)}')
     
-    return render(request, 'reuniones/crear_reunion.html')
+    return await arender(request, 'reuniones/crear_reunion.html')
+
+
+@login_required
+def crear_reuniones_lote(request):
+    """ Crea varias reuniones a partir de un CSV (titulo, fecha, hora, duracion). """
+    context = {'max_filas': lotes.MAX_FILAS}
+    if request.method == 'POST':
+        archivo = request.FILES.get('archivo')
+        if not archivo:
+            messages.error(request, '❌ Selecciona un archivo CSV.')
+            return render(request, 'reuniones/crear_lote.html', context)
+
+        try:
+            resultados = lotes.crear_reuniones(request.user, list(lotes.leer_csv(archivo)))
+        except (UnicodeDecodeError, csv.Error) as e:
+            messages.error(request, f'❌ No se pudo leer el CSV: {e}')
+            return render(request, 'reuniones/crear_lote.html', context)
+        except Exception as e:
+            messages.error(request, f'❌ Error al crear reuniones: {str(e)}')
+            return render(request, 'reuniones/crear_lote.html', context)
+
+        creadas = sum(1 for r in resultados if r['ok'])
+        if creadas:
+            messages.success(request, f'✅ {creadas} reuniones registradas; los enlaces de Zoom aparecerán en unos momentos.')
+        if creadas < len(resultados):
+            messages.warning(request, f'⚠️ {len(resultados) - creadas} filas con error.')
+        context['resultados'] = resultados
+
+    return render(request, 'reuniones/crear_lote.html', context)
 
 
 @login_required
 def lista_reuniones(request):
-    """ Listado de reuniones del usuario. """
-    reuniones = Reunion.objects.filter(creador=request.user).order_by('-fecha_inicio')
-    return render(request, 'reuniones/lista_reuniones.html', {'reuniones': reuniones})
+    """ Listado de reuniones del usuario, paginado por cursor. """
+    pagina = paginacion.paginar(
+        Reunion.objects.filter(creador=request.user),
+        despues=request.GET.get('despues'),
+        antes=request.GET.get('antes'),
+    )
+    context = {
+        'reuniones': pagina['reuniones'],
+        'total': dashboard.resumen_usuario(request.user)['totales'],  # Conteo cacheado
+        'cursor_siguiente': pagina['siguiente'],
+        'cursor_anterior': pagina['anterior'],
+        # Recargar mientras el outbox tenga operaciones de esta página en curso
+        'pendientes_zoom': any(
+            r.estado_zoom in (Reunion.CREANDO, Reunion.ELIMINANDO) for r in pagina['reuniones']
+        ),
+        'url_calendario': request.build_absolute_uri(
+            reverse('calendario_ics', args=[calendario.token_usuario(request.user.pk)])
+        ),
+    }
+    return render(request, 'reuniones/lista_reuniones.html', context)
+
+
+@require_GET
+def calendario_ics(request, token):
+    """
+    Feed iCalendar del usuario para suscribirse desde Google Calendar,
+    Outlook, etc. El token firmado identifica al usuario (sin sesión).
+    Mientras las reuniones no cambien responde 304 sin consultar la BD.
+    """
+    usuario_id = calendario.usuario_de_token(token)
+    if usuario_id is None:
+        return HttpResponse(status=404)
+
+    etag = f'"{calendario.etag_usuario(usuario_id)}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        version, datos = calendario.feed_usuario(usuario_id)
+        etag = f'"{version}"'
+        response = HttpResponse(datos, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = 'inline; filename="reuniones.ics"'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'  # Revalidar siempre con If-None-Match
+    return response
+
+
+@login_required
+def exportar_reuniones(request):
+    """
+    Descarga en streaming las reuniones del usuario con su asistencia.
+    Bajo ASGI el cuerpo es asíncrono para que se envíe lote a lote.
+    """
+    formato = request.GET.get('formato', 'csv')
+    if formato not in exportacion.FORMATOS:
+        return JsonResponse({'error': 'Formato no soportado (csv, ndjson)'}, status=400)
+
+    generar = exportacion.agenerar if isinstance(request, ASGIRequest) else exportacion.generar
+    response = StreamingHttpResponse(
+        generar(formato, exportacion.reuniones_para_exportar(request.user)),
+        content_type=exportacion.FORMATOS[formato],
+    )
+    response['Content-Disposition'] = f'attachment; filename="reuniones.{formato}"'
+    return response
 
 
 @login_required
@@ -140,66 +251,152 @@ def detalle_reunion(request, reunion_id):
 
 
 @login_required
-@require_POST
-def eliminar_reunion(request, reunion_id):
-    """ 
-    Elimina la reunión en Zoom y localmente. 
-    Maneja el error 3001 si la reunión ya no existe en los servidores de Zoom.
+def qr_reunion(request, reunion_id):
+    """
+    QR del enlace para participantes, generado localmente y cacheado.
+    ?tamano=300&formato=png|svg
+    404 mientras la reunión no tenga enlace de Zoom (outbox sin enviar).
     """
+    reunion = get_object_or_404(
+        Reunion.objects.only('id', 'join_url'), id=reunion_id, creador=request.user
+    )
+    if not reunion.join_url:
+        # Un QR vacío se quedaría en la caché del navegador como "immutable"
+        raise Http404('La reunión aún no tiene enlace de Zoom')
+    formato = request.GET.get('formato', 'png')
+    if formato not in qr.FORMATOS:
+        return JsonResponse({'error': 'Formato no soportado (png, svg)'}, status=400)
+    tamano = qr.normalizar_tamano(request.GET.get('tamano'))
+
+    datos, clave = qr.qr_reunion(reunion.id, reunion.join_url, tamano, formato)
+
+    etag = f'"{hashlib.sha1(clave.encode()).hexdigest()}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(datos, content_type=qr.FORMATOS[formato])
+    response['ETag'] = etag
+    # La URL de la plantilla incluye ?v=<actualizado>, así que puede cachearse "para siempre"
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    if request.GET.get('descargar'):
+        response['Content-Disposition'] = f'attachment; filename="reunion_qr_{reunion.id}.{formato}"'
+    return response
+
+
+@login_required
+@require_POST
+def importar_participantes(request, reunion_id):
+    """ Importa participantes desde un CSV (columnas nombre, email). """
     reunion = get_object_or_404(Reunion, id=reunion_id, creador=request.user)
+    archivo = request.FILES.get('archivo')
+    if not archivo:
+        messages.error(request, '❌ Selecciona un archivo CSV.')
+        return redirect('detalle_reunion', reunion_id=reunion.id)
+
     try:
-        zoom_service = ZoomService()
-        zoom_service.eliminar_reunion(reunion.zoom_meeting_id)
-        reunion.delete()
+        resultado = invitaciones.importar_participantes(reunion, invitaciones.leer_csv(archivo))
+    except (UnicodeDecodeError, csv.Error) as e:
+        messages.error(request, f'❌ No se pudo leer el CSV: {e}')
+        return redirect('detalle_reunion', reunion_id=reunion.id)
+
+    # Las envía el worker enviar_invitaciones, en cuanto la reunión tiene enlace de Zoom
+    cuando = ' cuando Zoom confirme la reunión' if reunion.zoom_meeting_id is None else ''
+    messages.success(
+        request,
+        f'✅ {resultado["creados"]} participantes importados, '
+        f'{resultado["duplicados"]} duplicados, {len(resultado["invalidos"])} emails inválidos. '
+        f'Las invitaciones se enviarán en segundo plano{cuando}.'
+    )
+    return redirect('detalle_reunion', reunion_id=reunion.id)
+
+
+@login_required
+@require_POST
+async def eliminar_reunion(request, reunion_id):
+    """ 
+    Encola la eliminación de la reunión en Zoom (outbox).
+    La fila local se borra cuando Zoom confirma (o si nunca llegó a Zoom).
+    """
+    usuario = await request.auser()
+    reunion = await aget_object_or_404(Reunion, id=reunion_id, creador=usuario)
+    resultado = await outbox.aencolar_eliminacion(usuario, [reunion.pk])
+    if resultado['encoladas']:
+        messages.success(request, '✅ Reunión en cola para eliminarse en Zoom.')
+    else:
         messages.success(request, '✅ Reunión eliminada correctamente.')
-    except Exception as e:
-        error_msg = str(e)
-        if "3001" in error_msg:
-            reunion.delete()
-            messages.warning(request, '⚠️ La reunión no existía en Zoom, pero ha sido eliminada localmente.')
-        else:
-            messages.error(request, f'❌ Error al eliminar: {error_msg}')
     return redirect('lista_reuniones')
 
 
 @login_required
-def sincronizar_reuniones(request):
-    """ Trae todas las reuniones actuales de Zoom a la base de datos local. """
-    try:
-        zoom_service = ZoomService()
-        meetings = zoom_service.listar_reuniones()
-        
-        count = 0
-        for meeting in meetings:
-            # Normalización de formato de fecha
-            fecha_iso = meeting['start_time'].replace('Z', '')
-            try:
-                start_dt = datetime.fromisoformat(fecha_iso)
-            except ValueError:
-                start_dt = datetime.strptime(meeting['start_time'], '%Y-%m-%dT%H:%M:%SZ')
-
-            Reunion.objects.update_or_create(
-                zoom_meeting_id=meeting['id'],
-                defaults={
-                    'titulo': meeting['topic'],
-                    'join_url': meeting['join_url'],
-                    'start_url': meeting.get('start_url', ''),
-                    'fecha_inicio': start_dt,
-                    'duracion': meeting['duration'],
-                    'creador': request.user
-                }
-            )
-            count += 1
-        messages.success(request, f'✅ Sincronización completada: {count} reuniones actualizadas.')
-    except Exception as e:
-        messages.error(request, f'❌ Error al sincronizar: {str(e)}')
+@require_POST
+def eliminar_reuniones_lote(request):
+    """ Encola la eliminación en Zoom de las reuniones seleccionadas en la lista. """
+    ids = [int(i) for i in request.POST.getlist('reuniones') if i.isdigit()]
+    if not ids:
+        messages.error(request, '❌ No se seleccionó ninguna reunión.')
+        return redirect('lista_reuniones')
+
+    resultado = outbox.encolar_eliminacion(request.user, ids)
+    if resultado['encoladas']:
+        messages.success(request, f'✅ {resultado["encoladas"]} reuniones en cola para eliminarse en Zoom.')
+    if resultado['eliminadas']:
+        messages.success(request, f'✅ {resultado["eliminadas"]} reuniones eliminadas (aún no estaban en Zoom).')
     return redirect('lista_reuniones')
 
 
+@login_required
+async def sincronizar_reuniones(request):
+    """
+    Encola la sincronización con Zoom y responde de inmediato.
+    El worker (manage.py procesar_sincronizaciones) hace el trabajo.
+    """
+    trabajo, creado = await sync_to_async(jobs.encolar_sincronizacion)(await request.auser())
+    if creado:
+        messages.info(request, '🔄 Sincronización en cola. Las reuniones aparecerán en unos momentos.')
+    else:
+        messages.info(request, '🔄 Ya hay una sincronización en cola.')
+    return redirect('lista_reuniones')
+
+
+@login_required
+def estado_sincronizacion(request):
+    """ API con el progreso de la última sincronización del usuario. """
+    trabajo = request.user.trabajos_sincronizacion.order_by('-creado').first()
+    if trabajo is None:
+        return JsonResponse({'estado': None})
+    return JsonResponse(jobs.estado_a_dict(trabajo))
+
+
+@require_GET
+def metricas_prometheus(request):
+    """
+    Métricas del proceso en formato de texto de Prometheus.
+    Con METRICAS_TOKEN se exige 'Authorization: Bearer <token>';
+    sin él, solo usuarios staff.
+    """
+    if settings.METRICAS_TOKEN:
+        esperado = f'Bearer {settings.METRICAS_TOKEN}'
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), esperado):
+            return HttpResponse(status=401)
+    elif not request.user.is_staff:
+        return HttpResponse(status=403)
+    return HttpResponse(metricas.exposicion(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @csrf_exempt
 def zoom_webhook(request):
-    """ Recibe notificaciones de eventos desde Zoom (Webhooks). """
+    """
+    Recibe notificaciones de eventos desde Zoom (Webhooks).
+    Solo verifica y encola; el comando procesar_webhooks hace el trabajo.
+    """
     if request.method == 'POST':
+        if not webhooks.verificar_firma(
+            request.body,
+            request.headers.get('x-zm-request-timestamp'),
+            request.headers.get('x-zm-signature'),
+        ):
+            return JsonResponse({'status': 'invalid signature'}, status=401)
+        
         try:
             payload = json.loads(request.body)
             event_type = payload.get('event')
@@ -209,22 +406,14 @@ def zoom_webhook(request):
                 plain_token = payload.get('payload', {}).get('plainToken')
                 return JsonResponse({
                     'plainToken': plain_token,
-                    'encryptedToken': plain_token
+                    'encryptedToken': webhooks.token_validacion(plain_token)
                 })
             
-            # Registro de asistencia mediante evento de unión
-            if event_type == 'meeting.participant_joined':
-                meeting_id = payload.get('payload', {}).get('object', {}).get('id')
-                participant_name = payload.get('payload', {}).get('object', {}).get('participant', {}).get('user_name')
-                
-                reunion = Reunion.objects.filter(zoom_meeting_id=meeting_id).first()
-                if reunion:
-                    Participante.objects.filter(
-                        reunion=reunion,
-                        nombre__icontains=participant_name
-                    ).update(asistio=True)
+            # Encolar el evento crudo y responder rápido (los reintentos se descartan)
+            if not webhooks.encolar_evento(event_type or '', request.body, payload):
+                return JsonResponse({'status': 'duplicate'}, status=200)
             
             return JsonResponse({'status': 'success'}, status=200)
         except Exception:
             return JsonResponse({'status': 'error'}, status=400)
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
\ No newline at end of file
+    return JsonResponse({'error': 'Method not allowed'}, status=405)
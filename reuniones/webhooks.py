@@ -0,0 +1,254 @@
+# ========================================
+# reuniones/webhooks.py
+# Verificación y consumo por lotes de eventos de webhook de Zoom
+# ========================================
+
+import hashlib  # HMAC-SHA256
+import hmac  # Firma de Zoom
+import json  # Cuerpo de los eventos
+import threading  # Lock de la LRU de deduplicación
+import time  # Antigüedad de la firma
+from collections import OrderedDict  # LRU de eventos recientes
+from datetime import timedelta  # Purga de eventos antiguos
+
+from django.conf import settings  # Secret token del webhook
+from django.db import IntegrityError, transaction  # Índice único de deduplicación
+from django.db.models import F, Q  # Incremento atómico de intentos; purga
+from django.utils import timezone  # Fechas con zona horaria
+
+from .models import EventoWebhook
+from . import asistencia
+
+LOTE_EVENTOS = 500  # Eventos leídos por iteración del consumidor
+MAX_INTENTOS = 5  # Después de esto el evento queda con error
+TOLERANCIA_FIRMA = 300  # Segundos de antigüedad aceptados en x-zm-request-timestamp
+MAX_RECIENTES = 50000  # Claves de eventos recordadas en memoria
+RETENCION_DIAS = 3  # Zoom reintenta durante horas; las claves viven más que eso
+PURGA_CADA = 3600  # Segundos entre purgas del consumidor
+
+_recientes = OrderedDict()
+_recientes_lock = threading.Lock()
+
+
+def _secret_token():
+    """ Secret token del webhook (vacío si no está configurado). """
+    return getattr(settings, 'ZOOM_WEBHOOK_SECRET_TOKEN', '')
+
+
+def firmar(mensaje):
+    """
+    HMAC-SHA256 en hexadecimal con el secret token del webhook.
+
+    Args:
+        mensaje: Texto a firmar
+
+    Returns:
+        str: Firma en hexadecimal
+    """
+    return hmac.new(_secret_token().encode(), mensaje.encode(), hashlib.sha256).hexdigest()
+
+
+def verificar_firma(cuerpo, timestamp, firma):
+    """
+    Verifica la cabecera x-zm-signature (v0=HMAC de "v0:{ts}:{body}").
+    Si no hay secret token configurado no se verifica.
+
+    Args:
+        cuerpo: Cuerpo crudo de la petición (bytes)
+        timestamp: Cabecera x-zm-request-timestamp
+        firma: Cabecera x-zm-signature
+
+    Returns:
+        bool: True si la firma es válida
+    """
+    if not _secret_token():
+        return True
+    if not timestamp or not firma:
+        return False
+    try:
+        if abs(time.time() - int(timestamp)) > TOLERANCIA_FIRMA:
+            return False
+    except ValueError:
+        return False
+
+    esperada = 'v0=' + firmar(f"v0:{timestamp}:{cuerpo.decode('utf-8', 'replace')}")
+    return hmac.compare_digest(esperada, firma)
+
+
+def token_validacion(plain_token):
+    """
+    encryptedToken para el evento endpoint.url_validation.
+    Sin secret token configurado se devuelve el plainToken tal cual.
+
+    Returns:
+        str: Token a devolver a Zoom
+    """
+    if not _secret_token():
+        return plain_token
+    return firmar(plain_token)
+
+
+def clave_evento(payload, cuerpo):
+    """
+    Huella de deduplicación de un evento: tipo, event_ts, reunión y
+    participante. Si falta event_ts se usa el cuerpo completo.
+
+    Returns:
+        str: SHA-256 en hexadecimal
+    """
+    event_ts = payload.get('event_ts')
+    if event_ts is None:
+        return hashlib.sha256(cuerpo).hexdigest()
+
+    objeto = payload.get('payload', {}).get('object', {})
+    participante = objeto.get('participant', {})
+    quien = (
+        participante.get('participant_uuid')
+        or participante.get('user_id')
+        or participante.get('user_name')
+        or ''
+    )
+    partes = [payload.get('event', ''), str(event_ts), str(objeto.get('id', '')), str(quien)]
+    return hashlib.sha256(':'.join(partes).encode()).hexdigest()
+
+
+def _visto_recientemente(clave):
+    """ Consulta (y refresca) la clave en la LRU en memoria. """
+    with _recientes_lock:
+        if clave in _recientes:
+            _recientes.move_to_end(clave)
+            return True
+        return False
+
+
+def _recordar(clave):
+    """ Añade la clave a la LRU, expulsando las más antiguas. """
+    with _recientes_lock:
+        _recientes[clave] = True
+        _recientes.move_to_end(clave)
+        while len(_recientes) > MAX_RECIENTES:
+            _recientes.popitem(last=False)
+
+
+def encolar_evento(evento, cuerpo, payload=None):
+    """
+    Guarda el evento crudo para procesarlo después, descartando reintentos.
+    Primero se consulta la LRU en memoria (sin tocar la BD); si no está,
+    el índice único de `clave` detecta duplicados entre procesos.
+
+    Args:
+        evento: Tipo de evento
+        cuerpo: Cuerpo crudo (bytes)
+        payload: JSON ya parseado (para calcular la clave)
+
+    Returns:
+        bool: True si se encoló, False si era un duplicado
+    """
+    clave = clave_evento(payload or {}, cuerpo)
+    if _visto_recientemente(clave):
+        return False
+
+    try:
+        with transaction.atomic():
+            EventoWebhook.objects.create(
+                evento=evento, clave=clave, cuerpo=cuerpo.decode('utf-8', 'replace')
+            )
+    except IntegrityError:
+        _recordar(clave)
+        return False
+
+    _recordar(clave)
+    return True
+
+
+# =====================================
+# MANEJADORES POR TIPO DE EVENTO
+# =====================================
+
+def _participante_unido(eventos):
+    """ Marca asistencia para eventos meeting.participant_joined. """
+    asistencia.registrar_asistencias(eventos)
+
+
+MANEJADORES = {
+    'meeting.participant_joined': _participante_unido,
+}
+
+
+def procesar_lote(limite=LOTE_EVENTOS, claves=None):
+    """
+    Procesa un lote de eventos pendientes, agrupados por tipo.
+
+    Args:
+        limite: Eventos leídos como máximo
+        claves: Solo los eventos con estas claves de deduplicación (None = todos)
+
+    Returns:
+        int: Eventos consumidos en este lote
+    """
+    pendientes = EventoWebhook.objects.filter(procesado=False, intentos__lt=MAX_INTENTOS)
+    if claves is not None:
+        pendientes = pendientes.filter(clave__in=claves)
+    pendientes = list(pendientes.order_by('id')[:limite])
+    if not pendientes:
+        return 0
+
+    por_tipo = {}
+    invalidos = []
+    for evento in pendientes:
+        try:
+            por_tipo.setdefault(evento.evento, []).append((evento, json.loads(evento.cuerpo)))
+        except ValueError:
+            invalidos.append(evento.pk)
+
+    if invalidos:
+        EventoWebhook.objects.filter(pk__in=invalidos).update(
+            procesado=True, intentos=MAX_INTENTOS, error='JSON inválido'
+        )
+
+    for tipo, eventos in por_tipo.items():
+        ids = [evento.pk for evento, _ in eventos]
+        manejador = MANEJADORES.get(tipo)
+        try:
+            if manejador:
+                manejador([payload for _, payload in eventos])
+            EventoWebhook.objects.filter(pk__in=ids).update(procesado=True, error='')
+        except Exception as e:
+            EventoWebhook.objects.filter(pk__in=ids).update(
+                intentos=F('intentos') + 1, error=str(e)
+            )
+
+    return len(pendientes)
+
+
+def procesar_pendientes(claves=None):
+    """
+    Consume la cola hasta vaciarla.
+
+    Args:
+        claves: Solo los eventos con estas claves (None = todos)
+
+    Returns:
+        int: Eventos consumidos
+    """
+    total = 0
+    while True:
+        procesados = procesar_lote(claves=claves)
+        if not procesados:
+            return total
+        total += procesados
+
+
+def purgar_procesados(dias=RETENCION_DIAS):
+    """
+    Borra eventos terminados más antiguos que `dias`: los procesados y los
+    que agotaron MAX_INTENTOS (ya no se reintentan). Con ellos se van sus
+    claves de deduplicación (poda por TTL).
+
+    Returns:
+        int: Eventos borrados
+    """
+    limite = timezone.now() - timedelta(days=dias)
+    return EventoWebhook.objects.filter(
+        Q(procesado=True) | Q(intentos__gte=MAX_INTENTOS), recibido__lt=limite
+    ).delete()[0]
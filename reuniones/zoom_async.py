@@ -0,0 +1,166 @@
+# ========================================
+# reuniones/zoom_async.py
+# Cliente asíncrono de Zoom (httpx) para el worker de sincronizaciones con asyncio
+# ========================================
+
+import asyncio  # Loop actual
+import weakref  # Un cliente por event loop
+
+import httpx  # Cliente HTTP asíncrono con pool de conexiones
+from asgiref.sync import sync_to_async  # Renovación del token (síncrona)
+from django.conf import settings  # Acceso a settings
+from django.core.cache import cache  # Sistema de caché
+
+from .zoom_service import ZoomService, ZoomAPIError, MAX_PAGE_SIZE
+from . import metricas  # Duración de cada llamada a Zoom
+from . import tokens  # Tokens OAuth por usuario
+from . import zoom_http  # Timeouts compartidos con el cliente síncrono
+from . import zoom_scheduler  # Límites de tasa y reintentos
+
+DEFAULT_MAX_CONEXIONES = 100  # Conexiones simultáneas por event loop
+DEFAULT_MAX_KEEPALIVE = 20  # Conexiones ociosas que se conservan
+
+# httpx.AsyncClient queda ligado al loop donde se usa por primera vez.
+# Bajo ASGI hay un solo loop por proceso; bajo WSGI cada vista async
+# corre en su propio loop y obtiene su propio cliente.
+_clientes = weakref.WeakKeyDictionary()
+
+
+def get_cliente():
+    """
+    Cliente httpx del event loop actual (conexiones keep-alive compartidas
+    por todas las corrutinas del loop).
+
+    Returns:
+        httpx.AsyncClient
+    """
+    loop = asyncio.get_running_loop()
+    cliente = _clientes.get(loop)
+    if cliente is None or cliente.is_closed:
+        conectar, leer = zoom_http.get_timeout()
+        cliente = httpx.AsyncClient(
+            timeout=httpx.Timeout(leer, connect=conectar),
+            limits=httpx.Limits(
+                max_connections=getattr(settings, 'ZOOM_HTTP_ASYNC_MAX_CONEXIONES', DEFAULT_MAX_CONEXIONES),
+                max_keepalive_connections=getattr(settings, 'ZOOM_HTTP_POOL_MAXSIZE', DEFAULT_MAX_KEEPALIVE),
+            ),
+        )
+        _clientes[loop] = cliente
+    return cliente
+
+
+async def cerrar_cliente():
+    """ Cierra el cliente del loop actual (al apagar el worker o en benchmarks). """
+    cliente = _clientes.pop(asyncio.get_running_loop(), None)
+    if cliente is not None:
+        await cliente.aclose()
+
+
+class ZoomServiceAsync(ZoomService):
+    """
+    Variante asíncrona de ZoomService.
+    Comparte con la versión síncrona los tokens del usuario, el user ID
+    cacheado y los límites de tasa del proceso; solo cambia el transporte.
+    La renovación del token (poco frecuente) se delega a un hilo.
+    """
+
+    async def _arequest(self, method, url, **kwargs):
+        """
+        Punto único de salida HTTP asíncrona hacia Zoom.
+
+        Returns:
+            httpx.Response
+        """
+        cliente = get_cliente()
+        return await zoom_scheduler.get_programador().aejecutar(
+            lambda: metricas.amedir_zoom(method, url, lambda: cliente.request(method, url, **kwargs)),
+            method, url, cuenta=self.usuario_id
+        )
+
+    async def aget_access_token(self):
+        """
+        Access token del usuario desde la memoria del proceso; si caducó,
+        se recarga o renueva (single-flight) en un hilo.
+
+        Returns:
+            str: Access token válido
+        """
+        access_token = self._token_vigente(await tokens.aobtener(self._requerir_usuario()))
+        if access_token:
+            return access_token  # La renovación anticipada, si toca, va en su propio hilo
+        return await sync_to_async(self.get_access_token, thread_sensitive=False)()
+
+    async def aget_user_id(self, access_token):
+        """
+        ID del usuario dueño del token (misma caché que get_user_id).
+
+        Returns:
+            str: ID de usuario de Zoom
+        """
+        clave = self._clave_identidad(access_token)
+        user_id = await cache.aget(clave)
+        if user_id:
+            return user_id
+
+        response = await self._arequest(
+            'GET',
+            f"{self.api_base_url}/users/me",
+            headers={'Authorization': f'Bearer {access_token}'}
+        )
+
+        if response.status_code != 200:
+            raise ZoomAPIError(f"Error obteniendo usuario: {response.text}", response)
+
+        user_id = response.json()['id']
+        await cache.aset(clave, user_id, self._segundos_restantes_token())
+        return user_id
+
+    async def _apagina_reuniones(self, page_size, next_page_token=''):
+        """
+        Descarga una página de reuniones (ver _pagina_reuniones).
+
+        Returns:
+            tuple: (lista de reuniones, token de la página siguiente o '')
+        """
+        access_token = await self.aget_access_token()
+        user_id = await self.aget_user_id(access_token)
+
+        params = {'page_size': page_size}
+        if next_page_token:
+            params['next_page_token'] = next_page_token
+
+        response = await self._arequest(
+            'GET',
+            f"{self.api_base_url}/users/{user_id}/meetings",
+            headers={'Authorization': f'Bearer {access_token}'},
+            params=params
+        )
+
+        if response.status_code == 401:
+            await cache.adelete(self._clave_identidad(access_token))
+
+        if response.status_code == 200:
+            data = response.json()
+            return data.get('meetings', []), data.get('next_page_token') or ''
+        raise ZoomAPIError(f"Error listando reuniones: {response.text}", response)
+
+    async def aiterar_reuniones(self, page_size=MAX_PAGE_SIZE):
+        """
+        Recorre todas las reuniones siguiendo next_page_token. La página
+        siguiente se pide mientras el consumidor procesa la actual.
+
+        Yields:
+            dict: Una reunión de Zoom
+        """
+        page_size = min(page_size, MAX_PAGE_SIZE)
+        tarea = asyncio.ensure_future(self._apagina_reuniones(page_size, ''))
+        try:
+            while tarea is not None:
+                meetings, token = await tarea
+                tarea = asyncio.ensure_future(self._apagina_reuniones(page_size, token)) if token else None
+                for meeting in meetings:
+                    yield meeting
+        finally:
+            if tarea is not None:
+                tarea.cancel()
+
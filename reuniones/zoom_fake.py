@@ -0,0 +1,381 @@
+# ========================================
+# reuniones/zoom_fake.py
+# Servidor local que imita la API de Zoom (benchmarks y desarrollo sin credenciales)
+# ========================================
+
+import hashlib  # Firma de webhooks
+import hmac  # Firma de webhooks
+import itertools  # IDs de reunión
+import json  # Cuerpos de petición/respuesta
+import random  # Inyección de 429
+import re  # Rutas de la API
+import threading  # Servidor en segundo plano
+import time  # Latencia simulada
+from collections import Counter  # Llamadas recibidas por endpoint
+from datetime import datetime, timedelta, timezone as dt_timezone  # Reuniones sembradas
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from zoneinfo import ZoneInfo  # start_time local -> UTC, como Zoom
+
+import requests  # Emisión de webhooks
+
+RUTA_REUNIONES_USUARIO = re.compile(r'/users/[^/]+/meetings/?$')
+RUTA_REUNION = re.compile(r'/meetings/(\d+)/?$')
+ZONA_CUENTA = 'America/Hermosillo'  # Zona del usuario de Zoom si la petición no trae timezone
+
+
+def hora_utc(start_time, zona):
+    """
+    start_time tal como lo devuelve Zoom: una hora local ('2030-01-01T10:00:00')
+    se interpreta en `zona` (o la de la cuenta) y se responde en UTC con 'Z'.
+
+    Returns:
+        str
+    """
+    if start_time.endswith('Z'):
+        return start_time
+    local = datetime.fromisoformat(start_time)
+    if local.tzinfo is None:
+        local = local.replace(tzinfo=ZoneInfo(zona or ZONA_CUENTA))
+    return local.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+class EstadoFalso:
+    """ Reuniones y configuración del servidor falso (compartido entre hilos). """
+
+    def __init__(self, latencia=0.0, tasa_429=0.0, retry_after=1):
+        self.latencia = latencia  # Segundos añadidos a cada respuesta de la API
+        self.tasa_429 = tasa_429  # Probabilidad (0-1) de responder 429 a una llamada de la API
+        self.retry_after = retry_after  # Segundos anunciados en Retry-After
+        self.reuniones = {}
+        self.ids = itertools.count(int(time.time() * 1000))  # Sin choques entre ejecuciones
+        self.tokens = itertools.count(1)
+        self.llamadas = Counter()  # 'GET /users/{id}/meetings' -> veces
+        self.lock = threading.Lock()
+
+    def nueva_reunion(self, topic, start_time, duration, timezone=''):
+        """ Crea y guarda una reunión con el formato de respuesta de Zoom. """
+        meeting_id = next(self.ids)
+        reunion = {
+            'id': meeting_id,
+            'uuid': f'uuid-{meeting_id}',
+            'host_id': 'usuario_falso',
+            'topic': topic,
+            'type': 2,
+            'start_time': start_time,
+            'duration': duration,
+            'timezone': timezone,
+            'join_url': f'https://zoom.us/j/{meeting_id}',
+            'start_url': f'https://zoom.us/s/{meeting_id}',
+        }
+        with self.lock:
+            self.reuniones[meeting_id] = reunion
+        return reunion
+
+    def sembrar(self, cantidad):
+        """
+        Crea `cantidad` reuniones futuras (una por hora) sin pasar por HTTP.
+
+        Returns:
+            list: IDs creados
+        """
+        inicio = datetime.now(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+        return [
+            self.nueva_reunion(
+                f'Reunión sembrada {i}',
+                (inicio + timedelta(hours=i + 1)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                60,
+                'UTC',
+            )['id']
+            for i in range(cantidad)
+        ]
+
+    def registrar(self, metodo, ruta):
+        """ Cuenta la llamada agrupando los IDs de la ruta. """
+        ruta = re.sub(r'/users/[^/]+/', '/users/{id}/', ruta)
+        ruta = RUTA_REUNION.sub('/meetings/{id}', ruta)
+        with self.lock:
+            self.llamadas[f'{metodo} {ruta}'] += 1
+
+
+class ManejadorZoom(BaseHTTPRequestHandler):
+    """ Endpoints usados por ZoomService: token, /users/me y CRUD de reuniones. """
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, como la API real
+    estado = None  # Se asigna en iniciar()
+
+    def log_message(self, *args):
+        pass  # Sin ruido en consola
+
+    def _leer_cuerpo(self):
+        longitud = int(self.headers.get('Content-Length') or 0)
+        return self.rfile.read(longitud) if longitud else b''
+
+    def _responder(self, status, datos=None, cabeceras=None):
+        cuerpo = json.dumps(datos).encode() if datos is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _no_existe(self, meeting_id):
+        self._responder(404, {'code': 3001, 'message': f'Meeting does not exist: {meeting_id}.'})
+
+    def _antes_de_api(self, metodo):
+        """
+        Latencia e inyección de 429 comunes a los endpoints de la API.
+
+        Returns:
+            tuple: (ruta, True si ya se respondió con 429)
+        """
+        ruta = urlparse(self.path).path
+        self.estado.registrar(metodo, ruta)
+        if self.estado.latencia:
+            time.sleep(self.estado.latencia)
+        if self.estado.tasa_429 and random.random() < self.estado.tasa_429:
+            self._responder(
+                429,
+                {'code': 429, 'message': 'You have reached the maximum per-second rate limit for this API.'},
+                {'Retry-After': str(self.estado.retry_after)},
+            )
+            return ruta, True
+        return ruta, False
+
+    def do_GET(self):
+        if urlparse(self.path).path.endswith('/authorize'):
+            # Autoriza sin pantalla: vuelve al callback de la app con un código
+            parametros = parse_qs(urlparse(self.path).query)
+            destino = parametros.get('redirect_uri', [''])[0]
+            self.send_response(302)
+            self.send_header('Location', f'{destino}?code=codigo_falso')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        ruta, respondido = self._antes_de_api('GET')
+        if respondido:
+            return
+        if ruta.endswith('/users/me'):
+            return self._responder(200, {'id': 'usuario_falso', 'email': 'host@example.com'})
+        if RUTA_REUNIONES_USUARIO.search(ruta):
+            parametros = parse_qs(urlparse(self.path).query)
+            tamano = int(parametros.get('page_size', ['30'])[0])
+            inicio = int(parametros.get('next_page_token', ['0'])[0] or 0)
+            with self.estado.lock:
+                todas = sorted(self.estado.reuniones.values(), key=lambda m: m['id'])
+            pagina = todas[inicio:inicio + tamano]
+            siguiente = str(inicio + tamano) if inicio + tamano < len(todas) else ''
+            return self._responder(200, {
+                'page_size': tamano,
+                'total_records': len(todas),
+                'next_page_token': siguiente,
+                'meetings': pagina,
+            })
+        coincidencia = RUTA_REUNION.search(ruta)
+        if coincidencia:
+            reunion = self.estado.reuniones.get(int(coincidencia.group(1)))
+            if reunion is None:
+                return self._no_existe(coincidencia.group(1))
+            return self._responder(200, reunion)
+        self._responder(404, {'code': 404, 'message': 'No encontrado'})
+
+    def do_POST(self):
+        ruta = urlparse(self.path).path
+        cuerpo = self._leer_cuerpo()
+        if ruta.endswith('/token'):
+            self.estado.registrar('POST', ruta)
+            numero = next(self.estado.tokens)
+            return self._responder(200, {
+                'access_token': f'token_falso_{numero}',
+                'refresh_token': f'refresh_falso_{numero}',
+                'token_type': 'bearer',
+                'expires_in': 3600,
+            })
+        ruta, respondido = self._antes_de_api('POST')
+        if respondido:
+            return
+        if RUTA_REUNIONES_USUARIO.search(ruta):
+            datos = json.loads(cuerpo or b'{}')
+            zona = datos.get('timezone') or ZONA_CUENTA
+            reunion = self.estado.nueva_reunion(
+                datos.get('topic', ''),
+                hora_utc(datos.get('start_time', ''), zona),
+                datos.get('duration', 0),
+                zona,
+            )
+            return self._responder(201, reunion)
+        self._responder(404, {'code': 404, 'message': 'No encontrado'})
+
+    def do_PATCH(self):
+        cuerpo = self._leer_cuerpo()
+        ruta, respondido = self._antes_de_api('PATCH')
+        if respondido:
+            return
+        coincidencia = RUTA_REUNION.search(ruta)
+        if not coincidencia:
+            return self._responder(404, {'code': 404, 'message': 'No encontrado'})
+        cambios = json.loads(cuerpo or b'{}')
+        with self.estado.lock:
+            reunion = self.estado.reuniones.get(int(coincidencia.group(1)))
+            if reunion is not None:
+                reunion.update({k: v for k, v in cambios.items() if k in reunion})
+                if 'start_time' in cambios:
+                    reunion['start_time'] = hora_utc(cambios['start_time'], reunion['timezone'])
+        if reunion is None:
+            return self._no_existe(coincidencia.group(1))
+        self._responder(204)
+
+    def do_DELETE(self):
+        self._leer_cuerpo()
+        ruta, respondido = self._antes_de_api('DELETE')
+        if respondido:
+            return
+        coincidencia = RUTA_REUNION.search(ruta)
+        if not coincidencia:
+            return self._no_existe(ruta.rsplit('/', 1)[-1])
+        with self.estado.lock:
+            existia = self.estado.reuniones.pop(int(coincidencia.group(1)), None)
+        if existia:
+            return self._responder(204)
+        self._no_existe(coincidencia.group(1))
+
+
+class ServidorZoomFalso(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Cientos de conexiones simultáneas en los benchmarks
+
+
+def iniciar(puerto=0, latencia=0.0, tasa_429=0.0, host='127.0.0.1'):
+    """
+    Arranca el servidor falso en un hilo.
+
+    Args:
+        puerto: Puerto local (0 = cualquiera libre)
+        latencia: Segundos de espera añadidos a cada llamada a la API
+        tasa_429: Probabilidad de responder 429 a una llamada a la API
+        host: Interfaz en la que escuchar
+
+    Returns:
+        tuple: (servidor, URL base 'http://host:<puerto>'); el estado
+               queda en servidor.RequestHandlerClass.estado
+    """
+    estado = EstadoFalso(latencia, tasa_429)
+    manejador = type('ManejadorZoomLocal', (ManejadorZoom,), {'estado': estado})
+    servidor = ServidorZoomFalso((host, puerto), manejador)
+    threading.Thread(target=servidor.serve_forever, name='zoom-falso', daemon=True).start()
+    return servidor, f'http://{host}:{servidor.server_port}'
+
+
+def configurar_settings(settings, url_base):
+    """ Apunta ZoomService al servidor falso (sin límites de tasa). """
+    settings.ZOOM_API_BASE_URL = f'{url_base}/v2'
+    settings.ZOOM_OAUTH_TOKEN_URL = f'{url_base}/oauth/token'
+    settings.ZOOM_RATE_LIMITS = {'light': 100000, 'medium': 100000, 'heavy': 100000}
+
+
+def conectar(settings, url_base, usuario):
+    """
+    Configura settings, reinicia el programador de peticiones y autoriza
+    a `usuario` contra el servidor falso (mismo proceso).
+    """
+    from . import zoom_scheduler
+    from .zoom_service import ZoomService
+
+    configurar_settings(settings, url_base)
+    zoom_scheduler.reiniciar_programador()
+    ZoomService(usuario).exchange_code_for_token('codigo_falso')
+
+
+# =====================================
+# WEBHOOKS
+# =====================================
+
+def evento_participante(meeting_id, nombre, email, event_ts=None):
+    """
+    Payload de meeting.participant_joined como lo envía Zoom.
+
+    Returns:
+        dict
+    """
+    event_ts = event_ts or time.time_ns() // 1000
+    return {
+        'event': 'meeting.participant_joined',
+        'event_ts': event_ts,
+        'payload': {
+            'account_id': 'cuenta_falsa',
+            'object': {
+                'id': str(meeting_id),
+                'uuid': f'uuid-{meeting_id}',
+                'host_id': 'usuario_falso',
+                'participant': {
+                    'participant_uuid': f'p-{event_ts}-{hashlib.sha1(email.encode()).hexdigest()[:8]}',
+                    'user_name': nombre,
+                    'email': email,
+                    'join_time': datetime.now(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+                },
+            },
+        },
+    }
+
+
+def cabeceras_webhook(cuerpo, secreto, timestamp=None):
+    """
+    Cabeceras x-zm-* firmadas como lo hace Zoom.
+
+    Args:
+        cuerpo: Cuerpo exacto a enviar (bytes)
+        secreto: Secret token del webhook
+
+    Returns:
+        dict
+    """
+    timestamp = str(timestamp or int(time.time()))
+    mensaje = f"v0:{timestamp}:{cuerpo.decode()}"
+    firma = hmac.new(secreto.encode(), mensaje.encode(), hashlib.sha256).hexdigest()
+    return {
+        'Content-Type': 'application/json',
+        'x-zm-request-timestamp': timestamp,
+        'x-zm-signature': f'v0={firma}',
+    }
+
+
+def emitir_webhook(url, payload, secreto=''):
+    """
+    Envía un evento firmado al endpoint de webhooks de la app.
+
+    Returns:
+        int: Status HTTP de la respuesta
+    """
+    cuerpo = json.dumps(payload).encode()
+    return requests.post(url, data=cuerpo, headers=cabeceras_webhook(cuerpo, secreto), timeout=10).status_code
+
+
+def iniciar_emisor(estado, url, secreto='', por_segundo=1.0):
+    """
+    Hilo que envía meeting.participant_joined de reuniones al azar del
+    servidor falso, como haría Zoom durante las clases.
+
+    Returns:
+        threading.Event: Activarlo detiene el emisor
+    """
+    detener = threading.Event()
+
+    def emitir():
+        numero = 0
+        while not detener.wait(1 / por_segundo):
+            with estado.lock:
+                ids = list(estado.reuniones)
+            if not ids:
+                continue
+            numero += 1
+            try:
+                emitir_webhook(url, evento_participante(
+                    random.choice(ids), f'Participante {numero}', f'p{numero}@example.com'
+                ), secreto)
+            except requests.RequestException:
+                pass  # La app puede no estar levantada todavía
+
+    threading.Thread(target=emitir, name='zoom-falso-webhooks', daemon=True).start()
+    return detener
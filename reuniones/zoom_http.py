@@ -0,0 +1,148 @@
+# ========================================
+# reuniones/zoom_http.py
+# Transporte HTTP compartido (pool keep-alive) para Zoom API
+# ========================================
+
+import threading  # Locks y sesiones por hilo
+
+import requests  # Cliente HTTP
+from requests.adapters import HTTPAdapter  # Adaptador con pool de conexiones
+from django.conf import settings  # Acceso a settings
+
+# Valores por defecto (se pueden sobrescribir en settings.py)
+DEFAULT_POOL_CONNECTIONS = 4  # Número de hosts distintos en caché (api.zoom.us, zoom.us)
+DEFAULT_POOL_MAXSIZE = 20  # Conexiones keep-alive por host
+DEFAULT_CONNECT_TIMEOUT = 5  # Segundos para abrir conexión
+DEFAULT_READ_TIMEOUT = 15  # Segundos esperando respuesta
+
+_adapter = None  # Adaptador único del proceso (su PoolManager es thread-safe)
+_adapter_lock = threading.Lock()
+_local = threading.local()  # Una Session por hilo (cookies/headers no son thread-safe)
+
+_stats_lock = threading.Lock()
+_stats = {
+    'peticiones': 0,  # Peticiones enviadas por este módulo
+    'errores_conexion': 0,  # Fallos de red (timeout, conexión rechazada...)
+}
+
+
+def _get_setting(nombre, default):
+    """ Lee un valor opcional de settings con su default. """
+    return getattr(settings, nombre, default)
+
+
+def get_timeout():
+    """
+    Timeout (connect, read) usado en todas las llamadas a Zoom.
+
+    Returns:
+        tuple: (connect_timeout, read_timeout) en segundos
+    """
+    return (
+        _get_setting('ZOOM_HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+        _get_setting('ZOOM_HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT),
+    )
+
+
+def _get_adapter():
+    """ Crea (una sola vez por proceso) el adaptador con el pool de conexiones. """
+    global _adapter
+    if _adapter is None:
+        with _adapter_lock:
+            if _adapter is None:
+                _adapter = HTTPAdapter(
+                    pool_connections=_get_setting('ZOOM_HTTP_POOL_CONNECTIONS', DEFAULT_POOL_CONNECTIONS),
+                    pool_maxsize=_get_setting('ZOOM_HTTP_POOL_MAXSIZE', DEFAULT_POOL_MAXSIZE),
+                    pool_block=_get_setting('ZOOM_HTTP_POOL_BLOCK', False),
+                    max_retries=0,  # Los reintentos se deciden en ZoomService
+                )
+    return _adapter
+
+
+def get_session():
+    """
+    Devuelve la Session del hilo actual.
+    Todas las Sessions comparten el mismo adaptador, así que reutilizan
+    las mismas conexiones TCP+TLS abiertas entre hilos.
+
+    Returns:
+        requests.Session
+    """
+    session = getattr(_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        adapter = _get_adapter()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers['Connection'] = 'keep-alive'
+        _local.session = session
+    return session
+
+
+def request(method, url, **kwargs):
+    """
+    Envía una petición HTTP usando el pool compartido.
+
+    Args:
+        method: Verbo HTTP ('GET', 'POST', 'DELETE'...)
+        url: URL completa
+        **kwargs: Argumentos de requests (headers, json, data, params, timeout)
+
+    Returns:
+        requests.Response
+    """
+    kwargs.setdefault('timeout', get_timeout())
+    with _stats_lock:
+        _stats['peticiones'] += 1
+    try:
+        return get_session().request(method, url, **kwargs)
+    except requests.ConnectionError:
+        with _stats_lock:
+            _stats['errores_conexion'] += 1
+        raise
+
+
+def estadisticas_conexiones():
+    """
+    Contadores de reutilización de conexiones del pool.
+
+    'conexiones_abiertas' cuenta los handshakes TCP(+TLS) realizados y
+    'peticiones_pool' las peticiones servidas por urllib3; la diferencia
+    son las peticiones que reutilizaron una conexión keep-alive.
+
+    Returns:
+        dict con los contadores
+    """
+    conexiones = 0
+    peticiones_pool = 0
+    pools = 0
+    if _adapter is not None:
+        contenedor = _adapter.poolmanager.pools
+        for key in list(contenedor.keys()):
+            pool = contenedor.get(key)
+            if pool is None:
+                continue
+            pools += 1
+            conexiones += pool.num_connections
+            peticiones_pool += pool.num_requests
+
+    with _stats_lock:
+        datos = dict(_stats)
+
+    datos.update({
+        'pools': pools,
+        'conexiones_abiertas': conexiones,
+        'peticiones_pool': peticiones_pool,
+        'conexiones_reutilizadas': max(peticiones_pool - conexiones, 0),
+    })
+    return datos
+
+
+def cerrar_pool():
+    """ Cierra todas las conexiones (útil en tests o al apagar el worker). """
+    global _adapter
+    with _adapter_lock:
+        if _adapter is not None:
+            _adapter.close()
+        _adapter = None
+    _local.__dict__.clear()
@@ -0,0 +1,327 @@
+# ========================================
+# reuniones/zoom_scheduler.py
+# Planificador de peticiones a Zoom: límites por categoría, reintentos y backoff
+# ========================================
+
+import asyncio  # Variante asíncrona (ZoomServiceAsync)
+import random  # Jitter del backoff
+import re  # Clasificación de endpoints
+import threading  # Métricas y pausas compartidas
+import time  # Esperas
+from email.utils import parsedate_to_datetime  # Retry-After como fecha HTTP
+from urllib.parse import urlparse  # Ruta del endpoint
+
+import httpx  # Excepciones de red del cliente asíncrono
+import requests  # Excepciones de red
+from django.conf import settings  # Límites configurables
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError  # Causa real de requests.ConnectionError
+
+from .limites import TokenBucket
+
+# Límites por segundo de Zoom para cuentas Basic (gratuitas).
+# Pro/Business permiten más: sobrescribir con settings.ZOOM_RATE_LIMITS.
+LIMITES_DEFECTO = {
+    'light': 4,
+    'medium': 2,
+    'heavy': 1,
+}
+MAX_REINTENTOS = 4
+BACKOFF_BASE = 0.5  # Segundos del primer reintento
+BACKOFF_TOPE = 30  # Segundos máximos de espera por reintento
+ESTADOS_REINTENTABLES = {500, 502, 503, 504}
+METODOS_IDEMPOTENTES = {'GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'}
+ERRORES_RED = (requests.ConnectionError, requests.Timeout, httpx.TransportError)
+
+# (método, patrón de ruta) -> categoría de Zoom
+CATEGORIAS = [
+    ('GET', re.compile(r'/users/me$'), 'light'),
+    ('POST', re.compile(r'/users/[^/]+/meetings$'), 'medium'),
+    ('GET', re.compile(r'/users/[^/]+/meetings$'), 'medium'),
+    ('GET', re.compile(r'/meetings/[^/]+$'), 'light'),
+    ('PATCH', re.compile(r'/meetings/[^/]+$'), 'light'),
+    ('DELETE', re.compile(r'/meetings/[^/]+$'), 'light'),
+]
+
+
+def categoria(method, url):
+    """
+    Categoría de límite de Zoom para un endpoint.
+
+    Returns:
+        str | None: 'light', 'medium', 'heavy' o None (sin límite, p. ej. OAuth)
+    """
+    ruta = urlparse(url).path
+    for metodo, patron, nombre in CATEGORIAS:
+        if metodo == method and patron.search(ruta):
+            return nombre
+    return None
+
+
+def fallo_al_conectar(error):
+    """
+    Indica si un error de red ocurrió antes de enviar la petición (la
+    conexión nunca se estableció), igual para requests y httpx:
+    conexión rechazada, DNS o timeout al conectar. Un corte después de
+    conectar no cuenta: Zoom pudo haber ejecutado la petición.
+
+    Returns:
+        bool
+    """
+    if isinstance(error, (requests.ConnectTimeout, httpx.ConnectError, httpx.ConnectTimeout)):
+        return True
+    if isinstance(error, requests.ConnectionError):
+        causa = error.args[0] if error.args else None
+        causa = getattr(causa, 'reason', causa)  # urllib3 envuelve el error en MaxRetryError
+        return isinstance(causa, (NewConnectionError, ConnectTimeoutError))
+    return False
+
+
+def segundos_retry_after(valor):
+    """
+    Interpreta la cabecera Retry-After (segundos o fecha HTTP).
+
+    Returns:
+        float | None
+    """
+    if not valor:
+        return None
+    try:
+        return max(float(valor), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(valor).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class ProgramadorZoom:
+    """
+    Envía peticiones respetando un token bucket por cuenta y categoría de
+    Zoom (los límites de Zoom son por cuenta: anfitriones distintos no se
+    frenan entre sí) y reintenta 429/5xx/errores de red con backoff
+    exponencial con jitter. Los POST (crear reunión) solo se reintentan
+    si es seguro que no llegaron a ejecutarse: 429 o fallo al conectar.
+    """
+
+    def __init__(self, limites=None, max_reintentos=MAX_REINTENTOS,
+                 backoff_base=BACKOFF_BASE, backoff_tope=BACKOFF_TOPE):
+        self.limites = dict(limites or LIMITES_DEFECTO)
+        self.buckets = {}  # (cuenta, categoría) -> TokenBucket, creados al primer uso
+        self.max_reintentos = max_reintentos
+        self.backoff_base = backoff_base
+        self.backoff_tope = backoff_tope
+        self._pausas = {}  # (cuenta, categoría) -> instante (monotónico) hasta el que no se envía
+        self._lock = threading.Lock()
+        self._metricas = {
+            'en_cola': 0,  # Peticiones esperando turno ahora mismo
+            'intentos': 0,  # Intentos enviados a Zoom (incluye reintentos)
+            'reintentos': 0,
+            'limitadas_429': 0,  # Respuestas 429 de Zoom
+            'esperas_locales': 0,  # Veces que el bucket local hizo esperar
+            'errores_red': 0,
+        }
+
+    def _sumar(self, metrica, valor=1):
+        with self._lock:
+            self._metricas[metrica] += valor
+
+    def metricas(self):
+        """ Copia de los contadores actuales. """
+        with self._lock:
+            return dict(self._metricas)
+
+    def _bucket(self, clave):
+        """ Token bucket de (cuenta, categoría); None si la categoría no tiene límite. """
+        bucket = self.buckets.get(clave)
+        if bucket is None and clave[1] in self.limites:
+            with self._lock:
+                bucket = self.buckets.get(clave)
+                if bucket is None:
+                    bucket = self.buckets[clave] = TokenBucket(self.limites[clave[1]])
+        return bucket
+
+    def _pausar(self, clave, segundos):
+        """ Detiene la categoría de la cuenta (todos los hilos) tras un 429. """
+        if clave[1] is None:
+            return
+        with self._lock:
+            hasta = time.monotonic() + segundos
+            self._pausas[clave] = max(self._pausas.get(clave, 0), hasta)
+
+    def _esperar_turno(self, clave):
+        if clave[1] is None:
+            return
+        self._sumar('en_cola')
+        try:
+            with self._lock:
+                pausa = self._pausas.get(clave, 0) - time.monotonic()
+            esperado = max(pausa, 0)
+            if esperado:
+                time.sleep(esperado)
+            bucket = self._bucket(clave)
+            if bucket:
+                esperado += bucket.adquirir()
+            if esperado:
+                self._sumar('esperas_locales')
+        finally:
+            self._sumar('en_cola', -1)
+
+    async def _esperar_turno_async(self, clave):
+        """ Igual que _esperar_turno, pero cede el event loop mientras espera. """
+        if clave[1] is None:
+            return
+        self._sumar('en_cola')
+        try:
+            with self._lock:
+                pausa = self._pausas.get(clave, 0) - time.monotonic()
+            esperado = max(pausa, 0)
+            if esperado:
+                await asyncio.sleep(esperado)
+            bucket = self._bucket(clave)
+            while bucket:
+                espera = bucket.intentar()
+                if not espera:
+                    break
+                await asyncio.sleep(espera)
+                esperado += espera
+            if esperado:
+                self._sumar('esperas_locales')
+        finally:
+            self._sumar('en_cola', -1)
+
+    def _backoff(self, intento):
+        """ Full jitter: aleatorio entre 0 y base * 2^intento (con tope). """
+        return random.uniform(0, min(self.backoff_tope, self.backoff_base * (2 ** intento)))
+
+    def _espera_error_red(self, error, idempotente, intento):
+        """
+        Segundos a esperar antes de reintentar tras un error de red.
+
+        Returns:
+            float | None: None si hay que propagar el error
+        """
+        self._sumar('errores_red')
+        seguro = idempotente or fallo_al_conectar(error)
+        if not seguro or intento >= self.max_reintentos:
+            return None
+        return self._backoff(intento)
+
+    def _espera_respuesta(self, response, clave, idempotente, intento):
+        """
+        Segundos a esperar antes de reintentar según la respuesta.
+
+        Returns:
+            float | None: None si hay que devolver la respuesta tal cual
+        """
+        if response.status_code == 429:
+            self._sumar('limitadas_429')
+            espera = segundos_retry_after(response.headers.get('Retry-After'))
+            if espera is None:
+                espera = self._backoff(intento)
+            elif espera > self.backoff_tope:
+                return None  # Límite diario: no tiene sentido esperar
+            self._pausar(clave, espera)
+        elif response.status_code in ESTADOS_REINTENTABLES and idempotente:
+            espera = self._backoff(intento)
+        else:
+            return None
+
+        if intento >= self.max_reintentos:
+            return None
+        return espera
+
+    def ejecutar(self, enviar, method, url, cuenta=None):
+        """
+        Ejecuta `enviar()` (que hace la petición HTTP) con límites y reintentos.
+
+        Args:
+            enviar: Función sin argumentos que devuelve requests.Response
+            method: Verbo HTTP
+            url: URL (para clasificar el endpoint)
+            cuenta: Dueño del token (cada cuenta de Zoom tiene sus límites)
+
+        Returns:
+            requests.Response: La última respuesta obtenida
+        """
+        clave = (cuenta, categoria(method, url))
+        idempotente = method in METODOS_IDEMPOTENTES
+        intento = 0
+
+        while True:
+            self._esperar_turno(clave)
+            self._sumar('intentos')
+            try:
+                response = enviar()
+            except ERRORES_RED as e:
+                espera = self._espera_error_red(e, idempotente, intento)
+                if espera is None:
+                    raise
+            else:
+                espera = self._espera_respuesta(response, clave, idempotente, intento)
+                if espera is None:
+                    return response
+
+            self._sumar('reintentos')
+            time.sleep(espera)
+            intento += 1
+
+    async def aejecutar(self, enviar, method, url, cuenta=None):
+        """
+        Variante asíncrona de ejecutar(): mismos límites (compartidos con
+        las llamadas síncronas del proceso) y misma política de reintentos.
+
+        Args:
+            enviar: Función sin argumentos que devuelve una corrutina con la respuesta
+            method: Verbo HTTP
+            url: URL (para clasificar el endpoint)
+            cuenta: Dueño del token (cada cuenta de Zoom tiene sus límites)
+
+        Returns:
+            httpx.Response: La última respuesta obtenida
+        """
+        clave = (cuenta, categoria(method, url))
+        idempotente = method in METODOS_IDEMPOTENTES
+        intento = 0
+
+        while True:
+            await self._esperar_turno_async(clave)
+            self._sumar('intentos')
+            try:
+                response = await enviar()
+            except ERRORES_RED as e:
+                espera = self._espera_error_red(e, idempotente, intento)
+                if espera is None:
+                    raise
+            else:
+                espera = self._espera_respuesta(response, clave, idempotente, intento)
+                if espera is None:
+                    return response
+
+            self._sumar('reintentos')
+            await asyncio.sleep(espera)
+            intento += 1
+
+
+_programador = None
+_programador_lock = threading.Lock()
+
+
+def get_programador():
+    """ Programador compartido por todo el proceso. """
+    global _programador
+    if _programador is None:
+        with _programador_lock:
+            if _programador is None:
+                _programador = ProgramadorZoom(
+                    limites=getattr(settings, 'ZOOM_RATE_LIMITS', None),
+                    max_reintentos=getattr(settings, 'ZOOM_MAX_REINTENTOS', MAX_REINTENTOS),
+                )
+    return _programador
+
+
+def reiniciar_programador():
+    """ Descarta el programador para que se cree de nuevo con los settings actuales. """
+    global _programador
+    with _programador_lock:
+        _programador = None
@@ -3,19 +3,62 @@
 # Servicio para OAuth User-Level (cuenta gratis)
 # ========================================
 
-import requests  # Para peticiones HTTP
 from django.conf import settings  # Acceso a settings
 from django.core.cache import cache  # Sistema de caché
 import base64  # Codificación Base64
+import hashlib  # Hash del token para claves de caché
+import threading  # Renovación en segundo plano
+import time  # Expiración de tokens
+import uuid  # Dueño del lock de renovación
+from concurrent.futures import ThreadPoolExecutor  # Prefetch de páginas y lotes
 from datetime import datetime  # Manejo de fechas
+from . import metricas  # Duración de cada llamada a Zoom
+from . import tokens  # Tokens OAuth por usuario
+from . import zoom_http  # Transporte HTTP con pool keep-alive
+from . import zoom_scheduler  # Límites de tasa y reintentos
+
+ACCESS_TOKEN_TTL = 3300  # 55 minutos (Zoom expira el token a los 60)
+MAX_PAGE_SIZE = 300  # Máximo page_size permitido por Zoom
+ERROR_REUNION_NO_EXISTE = 3001  # Código de Zoom: la reunión no existe
+RENOVACION_ANTICIPADA = 300  # Renovar cuando falten 5 minutos
+REFRESH_LOCK_KEY = 'zoom_token_refresh_lock'  # + ':<usuario_id>'
+REFRESH_LOCK_TTL = 30  # Segundos máximos que se retiene el lock
+REFRESH_POLL_INTERVAL = 0.1  # Espera entre consultas mientras otro renueva
+HILOS_LOTE = 4  # Llamadas simultáneas en operaciones por lote
+
+_renovando = set()  # Usuarios con un hilo de renovación en marcha en este proceso
+_renovando_lock = threading.Lock()
+
+
+class ZoomAPIError(Exception):
+    """
+    Error devuelto por Zoom. Conserva el status HTTP y el código de
+    error de Zoom (p. ej. 3001 = la reunión no existe).
+    """
+    
+    def __init__(self, mensaje, response=None):
+        super().__init__(mensaje)
+        self.status_code = response.status_code if response is not None else None
+        self.codigo = None
+        if response is not None:
+            try:
+                self.codigo = response.json().get('code')
+            except ValueError:
+                pass
+
 
 class ZoomService:
     """
     Servicio para interactuar con Zoom API usando OAuth 2.0 User-Level.
     Compatible con cuentas Zoom Basic (gratuitas).
+    Cada usuario de Django autoriza su propia cuenta de Zoom: el servicio
+    trabaja con los tokens del usuario indicado.
     """
     
-    def __init__(self):
+    def __init__(self, usuario=None):
+        # Usuario de Django dueño de los tokens (instancia o ID)
+        self.usuario_id = getattr(usuario, 'pk', usuario)
+        
         # Credenciales OAuth (solo 2, no Account ID)
         self.client_id = settings.ZOOM_CLIENT_ID
         self.client_secret = settings.ZOOM_CLIENT_SECRET
@@ -26,6 +69,33 @@ class ZoomService:
         self.token_url = settings.ZOOM_OAUTH_TOKEN_URL
         self.api_base_url = settings.ZOOM_API_BASE_URL
     
+    def _request(self, method, url, **kwargs):
+        """
+        Punto único de salida HTTP hacia Zoom.
+        Usa la sesión compartida del proceso (conexiones reutilizadas) y el
+        programador de peticiones (límites por categoría y reintentos).
+        Cada intento queda medido en metricas (endpoint y status).
+        
+        Returns:
+            requests.Response
+        """
+        return zoom_scheduler.get_programador().ejecutar(
+            lambda: metricas.medir_zoom(method, url, lambda: zoom_http.request(method, url, **kwargs)),
+            method, url, cuenta=self.usuario_id
+        )
+    
+    @staticmethod
+    def metricas():
+        """
+        Contadores del transporte y del programador de peticiones.
+        
+        Returns:
+            dict con reutilización de conexiones, cola, reintentos y 429
+        """
+        datos = zoom_http.estadisticas_conexiones()
+        datos.update(zoom_scheduler.get_programador().metricas())
+        return datos
+    
     def get_authorization_url(self):
         """
         Genera URL para que el usuario autorice la app.
@@ -66,30 +136,61 @@ class ZoomService:
             'redirect_uri': self.redirect_uri
         }
         
-        response = requests.post(self.token_url, headers=headers, data=data)
+        response = self._request('POST', self.token_url, headers=headers, data=data)
         
         if response.status_code == 200:
             token_data = response.json()
             
             # Guardar tokens en caché (55 minutos)
-            cache.set('zoom_access_token', token_data['access_token'], 3300)
-            cache.set('zoom_refresh_token', token_data['refresh_token'], 86400)
+            self._guardar_tokens(token_data)
             
             return token_data
         else:
-            raise Exception(f"Error obteniendo token: {response.text}")
+            raise ZoomAPIError(f"Error obteniendo token: {response.text}", response)
+    
+    def _requerir_usuario(self):
+        if self.usuario_id is None:
+            raise Exception("ZoomService necesita el usuario dueño de los tokens")
+        return self.usuario_id
+    
+    def _guardar_tokens(self, token_data):
+        """
+        Guarda los tokens del usuario (BD + memoria) junto con el instante
+        de expiración. Zoom rota el refresh token en cada renovación, así
+        que se guarda el nuevo si viene en la respuesta.
+        """
+        usuario_id = self._requerir_usuario()
+        refresh_token = token_data.get('refresh_token')
+        if not refresh_token:
+            anteriores = tokens.recargar(usuario_id)
+            refresh_token = anteriores.refresh_token if anteriores else ''
+        tokens.guardar(usuario_id, token_data['access_token'], refresh_token, time.time() + ACCESS_TOKEN_TTL)
+    
+    def _segundos_restantes_token(self):
+        """
+        Segundos de vida que le quedan al access token actual.
+        
+        Returns:
+            int: Segundos (mínimo 1)
+        """
+        actuales = tokens.obtener(self._requerir_usuario())
+        if actuales is None:
+            return ACCESS_TOKEN_TTL
+        return max(int(actuales.expira - time.time()), 1)
     
     def refresh_access_token(self):
         """
         Renueva el Access Token usando el Refresh Token.
+        El refresh token se lee de la BD: otro proceso pudo haberlo rotado.
         
         Returns:
             str: Nuevo access token
         """
-        refresh_token = cache.get('zoom_refresh_token')
+        usuario_id = self._requerir_usuario()
+        actuales = tokens.recargar(usuario_id)
         
-        if not refresh_token:
-            raise Exception("No hay refresh token disponible")
+        if not actuales or not actuales.refresh_token:
+            raise Exception("No hay refresh token disponible: autoriza Zoom de nuevo")
         
         credentials = f"{self.client_id}:{self.client_secret}"
         b64_credentials = base64.b64encode(credentials.encode()).decode()
@@ -101,32 +202,187 @@ class ZoomService:
         
         data = {
             'grant_type': 'refresh_token',
-            'refresh_token': refresh_token
+            'refresh_token': actuales.refresh_token
         }
         
-        response = requests.post(self.token_url, headers=headers, data=data)
+        response = self._request('POST', self.token_url, headers=headers, data=data)
         
         if response.status_code == 200:
             token_data = response.json()
-            cache.set('zoom_access_token', token_data['access_token'], 3300)
+            self._guardar_tokens(token_data)
             return token_data['access_token']
-        else:
-            raise Exception(f"Error renovando token: {response.text}")
+        elif response.status_code in (400, 401):
+            # Refresh token revocado o caducado: hay que volver a autorizar
+            tokens.revocar(usuario_id)
+        raise ZoomAPIError(f"Error renovando token: {response.text}", response)
+    
+    def _clave_lock_renovacion(self):
+        return f'{REFRESH_LOCK_KEY}:{self.usuario_id}'
+    
+    def _adquirir_lock_renovacion(self):
+        """
+        Lock del usuario compartido entre procesos: cache.add es atómico en
+        la caché compartida de CACHES (tabla de la BD o Redis). Con una
+        LocMemCache solo excluiría a los hilos del mismo proceso.
+        Usuarios distintos renuevan en paralelo.
+        
+        Returns:
+            str | None: Identificador del dueño si se adquirió, None si no
+        """
+        dueno = uuid.uuid4().hex
+        if cache.add(self._clave_lock_renovacion(), dueno, REFRESH_LOCK_TTL):
+            return dueno
+        return None
+    
+    def _liberar_lock_renovacion(self, dueno):
+        """ Libera el lock solo si sigue siendo nuestro. """
+        clave = self._clave_lock_renovacion()
+        if cache.get(clave) == dueno:
+            cache.delete(clave)
+    
+    def _token_nuevo(self, token_anterior):
+        """ Access token vigente en la BD si es distinto de `token_anterior`. """
+        actuales = tokens.recargar(self.usuario_id)
+        if actuales and actuales.access_token != token_anterior and actuales.expira > time.time():
+            return actuales.access_token
+        return None
+    
+    def _renovar_single_flight(self, token_anterior=None):
+        """
+        Renueva el token asegurando que solo un hilo/proceso llame a Zoom
+        por usuario. Los demás esperan a que aparezca el token nuevo en la BD.
+        
+        Args:
+            token_anterior: Token que se considera caducado (None si no había)
+        
+        Returns:
+            str: Access token válido
+        """
+        self._requerir_usuario()
+        limite = time.monotonic() + REFRESH_LOCK_TTL
+        while True:
+            dueno = self._adquirir_lock_renovacion()
+            if dueno:
+                try:
+                    # Otro proceso pudo renovar mientras esperábamos el lock
+                    access_token = self._token_nuevo(token_anterior)
+                    if access_token:
+                        return access_token
+                    return self.refresh_access_token()
+                finally:
+                    self._liberar_lock_renovacion(dueno)
+            
+            time.sleep(REFRESH_POLL_INTERVAL)
+            access_token = self._token_nuevo(token_anterior)
+            if access_token:
+                return access_token
+            if time.monotonic() > limite:
+                raise Exception("Tiempo agotado esperando la renovación del token")
+    
+    def _renovar_en_segundo_plano(self, token_actual):
+        """
+        Lanza (como mucho una vez por usuario y proceso) un hilo que renueva
+        el token antes de que caduque, para que las peticiones no esperen.
+        """
+        usuario_id = self.usuario_id
+        with _renovando_lock:
+            if usuario_id in _renovando:
+                return
+            _renovando.add(usuario_id)
+        
+        def tarea():
+            try:
+                dueno = self._adquirir_lock_renovacion()
+                if not dueno:
+                    return  # Otro proceso ya lo está renovando
+                try:
+                    if not self._token_nuevo(token_actual):
+                        self.refresh_access_token()
+                finally:
+                    self._liberar_lock_renovacion(dueno)
+            except Exception:
+                pass  # El token actual sigue vigente; se reintentará
+            finally:
+                with _renovando_lock:
+                    _renovando.discard(usuario_id)
+        
+        threading.Thread(target=tarea, name='zoom-token-refresh', daemon=True).start()
+    
+    def _token_vigente(self, actuales):
+        """
+        Access token de `actuales` si sigue vigente (lanzando la renovación
+        anticipada si está por caducar), o None si ya caducó.
+        """
+        if actuales is None:
+            return None
+        restante = actuales.expira - time.time()
+        if restante <= 0:
+            return None
+        if restante <= getattr(settings, 'ZOOM_TOKEN_RENOVACION_ANTICIPADA', RENOVACION_ANTICIPADA):
+            self._renovar_en_segundo_plano(actuales.access_token)
+        return actuales.access_token
     
     def get_access_token(self):
         """
-        Obtiene Access Token (desde caché o renovando).
+        Obtiene el Access Token del usuario (memoria del proceso, BD o renovando).
+        Si el token está por caducar se renueva en segundo plano;
+        si ya caducó, la renovación es single-flight.
         
         Returns:
             str: Access token válido
         """
-        access_token = cache.get('zoom_access_token')
+        usuario_id = self._requerir_usuario()
+        actuales = tokens.obtener(usuario_id)
+        access_token = self._token_vigente(actuales)
+        if access_token:
+            return access_token
         
+        if actuales is None:
+            raise Exception("Zoom no está autorizado para este usuario")
+        # Caducado en memoria: quizá otro proceso ya lo renovó
+        access_token = self._token_vigente(tokens.recargar(usuario_id))
         if access_token:
             return access_token
+        return self._renovar_single_flight(actuales.access_token)
+    
+    def _clave_identidad(self, access_token):
+        """ Clave de caché del user ID asociado a un access token. """
+        digest = hashlib.sha256(access_token.encode()).hexdigest()[:32]
+        return f'zoom_user_id:{digest}'
+    
+    def invalidar_identidad(self, access_token):
+        """ Borra el user ID cacheado (p. ej. tras un 401 de Zoom). """
+        cache.delete(self._clave_identidad(access_token))
+    
+    def get_user_id(self, access_token):
+        """
+        Obtiene el ID del usuario dueño del token.
+        Se consulta /users/me solo una vez por token; el resultado vive
+        en caché mientras el token siga vigente.
+        
+        Args:
+            access_token: Access token OAuth
+        
+        Returns:
+            str: ID de usuario de Zoom
+        """
+        clave = self._clave_identidad(access_token)
+        user_id = cache.get(clave)
+        if user_id:
+            return user_id
+        
+        response = self._request(
+            'GET',
+            f"{self.api_base_url}/users/me",
+            headers={'Authorization': f'Bearer {access_token}'}
+        )
         
-        # Si no hay token, intentar renovar
-        return self.refresh_access_token()
+        if response.status_code != 200:
+            raise ZoomAPIError(f"Error obteniendo usuario: {response.text}", response)
+        
+        user_id = response.json()['id']
+        cache.set(clave, user_id, self._segundos_restantes_token())
+        return user_id
     
     def crear_reunion(self, topic, start_time, duration, timezone='America/Hermosillo'):
         """
@@ -148,7 +404,31 @@ class ZoomService:
             'Content-Type': 'application/json'
         }
         
-        data = {
+        data = self._datos_nueva_reunion(topic, start_time, duration, timezone)
+        
+        # Obtener user ID (desde caché)
+        user_id = self.get_user_id(access_token)
+        
+        # Crear reunión
+        response = self._request(
+            'POST',
+            f"{self.api_base_url}/users/{user_id}/meetings",
+            headers=headers,
+            json=data
+        )
+        
+        if response.status_code == 401:
+            self.invalidar_identidad(access_token)
+        
+        if response.status_code == 201:
+            return response.json()
+        else:
+            raise ZoomAPIError(f"Error creando reunión: {response.text}", response)
+    
+    @staticmethod
+    def _datos_nueva_reunion(topic, start_time, duration, timezone):
+        """ Cuerpo JSON para crear una reunión programada. """
+        return {
             'topic': topic,
             'type': 2,  # Reunión programada
             'start_time': start_time,
@@ -163,32 +443,17 @@ class ZoomService:
                 'audio': 'both'
             }
         }
-        
-        # Obtener user ID
-        user_response = requests.get(
-            f"{self.api_base_url}/users/me",
-            headers=headers
-        )
-        user_id = user_response.json()['id']
-        
-        # Crear reunión
-        response = requests.post(
-            f"{self.api_base_url}/users/{user_id}/meetings",
-            headers=headers,
-            json=data
-        )
-        
-        if response.status_code == 201:
-            return response.json()
-        else:
-            raise Exception(f"Error creando reunión: {response.text}")
     
-    def listar_reuniones(self):
+    def _pagina_reuniones(self, page_size, next_page_token=''):
         """
-        Lista todas las reuniones programadas del usuario.
+        Descarga una página de reuniones.
+        
+        Args:
+            page_size: Reuniones por página (máximo 300 en Zoom)
+            next_page_token: Token de la página a pedir ('' para la primera)
         
         Returns:
-            list: Lista de reuniones
+            tuple: (lista de reuniones, token de la página siguiente o '')
         """
         access_token = self.get_access_token()
         
@@ -196,23 +461,69 @@ class ZoomService:
             'Authorization': f'Bearer {access_token}'
         }
         
-        # Obtener user ID
-        user_response = requests.get(
-            f"{self.api_base_url}/users/me",
-            headers=headers
-        )
-        user_id = user_response.json()['id']
+        # Obtener user ID (desde caché)
+        user_id = self.get_user_id(access_token)
         
-        # Listar reuniones
-        response = requests.get(
+        params = {'page_size': page_size}
+        if next_page_token:
+            params['next_page_token'] = next_page_token
+        
+        response = self._request(
+            'GET',
             f"{self.api_base_url}/users/{user_id}/meetings",
-            headers=headers
+            headers=headers,
+            params=params
         )
         
+        if response.status_code == 401:
+            self.invalidar_identidad(access_token)
+        
         if response.status_code == 200:
-            return response.json()['meetings']
+            data = response.json()
+            return data.get('meetings', []), data.get('next_page_token') or ''
         else:
-            raise Exception(f"Error listando reuniones: {response.text}")
+            raise ZoomAPIError(f"Error listando reuniones: {response.text}", response)
+    
+    def iterar_reuniones(self, page_size=MAX_PAGE_SIZE, prefetch=False):
+        """
+        Recorre todas las reuniones siguiendo next_page_token.
+        Las reuniones se entregan conforme llega cada página, así que la
+        memoria usada no depende del tamaño de la cuenta.
+        
+        Args:
+            page_size: Reuniones por página (máximo 300)
+            prefetch: Si es True, pide la página siguiente en un hilo
+                      mientras se procesa la actual
+        
+        Yields:
+            dict: Una reunión de Zoom
+        """
+        page_size = min(page_size, MAX_PAGE_SIZE)
+        
+        if not prefetch:
+            token = ''
+            while True:
+                meetings, token = self._pagina_reuniones(page_size, token)
+                yield from meetings
+                if not token:
+                    return
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='zoom-prefetch') as executor:
+            futuro = executor.submit(self._pagina_reuniones, page_size, '')
+            while futuro is not None:
+                meetings, token = futuro.result()
+                futuro = executor.submit(self._pagina_reuniones, page_size, token) if token else None
+                yield from meetings
+    
+    def listar_reuniones(self):
+        """
+        Lista todas las reuniones programadas del usuario.
+        Para cuentas grandes usar iterar_reuniones().
+        
+        Returns:
+            list: Lista de reuniones
+        """
+        return list(self.iterar_reuniones())
     
     def eliminar_reunion(self, meeting_id):
         """
@@ -230,7 +541,8 @@ class ZoomService:
             'Authorization': f'Bearer {access_token}'
         }
         
-        response = requests.delete(
+        response = self._request(
+            'DELETE',
             f"{self.api_base_url}/meetings/{meeting_id}",
             headers=headers
         )
@@ -238,4 +550,77 @@ class ZoomService:
         if response.status_code == 204:
             return True
         else:
-            raise Exception(f"Error eliminando reunión: {response.text}")
\ No newline at end of file
+            raise ZoomAPIError(f"Error eliminando reunión: {response.text}", response)
+    
+    def _preparar_lote(self):
+        """
+        Obtiene token y user ID antes de repartir un lote entre hilos,
+        para que no los pidan todos a la vez.
+        """
+        self.get_user_id(self.get_access_token())
+    
+    @staticmethod
+    def _ejecutar_lote(funcion, elementos, hilos):
+        """
+        Aplica `funcion` a cada elemento en un pool acotado de hilos.
+        Los límites de tasa los impone el programador compartido.
+        
+        Returns:
+            list: Un dict por elemento, en el mismo orden, con 'ok' y
+                  'datos' o 'error'/'status_code'/'codigo'/'sin_enviar'
+                  (sin_enviar: falló al conectar, la petición no llegó a Zoom)
+        """
+        def uno(elemento):
+            try:
+                return {'ok': True, 'datos': funcion(elemento)}
+            except Exception as e:
+                return {
+                    'ok': False,
+                    'error': str(e),
+                    'status_code': getattr(e, 'status_code', None),
+                    'codigo': getattr(e, 'codigo', None),
+                    'sin_enviar': zoom_scheduler.fallo_al_conectar(e),
+                }
+        
+        if not elementos:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(hilos, len(elementos))),
+                                thread_name_prefix='zoom-lote') as executor:
+            return list(executor.map(uno, elementos))
+    
+    def crear_reuniones_batch(self, reuniones, hilos=HILOS_LOTE):
+        """
+        Crea varias reuniones en Zoom de forma concurrente.
+        
+        Args:
+            reuniones: Lista de dicts con topic, start_time, duration y
+                       opcionalmente timezone (mismos argumentos que crear_reunion)
+            hilos: Llamadas simultáneas como máximo
+        
+        Returns:
+            list: Un resultado por reunión, en el mismo orden; si 'ok',
+                  'datos' es la respuesta de Zoom
+        """
+        if reuniones:
+            self._preparar_lote()
+        return self._ejecutar_lote(lambda r: self.crear_reunion(**r), reuniones, hilos)
+    
+    def eliminar_reuniones_batch(self, meeting_ids, hilos=HILOS_LOTE):
+        """
+        Elimina varias reuniones de Zoom de forma concurrente.
+        Las que ya no existían (código 3001) cuentan como eliminadas.
+        
+        Args:
+            meeting_ids: IDs de reunión de Zoom
+            hilos: Llamadas simultáneas como máximo
+        
+        Returns:
+            list: Un resultado por ID, en el mismo orden
+        """
+        if meeting_ids:
+            self.get_access_token()
+        resultados = self._ejecutar_lote(self.eliminar_reunion, meeting_ids, hilos)
+        for resultado in resultados:
+            if not resultado['ok'] and resultado['codigo'] == ERROR_REUNION_NO_EXISTE:
+                resultado.update(ok=True, datos=False)  # Ya no existía en Zoom
+        return resultados
@@ -36,6 +36,31 @@ ZOOM_API_BASE_URL = config('ZOOM_API_BASE_URL')
 
 ZOOM_REDIRECT_URI = config('ZOOM_REDIRECT_URI')
 
+# Secret token del webhook (Zoom Marketplace > Feature > Event Subscriptions)
+ZOOM_WEBHOOK_SECRET_TOKEN = config('ZOOM_WEBHOOK_SECRET_TOKEN', default='')
+
+# ========================================
+# ZOOM HTTP (pool de conexiones keep-alive)
+# ========================================
+
+ZOOM_HTTP_POOL_CONNECTIONS = config('ZOOM_HTTP_POOL_CONNECTIONS', default=4, cast=int)
+ZOOM_HTTP_POOL_MAXSIZE = config('ZOOM_HTTP_POOL_MAXSIZE', default=20, cast=int)
+ZOOM_HTTP_CONNECT_TIMEOUT = config('ZOOM_HTTP_CONNECT_TIMEOUT', default=5, cast=float)
+ZOOM_HTTP_READ_TIMEOUT = config('ZOOM_HTTP_READ_TIMEOUT', default=15, cast=float)
+# Conexiones simultáneas del cliente asíncrono (vistas ASGI) por proceso
+ZOOM_HTTP_ASYNC_MAX_CONEXIONES = config('ZOOM_HTTP_ASYNC_MAX_CONEXIONES', default=100, cast=int)
+
+# Peticiones por segundo por categoría de Zoom (valores de cuenta Basic)
+ZOOM_RATE_LIMITS = {
+    'light': config('ZOOM_RATE_LIGHT', default=4, cast=float),
+    'medium': config('ZOOM_RATE_MEDIUM', default=2, cast=float),
+    'heavy': config('ZOOM_RATE_HEAVY', default=1, cast=float),
+}
+ZOOM_MAX_REINTENTOS = config('ZOOM_MAX_REINTENTOS', default=4, cast=int)
+
+# Segundos antes de caducar en que el token se renueva en segundo plano
+ZOOM_TOKEN_RENOVACION_ANTICIPADA = config('ZOOM_TOKEN_RENOVACION_ANTICIPADA', default=300, cast=int)
+
 # ========================================
 # APPLICATIONS
 # ========================================
@@ -56,6 +81,7 @@ INSTALLED_APPS = [
 # ========================================
 
 MIDDLEWARE = [
+    'reuniones.metricas.MetricasMiddleware',  # latencia y consultas por vista (primero: mide todo)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',  # sesiones
     'django.middleware.common.CommonMiddleware',
@@ -99,6 +125,24 @@ DATABASES = {
     }
 }
 
+# ========================================
+# CACHE (compartida entre procesos)
+# ========================================
+
+# Versiones (ETag), dashboard, feed ICS y lock de renovación del token los
+# leen uvicorn y los workers: la caché tiene que ser la misma para todos, no
+# la LocMemCache por defecto (una por proceso). Por defecto va en una tabla
+# de la BD (python manage.py createcachetable). Con Redis:
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   CACHE_LOCATION=redis://127.0.0.1:6379/1
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': config('CACHE_LOCATION', default='reuniones_cache'),
+        'OPTIONS': {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int)},
+    }
+}
+
 # ========================================
 # PASSWORD VALIDATION
 # ========================================
@@ -135,6 +179,27 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# ========================================
+# EMAIL (invitaciones a participantes)
+# ========================================
+
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='reuniones@localhost')
+
+# ========================================
+# AGENDA
+# ========================================
+
+# Reuniones que se solapan con otra del mismo usuario: rechazar, avisar o ignorar
+REUNIONES_CONFLICTOS = config('REUNIONES_CONFLICTOS', default='rechazar')
+
+# ========================================
+# MÉTRICAS
+# ========================================
+
+# Token para leer /metricas/ (Authorization: Bearer ...); vacío = solo usuarios staff
+METRICAS_TOKEN = config('METRICAS_TOKEN', default='')
+
 # ========================================
 # AUTH / LOGIN CONFIG (🔥 CLAVE 🔥)
 # ========================================